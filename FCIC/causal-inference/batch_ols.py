@@ -0,0 +1,132 @@
+"""
+다중 spec OLS 엔진: 설계 행렬 1회 구성 + Gram 행렬 공유
+
+smf.ols는 spec마다 formula 파싱 → 설계 행렬 생성 → 적합을 반복한다.
+이 모듈은 (결과, 처치, 통제 후보 전체) 설계 행렬을 한 번 만들고,
+결측 패턴(spec에 포함된 컬럼이 모두 관측된 행)별로 중심화 Gram 행렬을 한 번씩만 계산한다.
+각 spec은 Gram 행렬의 부분 블록을 Cholesky 분해해 푼다.
+
+    S = Σ (z - z̄)(z - z̄)ᵀ,  z = [회귀변수..., 결과]
+    β = S_xx⁻¹ S_xy,  절편 = ȳ - x̄ᵀβ
+    RSS = S_yy - S_xyᵀβ,  R² = 1 - RSS / S_yy,  se(β) = √(diag(S_xx⁻¹) · RSS / (n - k - 1))
+
+- 결측 처리: smf.ols와 같이 spec별 listwise 삭제 (meduc / feduc 결측 등)
+- 통제 변수 조합 수백 개(spec curve)도 작은 (k × k) Cholesky 반복으로 끝남
+
+사용 예)
+    engine = BatchOLS(df, 'lhwage', ['educ', 'IQ', 'exper', 'tenure', 'meduc', 'feduc'])
+    table = engine.fit_many(MODEL_SPECS, treatment='educ')
+    curve = engine.fit_many(control_subsets(['IQ', 'exper', 'tenure']), treatment='educ')
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+
+def control_subsets(controls, treatment='educ'):
+    """통제 변수의 모든 부분집합 spec. 반환: {'educ + IQ + ...': ['educ', 'IQ', ...]}"""
+    specs = {}
+    for k in range(len(controls) + 1):
+        for subset in combinations(controls, k):
+            regressors = [treatment, *subset]
+            specs[' + '.join(regressors)] = regressors
+    return specs
+
+
+class BatchOLS:
+    """설계 행렬을 한 번 만들고, 여러 회귀변수 조합의 OLS를 공유 Gram 행렬로 적합합니다."""
+
+    def __init__(self, df, outcome, regressors):
+        self.outcome = outcome
+        self.columns = list(regressors)
+        self._pos = {c: i for i, c in enumerate(self.columns)}
+        data = df[self.columns + [outcome]].to_numpy(dtype='float64')
+        self._data = data
+        self._observed = ~np.isnan(data)
+        self._gram = {}  # 결측 패턴(사용 컬럼 위치) → (n, 평균, 중심화 Gram)
+
+    def _moments(self, cols):
+        # 사용 컬럼 중 결측이 있는 컬럼 조합이 같으면 같은 표본 → Gram 재사용
+        key = tuple(c for c in cols if not self._observed[:, c].all())
+        if key not in self._gram:
+            rows = self._observed[:, list(key) + [-1]].all(axis=1)
+            z = self._data[rows]
+            mean = z.mean(axis=0)
+            zc = z - mean
+            self._gram[key] = (len(z), mean, zc.T @ zc)
+        return self._gram[key]
+
+    def fit(self, regressors):
+        """
+        하나의 spec을 적합합니다.
+
+        반환: dict(params, bse, nobs, df_resid, rsquared) — params / bse index: ['Intercept', *regressors]
+        """
+        cols = [self._pos[c] for c in regressors]
+        n, mean, gram = self._moments(cols)
+        k = len(cols)
+        sxx = gram[np.ix_(cols, cols)]
+        sxy = gram[cols, -1]
+        syy = gram[-1, -1]
+
+        if k:
+            factor = linalg.cho_factor(sxx)
+            beta = linalg.cho_solve(factor, sxy)
+            sxx_inv = linalg.cho_solve(factor, np.eye(k))
+        else:
+            beta, sxx_inv = np.empty(0), np.empty((0, 0))
+        x_mean = mean[cols]
+        intercept = mean[-1] - x_mean @ beta
+        rss = max(syy - sxy @ beta, 0.0)
+        sigma2 = rss / (n - k - 1)
+        se = np.sqrt(np.diag(sxx_inv) * sigma2)
+        se_intercept = np.sqrt(sigma2 * (1 / n + x_mean @ sxx_inv @ x_mean))
+
+        index = ['Intercept', *regressors]
+        return {
+            'params': pd.Series([intercept, *beta], index=index),
+            'bse': pd.Series([se_intercept, *se], index=index),
+            'nobs': n,
+            'df_resid': n - k - 1,
+            'rsquared': 1 - rss / syy,
+        }
+
+    def partial_r2_with(self, regressors, target):
+        """
+        target 회귀변수와 나머지 회귀변수 각각의 편결정계수 R²(target ~ Xj | 다른 회귀변수).
+
+        중심화 Gram 역행렬 P에서 편상관 = -P_ij / √(P_ii · P_jj) → 추가 회귀 없이 계산
+        """
+        cols = [self._pos[c] for c in regressors]
+        _, _, gram = self._moments(cols)
+        precision = np.linalg.inv(gram[np.ix_(cols, cols)])
+        i = regressors.index(target)
+        partial = precision[i] / np.sqrt(precision[i, i] * np.diag(precision))
+        return pd.Series(partial ** 2, index=regressors).drop(target)
+
+    def fit_many(self, specs, treatment='educ'):
+        """
+        여러 spec의 처치 계수를 한 번에 비교합니다.
+
+        specs: {spec 이름: [회귀변수, ...]} (treatment 포함)
+        반환: index = spec 이름, columns = [{treatment}_coefficient, std_err, t, p_value, R-squared, nobs]
+        """
+        rows = {}
+        for name, regressors in specs.items():
+            res = self.fit(regressors)
+            coef, se = res['params'][treatment], res['bse'][treatment]
+            t = coef / se
+            rows[name] = {
+                f'{treatment}_coefficient': coef,
+                'std_err': se,
+                't': t,
+                'p_value': 2 * stats.t.sf(abs(t), res['df_resid']),
+                'R-squared': res['rsquared'],
+                'nobs': res['nobs'],
+            }
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        table.index.name = 'Model'
+        return table
@@ -6,6 +6,9 @@ import seaborn as sns
 import subprocess
 import sys
 
+from stratified import stratified_effects, pool_effects, run_specs
+from matching import TREATMENTS, COLLEGE_EDUC, estimate_effects
+
 def install_and_import_md_pdf():
     """markdown-pdf 라이브러리를 설치하고, 없으면 예외를 발생시킵니다."""
     try:
@@ -207,17 +210,18 @@ def main():
 
         f.write("### 4.1. 경험 그룹별 교육-임금 관계 분석\n")
         
-        # 각 경험 그룹별로 시각화 및 분석
+        # (경험 그룹, 교육 연수)별 평균 임금을 한 번에 계산한 뒤 그룹별로 꺼내 시각화
         # 수정된 labels 리스트를 사용
+        educ_wage_by_group = df.groupby(['exper_group', 'educ'], observed=True)['wage'].mean()
+        present_groups = educ_wage_by_group.index.get_level_values('exper_group')
         for i, group in enumerate(labels):
             f.write(f"#### 경험 그룹: {group}\n")
             
-            group_df = df[df['exper_group'] == group]
-            if group_df.empty:
+            if group not in present_groups:
                 f.write(f"- 해당 그룹에 데이터가 없습니다.\n\n")
                 continue
             
-            educ_wage_stratified = group_df.groupby('educ')['wage'].mean().reset_index()
+            educ_wage_stratified = educ_wage_by_group.xs(group, level='exper_group').reset_index()
 
             plt.figure(figsize=(10, 6))
             sns.barplot(data=educ_wage_stratified, x='educ', y='wage', color='coral')
@@ -236,6 +240,62 @@ def main():
             f.write(f"**해석:** '{group}' 경험 그룹 내에서는 교육 연수가 임금에 미치는 영향이 전체 데이터로 봤을 때보다 약화되거나, 특정 구간에서는 역전되는 현상도 관찰됩니다. 이는 경험이라는 변수가 임금에 큰 영향을 미치고 있음을 보여줍니다.\n\n")
 
 
+        # 층별 / 통합 교육 효과 (stratified.py: 층 key 한 번의 groupby로 층 내 회귀 기울기 계산)
+        strata_bins = {'exper': bins, 'IQ': 4}
+        f.write("### 4.2. 경험 그룹별 교육 효과와 통합 추정치\n")
+        f.write("각 경험 그룹 안에서 교육 1년 증가에 따른 임금 변화(층 내 회귀 기울기)를 구하고, 이를 역분산 가중(inverse-variance) 및 표본 크기 가중으로 통합합니다. 표본이 너무 작은 층은 통합에서 제외합니다.\n\n")
+        exper_strata = stratified_effects(df, ['exper'], bins=strata_bins)
+        exper_strata.index = exper_strata.index.rename_categories(dict(zip(exper_strata.index.categories, labels)))
+        f.write("```\n")
+        f.write(exper_strata.round(2).to_string())
+        f.write("\n```\n")
+        f.write("```\n")
+        f.write(pool_effects(exper_strata).round(2).to_string())
+        f.write("\n```\n\n")
+
+        f.write("### 4.3. 교란 변수 조합별 통합 교육 효과 비교\n")
+        f.write("경험 외에 결혼 여부, 인종, 거주 지역, IQ(사분위)를 차례로 추가해 층을 나눈 결과입니다. 통제 변수를 늘릴수록 통합 추정치가 어떻게 변하는지 확인합니다.\n\n")
+        specs = {
+            '통제 없음': [],
+            'exper': ['exper'],
+            'exper + married': ['exper', 'married'],
+            'exper + married + black + south': ['exper', 'married', 'black', 'south'],
+            'exper + married + black + south + IQ': ['exper', 'married', 'black', 'south', 'IQ'],
+        }
+        spec_comparison = run_specs(df, specs, bins=strata_bins)
+        f.write("```\n")
+        f.write(spec_comparison.round(2).to_string())
+        f.write("\n```\n")
+        f.write("**해석:** 층을 잘게 나눌수록 층 내 비교는 공정해지지만, 표본이 작은 층이 늘어 통합에 사용되는 표본(n_used)이 줄고 표준오차가 커집니다.\n\n")
+
+
+        # 성향 점수 매칭 / 가중 추정 (matching.py)
+        f.write("### 4.4. 성향 점수 매칭과 가중 추정 (이진 처치)\n")
+        f.write(f"결혼 여부, 인종, 남부 거주, 대졸 이상(educ >= {COLLEGE_EDUC}) 여부를 처치로 두고, 나머지 변수로 성향 점수(처치를 받을 확률)를 추정해 임금 효과를 비교합니다. 매칭은 logit 성향 점수의 최근접 이웃(caliper 적용), IPW/AIPW는 성향 점수 역가중 추정입니다. 균형 진단은 공변량별 표준화 평균 차이(SMD)로, 절댓값이 0.1 미만이면 균형이 맞는 것으로 봅니다.\n\n")
+        fig, axes = plt.subplots(1, len(TREATMENTS), figsize=(5 * len(TREATMENTS), 5), sharey=False)
+        for ax, treatment in zip(axes, TREATMENTS):
+            result = estimate_effects(df, treatment)
+            balance = result['balance'].xs('smd', axis=1, level=1)
+            f.write(f"#### 처치: {treatment}\n")
+            f.write("```\n")
+            f.write(result['estimates'].round(2).to_string())
+            f.write("\n\n")
+            f.write(balance.round(3).to_string())
+            f.write("\n```\n")
+            for stage, marker in zip(balance.columns, ['o', 's', '^']):
+                ax.scatter(balance[stage].abs(), balance.index, marker=marker, label=stage)
+            ax.axvline(0.1, color='gray', linestyle='--')
+            ax.set_title(f"공변량 균형: {treatment}")
+            ax.set_xlabel("|SMD|")
+        axes[0].legend()
+        plt.tight_layout()
+        img_path = os.path.join(image_dir, "9_propensity_balance.png")
+        plt.savefig(img_path)
+        plt.close()
+        f.write("![propensity_balance](./images/9_propensity_balance.png)\n")
+        f.write("**해석:** 매칭 또는 가중 후 SMD가 0.1 안쪽으로 줄어든 공변량은 처치군과 대조군이 비슷해졌다는 뜻입니다. 단순 비교와 매칭/가중 추정치의 차이가 클수록 교란 변수의 영향이 크다는 것을 의미합니다.\n\n")
+
+
         # --- 6. 결론 ---
         f.write("## 5. 결론\n\n")
         f.write("### 5.1. 분석 요약\n")
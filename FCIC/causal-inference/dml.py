@@ -0,0 +1,121 @@
+"""
+Double / Debiased ML (DML) 추정: educ → lhwage 효과 (부분 선형 모델, cross-fitting)
+
+    lhwage = θ · educ + g(X) + ε,   educ = m(X) + v
+
+1. K개 fold로 나누고, fold마다 나머지 fold로 두 nuisance 모델을 학습해 해당 fold를 예측
+    ℓ̂(X) ≈ E[lhwage | X],  m̂(X) ≈ E[educ | X]   (기본: HistGradientBoosting, 결측 그대로 처리)
+2. 잔차끼리 회귀(직교화):  θ = Σ ṽ·ỹ / Σ ṽ²,  ỹ = y - ℓ̂(X),  ṽ = d - m̂(X)
+   표준오차: ψ = (ỹ - θṽ)ṽ,  se = √(mean(ψ²) / mean(ṽ²)² / n)
+
+- 통제 변수 X가 임금에 비선형으로 작용해도 θ 추정이 smf.ols의 선형 가정에 의존하지 않음
+- fold 학습(nuisance 적합)이 비싼 단계 → fold마다 process pool worker에서 병렬 실행
+- fold 분할은 (행 수, K, seed)별로 메모리 + CACHE_DIR(.npy)에 저장해 재실행 / 반복 비교 시 재사용
+
+사용 예)
+    result = dml_effect(df, controls=['IQ', 'exper', 'tenure', 'meduc', 'feduc'])
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+OUTCOME = 'lhwage'
+TREATMENT = 'educ'
+CONTROLS = ['IQ', 'exper', 'tenure', 'meduc', 'feduc']
+N_FOLDS = 5
+SEED = 42
+CACHE_DIR = 'FCIC/causal-inference/data/cache'
+
+_FOLDS = {}  # (n, K, seed) → fold 번호 배열
+_DATA = {}   # worker 공유 데이터 (process pool initializer로 1회 전달)
+
+
+def default_learner(seed=SEED):
+    """nuisance 모델 기본값 (결측 허용, 비선형 / 상호작용 학습)"""
+    return HistGradientBoostingRegressor(max_iter=100, learning_rate=0.05, max_leaf_nodes=8,
+                                         min_samples_leaf=30, random_state=seed)
+
+
+def fold_ids(n, k=N_FOLDS, seed=SEED, cache_dir=CACHE_DIR):
+    """행마다 fold 번호 (0 ~ k-1). 같은 (n, k, seed)는 메모리 / 디스크 cache에서 재사용."""
+    key = (n, k, seed)
+    if key in _FOLDS:
+        return _FOLDS[key]
+    path = os.path.join(cache_dir, f'dml_folds_n{n}_k{k}_s{seed}.npy') if cache_dir else None
+    if path and os.path.exists(path):
+        folds = np.load(path)
+    else:
+        folds = (np.random.default_rng(seed).permutation(n) % k).astype('int16')
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, folds)
+    _FOLDS[key] = folds
+    return folds
+
+
+def _init_worker(data):
+    _DATA.clear()
+    _DATA.update(data)
+
+
+def _fit_fold(fold, learner, seed):
+    """fold 밖 행으로 ℓ̂ / m̂을 학습해 fold 안 행을 예측합니다. 반환: (fold 행 위치, ℓ̂, m̂)"""
+    x, y, d, folds = _DATA['x'], _DATA['y'], _DATA['d'], _DATA['folds']
+    test = folds == fold
+    train = ~test
+    y_hat = learner(seed).fit(x[train], y[train]).predict(x[test])
+    d_hat = learner(seed).fit(x[train], d[train]).predict(x[test])
+    return np.flatnonzero(test), y_hat, d_hat
+
+
+def dml_effect(df, outcome=OUTCOME, treatment=TREATMENT, controls=CONTROLS, k=N_FOLDS,
+               learner=default_learner, workers=None, seed=SEED, alpha=0.05, cache_dir=CACHE_DIR):
+    """
+    cross-fitting DML로 처치 효과를 추정합니다.
+
+    learner: seed를 받아 sklearn 회귀 모델을 만드는 top-level 함수 (worker로 pickle)
+    반환: Series[coefficient, std_err, ci_lower, ci_upper, outcome_r2, treatment_r2, n, folds, seconds]
+    """
+    data = df.dropna(subset=[outcome, treatment])
+    x = data[controls].to_numpy(dtype='float64')
+    y = data[outcome].to_numpy(dtype='float64')
+    d = data[treatment].to_numpy(dtype='float64')
+    n = len(data)
+    shared = {'x': x, 'y': y, 'd': d, 'folds': fold_ids(n, k, seed, cache_dir)}
+
+    start = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, k)
+    tasks = [(fold, learner, seed) for fold in range(k)]
+    if workers <= 1:
+        _init_worker(shared)
+        results = [_fit_fold(*t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+            results = list(pool.map(_fit_fold, *zip(*tasks)))
+
+    y_hat, d_hat = np.empty(n), np.empty(n)
+    for rows, y_pred, d_pred in results:
+        y_hat[rows], d_hat[rows] = y_pred, d_pred
+    y_res, d_res = y - y_hat, d - d_hat
+
+    theta = (d_res @ y_res) / (d_res @ d_res)
+    psi = (y_res - theta * d_res) * d_res
+    se = np.sqrt(np.mean(psi ** 2) / np.mean(d_res ** 2) ** 2 / n)
+    z = stats.norm.ppf(1 - alpha / 2)
+    return pd.Series({
+        'coefficient': theta,
+        'std_err': se,
+        'ci_lower': theta - z * se,
+        'ci_upper': theta + z * se,
+        'outcome_r2': 1 - y_res.var() / y.var(),
+        'treatment_r2': 1 - d_res.var() / d.var(),
+        'n': n,
+        'folds': k,
+        'seconds': time.perf_counter() - start,
+    })
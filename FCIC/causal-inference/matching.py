@@ -0,0 +1,189 @@
+"""
+성향 점수(Propensity Score) 매칭 / 가중 추정 엔진
+
+이진 처치(married, black, south, 또는 educ 기준 이상 여부)의 임금 효과를 추정한다.
+
+1. 성향 점수: 로지스틱 회귀 e(x) = P(처치 = 1 | 공변량)
+2. 매칭 (ATT): 처치 단위마다 대조군 최근접 이웃 k개 (복원 매칭)
+    - 'score': logit e(x) 1차원, 'mahalanobis': 공변량 백색화(whitening) 공간
+    - scipy cKDTree로 검색 → O(n log n) (모든 쌍 거리 계산 없음)
+    - caliper: logit 점수 표준편차 × CALIPER_SD 밖의 이웃은 버림 (매칭 실패 처치 단위는 제외)
+3. 가중 (ATE): IPW(Hajek, 정규화 가중) / AIPW(처치·대조군 선형 결과 모델 + 가중 잔차 보정)
+    표준오차는 영향 함수(influence function) 기반
+4. 균형 진단: 공변량별 표준화 평균 차이(SMD)와 분산비 — 원자료 / 매칭 후 / IPW 가중 후
+
+사용 예)
+    result = estimate_effects(df, 'college')
+    result['estimates'], result['balance']
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+OUTCOME = 'wage'
+COVARIATES = ['educ', 'IQ', 'exper', 'tenure', 'age', 'married', 'black', 'south', 'urban', 'sibs']
+COLLEGE_EDUC = 16  # 'college' 처치: educ >= 16 (대졸 이상)
+CALIPER_SD = 0.2   # logit 성향 점수 표준편차 대비 caliper (Austin 2011 권장값)
+PS_CLIP = 0.01     # IPW 가중 폭주 방지: 성향 점수를 [PS_CLIP, 1 - PS_CLIP]로 제한
+
+# 처치 이름 → (처치 컬럼 생성 함수, 공변량에서 뺄 컬럼)
+TREATMENTS = {
+    'married': (lambda df: df['married'], ['married']),
+    'black': (lambda df: df['black'], ['black']),
+    'south': (lambda df: df['south'], ['south']),
+    'college': (lambda df: (df['educ'] >= COLLEGE_EDUC).astype(int), ['educ']),
+}
+
+
+def treatment_data(df, treatment, outcome=OUTCOME, covariates=None):
+    """처치 / 결과 / 공변량 배열 (결측 행 제외). 반환: (t, y, X DataFrame)"""
+    make, exclude = TREATMENTS[treatment]
+    covariates = [c for c in (covariates or COVARIATES) if c not in exclude]
+    data = df[covariates].assign(_t=make(df), _y=df[outcome]).dropna()
+    return data['_t'].to_numpy(dtype='int8'), data['_y'].to_numpy(dtype='float64'), data[covariates]
+
+
+def propensity_scores(X, t):
+    """
+    로지스틱 회귀 성향 점수 (공변량 표준화 후 적합).
+
+    반환: (성향 점수, logit 점수) — logit은 decision_function 값이라 점수가 0 / 1로 포화돼도 유한함
+    """
+    z = StandardScaler().fit_transform(X)
+    model = LogisticRegression(C=1e6, max_iter=1000).fit(z, t)
+    return model.predict_proba(z)[:, 1], model.decision_function(z)
+
+
+# ======================================================
+# 1. 최근접 이웃 매칭
+# ======================================================
+def _whiten(X):
+    """Mahalanobis 거리 = 백색화 공간의 유클리드 거리"""
+    x = X.to_numpy(dtype='float64')
+    x = x - x.mean(axis=0)
+    cov = np.atleast_2d(np.cov(x, rowvar=False))
+    return x @ np.linalg.cholesky(np.linalg.pinv(cov))
+
+
+def nearest_neighbors(t, features, k=1, caliper=None):
+    """
+    처치 단위마다 대조군 최근접 이웃 k개를 찾습니다 (복원 매칭).
+
+    반환: (처치 단위 위치, 대조군 위치 배열 (처치 수 × k, 실패 -1))
+    """
+    features = np.asarray(features, dtype='float64').reshape(len(t), -1)
+    treated, control = np.flatnonzero(t == 1), np.flatnonzero(t == 0)
+    tree = cKDTree(features[control])
+    bound = np.inf if caliper is None else caliper
+    dist, idx = tree.query(features[treated], k=k, distance_upper_bound=bound)
+    dist, idx = dist.reshape(len(treated), k), idx.reshape(len(treated), k)
+    matches = np.where(np.isfinite(dist), control[np.minimum(idx, len(control) - 1)], -1)
+    return treated, matches
+
+
+def match_att(t, y, matches, treated):
+    """매칭 ATT = 평균(처치 결과 - 매칭 대조군 평균 결과). 반환: (ATT, 매칭 성공 처치 수, 대조군 가중치)"""
+    found = matches >= 0
+    matched = found.any(axis=1)
+    counts = found[matched].sum(axis=1)
+    control_mean = np.where(found, y[np.maximum(matches, 0)], 0.0)[matched].sum(axis=1) / counts
+    att = np.mean(y[treated[matched]] - control_mean)
+
+    # 균형 진단용 가중치: 처치 1, 대조군 = 매칭 횟수 / 이웃 수
+    weights = np.zeros(len(t))
+    weights[treated[matched]] = 1.0
+    np.add.at(weights, matches[matched][found[matched]], np.repeat(1 / counts, counts))
+    return att, int(matched.sum()), weights
+
+
+# ======================================================
+# 2. IPW / AIPW
+# ======================================================
+def _ols_predict(X, y, rows):
+    x = np.column_stack([np.ones(len(X)), X])
+    beta = np.linalg.lstsq(x[rows], y[rows], rcond=None)[0]
+    return x @ beta
+
+
+def weighting_estimates(X, t, y, ps):
+    """IPW(Hajek) / AIPW ATE와 영향 함수 표준오차. 반환: {방법: (추정치, 표준오차)}"""
+    n = len(t)
+    e = np.clip(ps, PS_CLIP, 1 - PS_CLIP)
+    w1, w0 = t / e, (1 - t) / (1 - e)
+    mu1_ipw, mu0_ipw = (w1 * y).sum() / w1.sum(), (w0 * y).sum() / w0.sum()
+    psi_ipw = w1 * (y - mu1_ipw) / w1.mean() - w0 * (y - mu0_ipw) / w0.mean()
+
+    x = X.to_numpy(dtype='float64')
+    m1, m0 = _ols_predict(x, y, t == 1), _ols_predict(x, y, t == 0)
+    psi_aipw = m1 - m0 + w1 * (y - m1) - w0 * (y - m0)
+    aipw = psi_aipw.mean()
+    return {
+        'IPW (ATE)': (mu1_ipw - mu0_ipw, psi_ipw.std(ddof=1) / np.sqrt(n)),
+        'AIPW (ATE)': (aipw, (psi_aipw - aipw).std(ddof=1) / np.sqrt(n)),
+    }
+
+
+# ======================================================
+# 3. 균형 진단
+# ======================================================
+def balance_table(X, t, weights=None):
+    """공변량별 (가중) 표준화 평균 차이 / 분산비. SMD 분모는 원자료 처치·대조군 분산 평균."""
+    x = X.to_numpy(dtype='float64')
+    treated, control = t == 1, t == 0
+    pooled_sd = np.sqrt((x[treated].var(axis=0, ddof=1) + x[control].var(axis=0, ddof=1)) / 2)
+    w = np.ones(len(t)) if weights is None else weights
+
+    def moments(rows):
+        ww = w[rows] / w[rows].sum()
+        mean = ww @ x[rows]
+        return mean, ww @ (x[rows] - mean) ** 2
+
+    mean1, var1 = moments(treated)
+    mean0, var0 = moments(control)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({'smd': (mean1 - mean0) / pooled_sd, 'variance_ratio': var1 / var0}, index=X.columns)
+
+
+# ======================================================
+# 4. 전체 실행
+# ======================================================
+def estimate_effects(df, treatment, outcome=OUTCOME, covariates=None, k=1, method='score', caliper_sd=CALIPER_SD):
+    """
+    처치 하나의 효과를 단순 비교 / 매칭 / IPW / AIPW로 추정하고 균형을 진단합니다.
+
+    method: 'score'(logit 성향 점수 매칭) / 'mahalanobis'(공변량 거리 매칭)
+    반환: {'estimates': DataFrame[estimate, std_err, n],
+           'balance': DataFrame[(단계, smd / variance_ratio)], 'propensity': 성향 점수}
+    """
+    t, y, X = treatment_data(df, treatment, outcome, covariates)
+    ps, logit = propensity_scores(X, t)
+
+    if method == 'score':
+        features, caliper = logit, caliper_sd * logit.std()
+    elif method == 'mahalanobis':
+        features, caliper = _whiten(X), None
+    else:
+        raise ValueError(f"지원하지 않는 매칭 방법입니다: {method} ('score' / 'mahalanobis')")
+    treated, matches = nearest_neighbors(t, features, k=k, caliper=caliper)
+    att, n_matched, match_weights = match_att(t, y, matches, treated)
+
+    naive = y[t == 1].mean() - y[t == 0].mean()
+    naive_se = np.sqrt(y[t == 1].var(ddof=1) / (t == 1).sum() + y[t == 0].var(ddof=1) / (t == 0).sum())
+    rows = {
+        'Naive difference': (naive, naive_se, len(t)),
+        f'Matching (ATT, k={k})': (att, np.nan, n_matched),
+        **{name: (est, se, len(t)) for name, (est, se) in weighting_estimates(X, t, y, ps).items()},
+    }
+    estimates = pd.DataFrame.from_dict(rows, orient='index', columns=['estimate', 'std_err', 'n'])
+    estimates.index.name = 'Method'
+
+    e = np.clip(ps, PS_CLIP, 1 - PS_CLIP)
+    balance = pd.concat({
+        'raw': balance_table(X, t),
+        'matched': balance_table(X, t, match_weights),
+        'ipw': balance_table(X, t, t / e + (1 - t) / (1 - e)),
+    }, axis=1)
+    return {'estimates': estimates, 'balance': balance, 'propensity': pd.Series(ps, index=X.index)}
@@ -5,6 +5,20 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 
+from batch_ols import BatchOLS, control_subsets
+from resampling import N_BOOT, N_PERM, resample_inference
+from dml import N_FOLDS, dml_effect
+from sensitivity import adjusted_estimate_grid, sensitivity_table, spec_benchmarks
+
+# 비교 모델 (처치 변수 educ + 통제 변수)
+MODEL_SPECS = {
+    'Model 1: Simple': ['educ'],
+    'Model 2: + IQ': ['educ', 'IQ'],
+    'Model 3: + Career': ['educ', 'exper', 'tenure'],
+    'Model 4: Full': ['educ', 'IQ', 'exper', 'tenure', 'meduc', 'feduc'],
+}
+CONTROLS = ['IQ', 'exper', 'tenure', 'meduc', 'feduc']
+
 def main():
     """
     인과추론 회귀분석을 수행하고, 전체 과정을 마크다운 보고서로 자동 생성하는 마스터 함수.
@@ -122,6 +136,39 @@ def main():
     report_md += "2. 누락된 변수가 모델에 포함된 독립 변수(교육 수준)와 상관관계가 있다.\n\n"
     report_md += "이 분석에서는 개인의 **'능력'이나 '지능'(예: IQ)**과 같은 변수가 OVB를 유발할 수 있습니다. 즉, 지능이 높을수록 더 높은 교육 수준을 달성하고, 동시에 노동 시장에서 더 높은 임금을 받을 가능성이 높습니다. 만약 지능을 통제하지 않으면, 우리는 교육의 효과를 과대평가하게 될 수 있습니다.\n\n"
 
+    # OVB 민감도 분석 (Cinelli & Hazlett): 적합 결과(추정치, 표준오차, 자유도)만으로 닫힌 식 계산
+    ols_engine = BatchOLS(df, 'lhwage', ['educ'] + CONTROLS)
+    sensitivity = sensitivity_table(ols_engine, MODEL_SPECS, treatment='educ')
+    report_md += "### 3.1. 누락 변수 편향 민감도 분석\n"
+    report_md += "관측하지 못한 교란 변수가 있다면 `educ` 계수가 얼마나 달라질지를 교란 변수의 강도로 계산합니다. 강도는 교란 변수가 교육의 잔차 분산을 설명하는 비율(R²_dz)과 임금의 잔차 분산을 설명하는 비율(R²_yz)로 나타냅니다.\n\n"
+    report_md += "- `r2yd_x`: 교육이 설명하는 임금 잔차 분산 비율. 교란 변수가 임금을 완전히 설명하더라도(R²_yz = 1) 교육과의 관계가 이보다 약하면 효과를 없앨 수 없습니다.\n"
+    report_md += "- `rv_q` (robustness value): 교육과 임금 잔차를 각각 이 비율만큼 설명하는 교란 변수가 있어야 추정치가 0이 됩니다.\n"
+    report_md += "- `rv_qa`: 같은 방식으로 5% 유의성이 사라지는 교란 변수 강도입니다.\n\n"
+    report_md += sensitivity.round(4).to_markdown() + "\n\n"
+
+    full = MODEL_SPECS['Model 4: Full']
+    full_fit = sensitivity.loc['Model 4: Full']
+    benchmarks = spec_benchmarks(ols_engine, full, 'IQ', treatment='educ')
+    lim = max(0.4, benchmarks[['r2dz', 'r2yz']].max().max() * 1.1)
+    r2dz_axis, r2yz_axis, grid = adjusted_estimate_grid(full_fit['estimate'], full_fit['std_err'], full_fit['dof'], lim=lim)
+    fig, ax = plt.subplots(figsize=(8, 7))
+    contours = ax.contour(r2dz_axis, r2yz_axis, grid, levels=12, colors='gray', linewidths=0.8)
+    ax.clabel(contours, fontsize=8, fmt='%.3f')
+    ax.contour(r2dz_axis, r2yz_axis, grid, levels=[0], colors='red', linestyles='--', linewidths=1.5)
+    ax.scatter(benchmarks['r2dz'], benchmarks['r2yz'], color='red', marker='D')
+    for label, row in benchmarks.iterrows():
+        ax.annotate(f"{label} ({row['adjusted_estimate']:.3f})", (row['r2dz'], row['r2yz']), textcoords='offset points', xytext=(6, 6), fontsize=9)
+    ax.set_xlabel('교란 변수와 교육의 편결정계수 R²_dz')
+    ax.set_ylabel('교란 변수와 임금의 편결정계수 R²_yz')
+    ax.set_title('Model 4 educ 계수 민감도 (빨간 점선: 효과 0)')
+    sensitivity_path = os.path.join(image_dir, '3_ovb_sensitivity_contour.png')
+    fig.savefig(sensitivity_path)
+    plt.close(fig)
+    report_md += f"![OVB 민감도](./images/{os.path.basename(sensitivity_path)})\n\n"
+    report_md += "관측 공변량 IQ를 기준으로, 'IQ의 k배만큼 강한 교란 변수'가 있을 때의 조정 추정치입니다.\n\n"
+    report_md += benchmarks.round(4).to_markdown() + "\n\n"
+    report_md += f"**해석:** Model 4의 robustness value는 **{full_fit['rv_q']:.3f}**입니다. 즉 교육과 임금의 잔차 분산을 각각 {full_fit['rv_q'] * 100:.1f}% 이상 설명하는 교란 변수가 없다면 교육 효과는 0이 되지 않습니다. 위 표에서 IQ보다 몇 배 강한 교란 변수부터 추정치가 0에 가까워지는지 확인할 수 있습니다.\n\n"
+
     # --- 4단계: 다중 회귀 분석 ---
     report_md += "## 4. 다중 회귀 분석: 통제 변수 추가\n\n"
     report_md += "누락 변수 편향 문제를 완화하기 위해, 임금에 영향을 줄 수 있는 다른 변수들을 통제하여 다중 회귀 분석을 수행합니다.\n\n"
@@ -147,14 +194,15 @@ def main():
     # --- 5단계: 모델별 educ 계수 비교표 작성 ---
     report_md += "## 5. 모델별 교육(educ) 계수 비교\n\n"
     
-    # 계수 비교 데이터프레임 생성
-    coef_comparison = pd.DataFrame({
-        'Model': ['Model 1: Simple', 'Model 2: + IQ', 'Model 3: + Career', 'Model 4: Full'],
-        'educ_coefficient': [model1.params['educ'], model2.params['educ'], model3.params['educ'], model4.params['educ']],
-        'R-squared': [model1.rsquared, model2.rsquared, model3.rsquared, model4.rsquared]
-    }).set_index('Model')
+    # 계수 비교 데이터프레임 생성 (3단계에서 만든 ols_engine의 공유 Gram 행렬로 모든 spec 적합)
+    coef_comparison = ols_engine.fit_many(MODEL_SPECS, treatment='educ')[['educ_coefficient', 'std_err', 'R-squared']]
+
+    # DML: Model 4 통제 변수를 비선형(gradient boosting) nuisance 모델로 통제, fold별 병렬 cross-fitting
+    dml = dml_effect(df, outcome='lhwage', treatment='educ', controls=MODEL_SPECS['Model 4: Full'][1:])
+    coef_comparison.loc[f'DML: Full (cross-fit, K={N_FOLDS})'] = [dml['coefficient'], dml['std_err'], np.nan]
     
     report_md += coef_comparison.to_markdown() + "\n\n"
+    report_md += f"- DML: Model 4와 같은 통제 변수를 선형식 대신 gradient boosting으로 통제한 직교화(orthogonalized) 추정치입니다. (meduc / feduc 결측 행도 제외하지 않고 사용) 95% 신뢰구간 [{dml['ci_lower']:.4f}, {dml['ci_upper']:.4f}], nuisance 모델 설명력(교차 적합 R²) 임금 {dml['outcome_r2']:.3f} / 교육 {dml['treatment_r2']:.3f}, 소요 시간 {dml['seconds']:.2f}초\n\n"
     
     # 계수 변화 시각화
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -168,6 +216,35 @@ def main():
     report_md += f"![계수 변화](./images/{os.path.basename(coef_plot_path)})\n\n"
     report_md += "**해석:** 통제 변수가 추가될수록 `educ`의 계수가 점차 감소하는 것을 명확히 확인할 수 있습니다. 이는 초기에 관찰된 교육과 임금의 강한 상관관계가 다른 변수들(특히 IQ와 경력)에 의해 부풀려졌음을 의미합니다. 즉, 누락 변수 편향이 양(+)의 방향으로 작용했음을 알 수 있습니다.\n\n"
 
+    # 재표본 추론 (bootstrap 신뢰구간 + permutation 검정, process pool 병렬)
+    resampled, timing = resample_inference(df, MODEL_SPECS, outcome='lhwage', treatment='educ')
+    report_md += "### 재표본 추론: bootstrap 신뢰구간과 permutation 검정\n"
+    report_md += f"분석적 표준오차(OLS 가정)에 더해, 모델별로 bootstrap {N_BOOT:,}회(95% 백분위 신뢰구간)와 잔차 permutation {N_PERM:,}회(Freedman–Lane) 검정을 수행했습니다.\n\n"
+    report_md += resampled.round(4).to_markdown() + "\n\n"
+    report_md += f"- 소요 시간: bootstrap {timing['bootstrap']:.2f}초, permutation {timing['permutation']:.2f}초\n\n"
+    report_md += "**해석:** bootstrap 표준오차가 분석적 표준오차와 비슷하다면 OLS 표준오차 가정(등분산 등)이 크게 어긋나지 않는다는 뜻입니다. permutation p-value는 `educ`와 임금 사이에 관계가 없다는 귀무가설 하에서 관측된 t 통계량 이상이 나올 확률입니다.\n\n"
+
+    # 통제 변수 조합 전체(specification curve)
+    spec_curve = ols_engine.fit_many(control_subsets(CONTROLS), treatment='educ').sort_values('educ_coefficient')
+    report_md += "### 통제 변수 조합별 educ 계수 (Specification Curve)\n"
+    report_md += f"통제 변수 후보({', '.join(CONTROLS)})의 모든 조합 {len(spec_curve)}개를 적합해 `educ` 계수의 분포를 확인합니다. (결측이 있는 변수를 포함한 spec은 해당 행을 제외하고 적합)\n\n"
+    
+    fig, ax = plt.subplots(figsize=(12, 6))
+    positions = np.arange(len(spec_curve))
+    ax.errorbar(positions, spec_curve['educ_coefficient'], yerr=1.96 * spec_curve['std_err'], fmt='o', color='steelblue', ecolor='lightgray', capsize=2)
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(spec_curve.index, rotation=90, fontsize=7)
+    ax.set_title('통제 변수 조합별 educ 계수 (95% 신뢰구간)')
+    ax.set_ylabel('educ 계수 (Coefficient)')
+    plt.tight_layout()
+    spec_curve_path = os.path.join(image_dir, '5_specification_curve.png')
+    fig.savefig(spec_curve_path)
+    plt.close(fig)
+    report_md += f"![Specification Curve](./images/{os.path.basename(spec_curve_path)})\n\n"
+    report_md += spec_curve.round(4).to_markdown() + "\n\n"
+    report_md += f"**해석:** 통제 변수 조합에 따라 `educ` 계수는 **{spec_curve['educ_coefficient'].min():.4f}** ~ **{spec_curve['educ_coefficient'].max():.4f}** 범위에 있습니다. 범위가 좁을수록 교육 효과 추정치가 통제 변수 선택에 덜 민감하다는 뜻입니다.\n\n"
+
     # --- 6단계: 인과적 해석 결론 작성 ---
     report_md += "## 6. 결론: 인과적 해석\n\n"
     report_md += "단순 회귀 분석에서 교육 1년의 임금 상승 효과는 약 **9.75%**로 나타났지만, 이는 다른 요인들의 영향이 혼재된 결과입니다.\n\n"
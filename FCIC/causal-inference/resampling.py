@@ -0,0 +1,215 @@
+"""
+educ 계수의 재표본 추론: bootstrap 신뢰구간 + permutation 검정 (병렬)
+
+모든 replicate를 (replicate × 행) 행렬 연산으로 한 번에 적합한다. replicate별로 회귀를 다시 돌리지 않는다.
+
+- bootstrap: 복원추출 index → 행별 추출 횟수 행렬 W (B × n)
+    z = [1, 회귀변수..., 결과]의 외적 항 O (n × p(p+1)/2)를 한 번 만들고
+    W @ O 한 번으로 B개 Gram 행렬을 얻은 뒤 spec별 부분 블록을 batched solve
+    → 결측 패턴이 같은 spec(같은 표본)은 같은 replicate / Gram을 공유
+- permutation (Freedman–Lane): 통제 변수만의 축소 모델 잔차를 섞어 y* = ŷ₀ + e₀[π]
+    X는 고정이므로 (XᵀX)⁻¹ 한 번 + replicate마다 Xᵀe₀[π]만 계산
+    → 같은 표본의 spec은 permutation을 공유 (spec 잔차를 함께 섞어 설계 행렬과 한 번에 곱함)
+- 병렬: replicate를 TASK_REPLICATES 단위 task로 나눠 process pool에서 실행
+    task별 seed = SeedSequence(seed).spawn() → worker 수와 무관하게 결과 동일
+- 메모리: 한 번에 CHUNK_CELLS(replicate × 행)만 만듦 → 백만 행 데이터도 chunk 단위로 처리
+
+사용 예)
+    table, timing = resample_inference(df, MODEL_SPECS, outcome='lhwage', treatment='educ')
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_ols import BatchOLS
+
+N_BOOT = 2000
+N_PERM = 2000
+TASK_REPLICATES = 250
+CHUNK_CELLS = 10_000_000  # 한 번에 만드는 (replicate × 행) 원소 수 상한
+SEED = 42
+
+_DATA = {}  # worker 공유 데이터 (process pool initializer로 1회 전달)
+
+
+def _init_worker(data):
+    _DATA.clear()
+    _DATA.update(data)
+
+
+def _chunks(n_replicates, n_rows):
+    size = max(1, min(n_replicates, CHUNK_CELLS // max(n_rows, 1)))
+    for start in range(0, n_replicates, size):
+        yield min(size, n_replicates - start)
+
+
+# ======================================================
+# 1. 표본 준비
+# ======================================================
+def _sample_groups(df, specs, outcome):
+    """결측 패턴(listwise 삭제 후 표본)이 같은 spec끼리 묶습니다. 반환: {그룹 key: (컬럼 목록, spec 이름 목록)}"""
+    missing = {c for c in {outcome, *[r for regs in specs.values() for r in regs]} if df[c].isna().any()}
+    groups = {}
+    for name, regressors in specs.items():
+        key = tuple(sorted(missing & set(regressors)))
+        cols, names = groups.setdefault(key, ([], []))
+        cols.extend(c for c in regressors if c not in cols)
+        names.append(name)
+    return groups
+
+
+def _design(df, cols, outcome, rows_cols):
+    """[1, cols..., outcome] 행렬 (표본 평균으로 중심화, 절편 열 제외)"""
+    data = df[list(cols) + [outcome]]
+    data = data[df[list(rows_cols) + [outcome]].notna().all(axis=1)].to_numpy(dtype='float64')
+    data = data - data.mean(axis=0)
+    return np.column_stack([np.ones(len(data)), data])
+
+
+# ======================================================
+# 2. bootstrap (worker task)
+# ======================================================
+def _bootstrap_task(group, positions, n_replicates, seed):
+    """group 표본에서 n_replicates개 bootstrap 계수를 계산합니다. 반환: (spec 수 × replicate) 배열"""
+    z, outer, (iu, ju) = _DATA[group]
+    n, p = z.shape
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in _chunks(n_replicates, n):
+        idx = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+        counts = np.bincount(idx.ravel(), minlength=size * n).reshape(size, n).astype('float64')
+        flat = counts @ outer
+        gram = np.empty((size, p, p))
+        gram[:, iu, ju] = flat
+        gram[:, ju, iu] = flat
+        coefs = []
+        for cols, target in positions:
+            a = gram[:, cols][:, :, cols]
+            b = gram[:, cols, -1]
+            coefs.append(np.linalg.solve(a, b[..., None])[:, target, 0])
+        results.append(np.array(coefs))
+    return np.concatenate(results, axis=1)
+
+
+# ======================================================
+# 3. permutation (worker task)
+# ======================================================
+def _permutation_task(group, n_replicates, seed):
+    """
+    Freedman–Lane 잔차 permutation으로 group 내 spec별 처치 t 통계량을 계산합니다.
+
+    replicate마다 permutation 하나로 모든 spec 잔차를 함께 섞어 설계 행렬과 곱함 (E[:, π] @ z)
+    반환: (spec 수 × replicate) 배열
+    """
+    z, resid, specs = _DATA[group]
+    n = len(z)
+    rng = np.random.default_rng(seed)
+    cross = np.empty((n_replicates, len(resid), z.shape[1]))
+    for r in range(n_replicates):
+        cross[r] = np.take(resid, rng.permutation(n), axis=1) @ z
+    results = []
+    for s, (cols, reduced, gamma, gram_inv, target, xty_fitted, ff, ee) in enumerate(specs):
+        xty = cross[:, s, cols] + xty_fitted
+        yy = ff + 2 * cross[:, s, reduced] @ gamma + ee
+        beta = xty @ gram_inv
+        rss = yy - (beta * xty).sum(axis=1)
+        se = np.sqrt(gram_inv[target, target] * np.maximum(rss, 0) / (n - len(cols)))
+        results.append(beta[:, target] / se)
+    return np.array(results)
+
+
+def _permutation_data(z, positions):
+    """spec별 축소 모델(처치 제외) 적합값·잔차와 (XᵀX)⁻¹ 등 permutation 통계량 재료"""
+    y = z[:, -1]
+    resid, specs = [], []
+    for cols, target in positions:
+        reduced = [c for i, c in enumerate(cols) if i != target]
+        x, x0 = z[:, cols], z[:, reduced]
+        gamma = np.linalg.solve(x0.T @ x0, x0.T @ y)
+        fitted = x0 @ gamma
+        resid.append(y - fitted)
+        specs.append((cols, reduced, gamma, np.linalg.inv(x.T @ x), target,
+                      x.T @ fitted, fitted @ fitted, resid[-1] @ resid[-1]))
+    return z, np.array(resid), specs
+
+
+# ======================================================
+# 4. 실행
+# ======================================================
+def _run(tasks, data, workers):
+    """(함수, 인자) task 목록을 실행합니다. workers <= 1이면 메인 프로세스에서 순차 실행."""
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        _init_worker(data)
+        return [fn(*args) for fn, args in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(fn, *args) for fn, args in tasks]
+        return [f.result() for f in futures]
+
+
+def _collect(tasks, data, workers):
+    """(spec 이름 목록, 함수, 인자) task를 실행해 spec별 replicate 결과를 이어 붙입니다. 반환: ({spec: 배열}, 초)"""
+    start = time.perf_counter()
+    results = _run([(fn, args) for _, fn, args in tasks], data, workers)
+    draws = {}
+    for (names, _, _), values in zip(tasks, results):
+        for name, v in zip(names, values):
+            draws.setdefault(name, []).append(v)
+    return {name: np.concatenate(v) for name, v in draws.items()}, time.perf_counter() - start
+
+
+def _task_sizes(n_replicates):
+    return [min(TASK_REPLICATES, n_replicates - s) for s in range(0, n_replicates, TASK_REPLICATES)]
+
+
+def resample_inference(df, specs, outcome='lhwage', treatment='educ', n_boot=N_BOOT, n_perm=N_PERM,
+                       alpha=0.05, workers=None, seed=SEED):
+    """
+    spec마다 처치 계수의 bootstrap 신뢰구간과 permutation p-value를 계산합니다.
+
+    specs: {spec 이름: [회귀변수, ...]} (treatment 포함, batch_ols와 같은 형식)
+    반환: (table, timing)
+        table: index = spec 이름, columns = [{treatment}_coefficient, analytic_se, bootstrap_se,
+               ci_lower, ci_upper, permutation_p_value]
+        timing: {'bootstrap': 초, 'permutation': 초}
+    """
+    fit = BatchOLS(df, outcome, list(dict.fromkeys(r for regs in specs.values() for r in regs)))
+    groups = _sample_groups(df, specs, outcome)
+    n_tasks = len(groups) * (len(_task_sizes(n_boot)) + len(_task_sizes(n_perm)))
+    seeds = iter(np.random.SeedSequence(seed).spawn(n_tasks))
+
+    # 표본(그룹)마다 설계 행렬을 한 번 만들고 bootstrap replicate / permutation을 공유
+    boot_data, perm_data, boot_tasks, perm_tasks = {}, {}, [], []
+    for key, (cols, names) in groups.items():
+        z = _design(df, cols, outcome, key)
+        iu, ju = np.triu_indices(z.shape[1])
+        positions = [([0] + [1 + cols.index(r) for r in specs[name]], 1 + specs[name].index(treatment))
+                     for name in names]
+        boot_data[key] = (z, z[:, iu] * z[:, ju], (iu, ju))
+        perm_data[key] = _permutation_data(z, positions)
+        boot_tasks += [(names, _bootstrap_task, (key, positions, size, next(seeds))) for size in _task_sizes(n_boot)]
+        perm_tasks += [(names, _permutation_task, (key, size, next(seeds))) for size in _task_sizes(n_perm)]
+
+    boot, boot_seconds = _collect(boot_tasks, boot_data, workers)
+    perm, perm_seconds = _collect(perm_tasks, perm_data, workers)
+
+    rows = {}
+    for name, regressors in specs.items():
+        res = fit.fit(regressors)
+        coef, se = res['params'][treatment], res['bse'][treatment]
+        draws, t_perm = boot[name], perm[name]
+        rows[name] = {
+            f'{treatment}_coefficient': coef,
+            'analytic_se': se,
+            'bootstrap_se': draws.std(ddof=1),
+            'ci_lower': np.quantile(draws, alpha / 2),
+            'ci_upper': np.quantile(draws, 1 - alpha / 2),
+            'permutation_p_value': (1 + (np.abs(t_perm) >= abs(coef / se)).sum()) / (1 + len(t_perm)),
+        }
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'Model'
+    return table, {'bootstrap': boot_seconds, 'permutation': perm_seconds}
@@ -0,0 +1,121 @@
+"""
+누락 변수 편향(OVB) 민감도 분석 (Cinelli & Hazlett, 2020)
+
+관측되지 않은 교란 변수 Z의 강도를 두 편결정계수로 표현한다.
+    R²_dz = R²(educ ~ Z | X),  R²_yz = R²(lhwage ~ Z | educ, X)
+이미 적합한 모델의 추정치 / 표준오차 / 잔차 자유도만으로 닫힌 식으로 계산한다 (회귀 재적합 없음).
+
+    |bias| = se · √(df · R²_yz · R²_dz / (1 - R²_dz))
+    조정 추정치 = |β| - |bias|  (효과를 0 쪽으로 줄이는 방향)
+    조정 se    = se · √((1 - R²_yz) / (1 - R²_dz) · df / (df - 1))
+    robustness value RV_q: R²_dz = R²_yz = RV인 교란 변수가 추정치를 q × 100% 줄임
+        f_q = q · |t| / √df,   RV_q = ½ (√(f_q⁴ + 4 f_q²) - f_q²)
+        RV_q,α: f_q 대신 f_q - t*(α, df - 1) / √(df - 1) → 유의성이 사라지는 강도
+
+- 격자 전체(R²_dz × R²_yz)를 numpy broadcasting으로 한 번에 계산
+- 관측 공변량 benchmark: "Z가 IQ의 k배만큼 강하다면" 경계 (sensemakr의 ovb_partial_r2_bound와 같은 식)
+
+사용 예)
+    table = sensitivity_table(ols_engine, MODEL_SPECS, treatment='educ')
+    grid = adjusted_estimate_grid(estimate, se, dof)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+GRID_SIZE = 200
+GRID_MAX = 0.4    # 격자 기본 상한 (benchmark가 더 크면 확장)
+BENCHMARK_MULTIPLES = (1, 2, 3)
+
+
+def partial_r2(t, dof):
+    """t 통계량 → 편결정계수 R²(y ~ 변수 | 나머지)"""
+    t = np.asarray(t, dtype='float64')
+    return t ** 2 / (t ** 2 + dof)
+
+
+def robustness_value(t, dof, q=1.0, alpha=None):
+    """추정치를 q × 100% 줄이는(alpha 지정 시 유의성을 없애는) 교란 변수의 최소 강도 RV"""
+    f = q * np.abs(np.asarray(t, dtype='float64')) / np.sqrt(dof)
+    if alpha is not None:
+        f = np.maximum(f - stats.t.ppf(1 - alpha / 2, dof - 1) / np.sqrt(dof - 1), 0)
+    return 0.5 * (np.sqrt(f ** 4 + 4 * f ** 2) - f ** 2)
+
+
+def bias(se, dof, r2dz, r2yz):
+    """교란 변수 강도(R²_dz, R²_yz)에 따른 |편향| (배열 broadcasting)"""
+    r2dz, r2yz = np.asarray(r2dz, dtype='float64'), np.asarray(r2yz, dtype='float64')
+    return se * np.sqrt(dof * r2yz * r2dz / (1 - r2dz))
+
+
+def adjusted_estimate(estimate, se, dof, r2dz, r2yz):
+    """교란 변수를 통제했다면 얻었을 추정치 (효과 크기를 줄이는 방향)"""
+    return np.sign(estimate) * (np.abs(estimate) - bias(se, dof, r2dz, r2yz))
+
+
+def adjusted_t(estimate, se, dof, r2dz, r2yz):
+    """조정 추정치의 t 통계량"""
+    r2dz, r2yz = np.asarray(r2dz, dtype='float64'), np.asarray(r2yz, dtype='float64')
+    adj_se = se * np.sqrt((1 - r2yz) / (1 - r2dz) * dof / (dof - 1))
+    return adjusted_estimate(estimate, se, dof, r2dz, r2yz) / adj_se
+
+
+def benchmark_bounds(r2dxj, r2yxj, kd=BENCHMARK_MULTIPLES, ky=None):
+    """
+    관측 공변량 Xj의 k배 강도를 가진 교란 변수의 (R²_dz, R²_yz) 경계.
+
+    r2dxj: R²(treatment ~ Xj | 나머지 X),  r2yxj: R²(outcome ~ Xj | treatment, 나머지 X)
+    반환: DataFrame[kd, ky, r2dz, r2yz]
+    """
+    kd = np.asarray(kd, dtype='float64')
+    ky = kd if ky is None else np.asarray(ky, dtype='float64')
+    r2dz = kd * r2dxj / (1 - r2dxj)
+    r2zxj = kd * r2dxj ** 2 / ((1 - kd * r2dxj) * (1 - r2dxj))
+    r2yz = ((np.sqrt(ky) + np.sqrt(r2zxj)) / np.sqrt(1 - r2zxj)) ** 2 * r2yxj / (1 - r2yxj)
+    return pd.DataFrame({'kd': kd, 'ky': ky, 'r2dz': r2dz, 'r2yz': np.minimum(r2yz, 1.0)})
+
+
+def adjusted_estimate_grid(estimate, se, dof, lim=GRID_MAX, size=GRID_SIZE):
+    """R²_dz × R²_yz 격자의 조정 추정치. 반환: (r2dz 축, r2yz 축, 추정치 행렬[r2yz, r2dz])"""
+    axis = np.linspace(0, min(lim, 0.99), size)
+    return axis, axis, adjusted_estimate(estimate, se, dof, axis[None, :], axis[:, None])
+
+
+def sensitivity_table(engine, specs, treatment='educ', q=1.0, alpha=0.05):
+    """
+    spec별 민감도 요약 (batch_ols.BatchOLS 적합 결과 재사용).
+
+    반환: index = spec 이름, columns = [estimate, std_err, t, dof, r2yd_x, rv_q, rv_qa]
+        r2yd_x: 처치가 설명하는 결과 잔차 분산 비율 (교란 변수가 R²_yz = 1이어도 이보다 약한 R²_dz로는 효과를 없앨 수 없음)
+    """
+    rows = {}
+    for name, regressors in specs.items():
+        res = engine.fit(regressors)
+        est, se, dof = res['params'][treatment], res['bse'][treatment], res['df_resid']
+        t = est / se
+        rows[name] = {
+            'estimate': est,
+            'std_err': se,
+            't': t,
+            'dof': dof,
+            'r2yd_x': float(partial_r2(t, dof)),
+            'rv_q': float(robustness_value(t, dof, q)),
+            'rv_qa': float(robustness_value(t, dof, q, alpha)),
+        }
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'Model'
+    return table
+
+
+def spec_benchmarks(engine, regressors, benchmark, treatment='educ', kd=BENCHMARK_MULTIPLES):
+    """spec에 포함된 관측 공변량(benchmark)의 k배 강도 교란 변수 경계와 그때의 조정 추정치"""
+    res = engine.fit(regressors)
+    est, se, dof = res['params'][treatment], res['bse'][treatment], res['df_resid']
+    r2dxj = engine.partial_r2_with(regressors, treatment)[benchmark]
+    r2yxj = float(partial_r2(res['params'][benchmark] / res['bse'][benchmark], dof))
+    bounds = benchmark_bounds(r2dxj, r2yxj, kd)
+    bounds['adjusted_estimate'] = adjusted_estimate(est, se, dof, bounds['r2dz'], bounds['r2yz'])
+    bounds['adjusted_t'] = adjusted_t(est, se, dof, bounds['r2dz'], bounds['r2yz'])
+    bounds.index = [f'{k:g}x {benchmark}' for k in bounds['kd']]
+    return bounds
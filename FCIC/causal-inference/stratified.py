@@ -0,0 +1,112 @@
+"""
+층화(Stratification) 추정 엔진: 교란 변수 층별 / 통합 교육 효과
+
+층(stratum) = 교란 변수 값 조합. 층마다 frame을 필터링해 회귀하는 대신,
+층 key로 한 번 groupby 해서 충분통계량(n, Σx, Σy, Σx², Σxy, Σy²)만 모으고
+층별 기울기(educ 1년당 결과 변화)와 표준오차를 벡터 연산으로 계산한다.
+
+    β_s   = Sxy / Sxx                        (층 내 단순회귀 기울기)
+    se_s² = (Syy - β_s·Sxy) / (n_s - 2) / Sxx
+    통합: 역분산 가중  Σ w_s β_s / Σ w_s,  w_s = 1 / se_s²   (se = √(1 / Σ w_s))
+          크기 가중    Σ n_s β_s / Σ n_s                    (se = √Σ (n_s / N)² se_s²)
+
+- 교란 변수: 이산 컬럼은 값 그대로, 연속 컬럼은 구간(bins) 또는 분위(정수 q)로 나눔
+- 층 내 educ 변동이 없거나 n < min_size(기본 MIN_STRATUM)이면 효과를 NaN으로 두고 통합에서 제외
+- 여러 교란 변수 조합(spec)을 run_specs()로 한 번에 비교
+
+사용 예)
+    strata = stratified_effects(df, ['exper', 'married'], bins={'exper': [0, 5, 10, 15, 20, 24]})
+    pooled = pool_effects(strata)
+"""
+
+import numpy as np
+import pandas as pd
+
+TREATMENT = 'educ'
+OUTCOME = 'wage'
+MIN_STRATUM = 10  # 이보다 작은 층은 잔차 자유도가 작아 se가 불안정 → 역분산 가중을 왜곡
+
+
+def stratum_keys(df, confounders, bins=None):
+    """교란 변수 → 층 key 컬럼 DataFrame. bins: {컬럼: 구간 경계 목록 | 분위 수(int)}"""
+    bins = bins or {}
+    keys = {}
+    for col in confounders:
+        spec = bins.get(col)
+        if spec is None:
+            keys[col] = df[col]
+        elif isinstance(spec, int):
+            keys[col] = pd.qcut(df[col], q=spec, duplicates='drop')
+        else:
+            keys[col] = pd.cut(df[col], bins=spec, right=False)
+    return pd.DataFrame(keys, index=df.index)
+
+
+def stratified_effects(df, confounders, bins=None, treatment=TREATMENT, outcome=OUTCOME,
+                       min_size=MIN_STRATUM):
+    """
+    층별 educ 효과(층 내 회귀 기울기)를 한 번의 groupby로 계산합니다.
+
+    반환: index = 층 key, columns = [n, effect, se, treatment_mean, outcome_mean]
+    """
+    data = df[[treatment, outcome]].dropna()
+    x = data[treatment].astype('float64')
+    y = data[outcome].astype('float64')
+    stats = pd.DataFrame({'n': 1.0, 'sx': x, 'sy': y, 'sxx': x * x, 'sxy': x * y, 'syy': y * y}, index=data.index)
+
+    keys = stratum_keys(df.loc[data.index], confounders, bins)
+    if confounders:
+        sums = stats.groupby([keys[c] for c in confounders], observed=True).sum()
+    else:
+        sums = stats.sum().to_frame('all').T
+
+    n = sums['n']
+    sxx = sums['sxx'] - sums['sx'] ** 2 / n
+    sxy = sums['sxy'] - sums['sx'] * sums['sy'] / n
+    syy = sums['syy'] - sums['sy'] ** 2 / n
+    valid = (n >= min_size) & (sxx > 1e-12)
+    effect = (sxy / sxx).where(valid)
+    resid_var = ((syy - effect * sxy) / (n - 2)).clip(lower=0)
+    se = np.sqrt(resid_var / sxx).where(valid)
+
+    return pd.DataFrame({
+        'n': n.astype('int64'),
+        'effect': effect,
+        'se': se,
+        'treatment_mean': sums['sx'] / n,
+        'outcome_mean': sums['sy'] / n,
+    })
+
+
+def pool_effects(strata):
+    """층별 효과를 역분산 / 크기 가중으로 통합합니다."""
+    usable = strata.dropna(subset=['effect', 'se'])
+    usable = usable[usable['se'] > 0]
+    n_total = usable['n'].sum()
+
+    w = 1 / usable['se'] ** 2
+    ivw = (w * usable['effect']).sum() / w.sum()
+    size_w = usable['n'] / n_total
+    size = (size_w * usable['effect']).sum()
+
+    return pd.Series({
+        'ivw_effect': ivw,
+        'ivw_se': np.sqrt(1 / w.sum()),
+        'size_weighted_effect': size,
+        'size_weighted_se': np.sqrt((size_w ** 2 * usable['se'] ** 2).sum()),
+        'n_strata': len(strata),
+        'n_strata_used': len(usable),
+        'n_used': int(n_total),
+    })
+
+
+def run_specs(df, specs, bins=None, treatment=TREATMENT, outcome=OUTCOME, min_size=MIN_STRATUM):
+    """
+    여러 교란 변수 조합의 통합 효과를 비교합니다.
+
+    specs: {spec 이름: [교란 변수, ...]}
+    반환: index = spec 이름, columns = pool_effects() 결과
+    """
+    rows = {name: pool_effects(stratified_effects(df, confounders, bins, treatment, outcome, min_size))
+            for name, confounders in specs.items()}
+    return pd.DataFrame(rows).T
@@ -0,0 +1,83 @@
+"""
+HyperLogLog distinct count (벡터화, 병합 가능)
+
+주문 수 / 고객 수처럼 고유 id 개수는 주차별 값을 더해도 월별 값이 되지 않는다.
+id를 64bit hash → 2^p개 register의 최대 rank로 요약해 두면 register별 max로 병합할 수 있어
+기간 / 차원 roll-up을 원천 재스캔 없이 계산할 수 있다.
+
+- sketch는 희소 표현: (셀 key..., reg, rank) 행, 같은 (셀, reg)는 최대 rank 1행만 유지
+  → 셀에 id가 적으면 register 수(2^p)보다 훨씬 작고, 그대로 DataFrame / 파일로 저장 가능
+- 상대 표준오차 ≈ 1.04 / √(2^p)  (p=12: 약 1.6%)
+- hash는 pandas.util.hash_array (고정 key) → 실행 / 파일 간 sketch 병합 가능
+"""
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 12
+Z_95 = 1.96
+
+
+def relative_error(p=HLL_PRECISION):
+    """HyperLogLog 상대 표준오차"""
+    return 1.04 / np.sqrt(2 ** p)
+
+
+def hash_ids(values):
+    """id 배열 → uint64 hash (결측은 제외하고 호출)"""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _leading_zeros(w):
+    """uint64 배열의 leading zero 수 (이진 탐색 6단계, 0은 64)"""
+    w = w.copy()
+    n = np.zeros(len(w), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_zero = w < np.uint64(1 << (64 - shift))
+        n += top_zero * shift
+        w = np.where(top_zero, w << np.uint64(shift), w)
+    return np.where(w == 0, 64, n)
+
+
+def register_ranks(hashes, p=HLL_PRECISION):
+    """hash → (register 번호, rank). 상위 p bit = register, 나머지 bit의 첫 1 위치 = rank"""
+    reg = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rank = np.minimum(_leading_zeros(hashes << np.uint64(p)) + 1, 64 - p + 1)
+    return reg, rank.astype(np.int8)
+
+
+def build_sketch(keys, ids, p=HLL_PRECISION):
+    """
+    셀별 sketch를 만듭니다.
+
+    keys: 셀 key 컬럼 DataFrame (ids와 같은 길이), ids: id 배열 (결측 행은 무시)
+    반환: DataFrame[*keys, reg, rank]
+    """
+    ids = pd.Series(np.asarray(ids, dtype=object))
+    valid = ids.notna().to_numpy()
+    reg, rank = register_ranks(hash_ids(ids[valid].to_numpy()), p)
+    cells = keys.reset_index(drop=True)[valid].reset_index(drop=True)
+    return merge_sketch(cells.assign(reg=reg, rank=rank), list(keys.columns))
+
+
+def merge_sketch(sketch, by):
+    """by 셀 단위로 병합 (register별 최대 rank). by를 바꿔 호출하면 roll-up."""
+    return sketch.groupby([*by, 'reg'], observed=True, sort=False)['rank'].max().reset_index()
+
+
+def estimate(sketch, by, p=HLL_PRECISION):
+    """셀별 distinct 추정값 (small range는 linear counting 보정)"""
+    m = 2 ** p
+    merged = merge_sketch(sketch, by)
+    merged['inv'] = np.exp2(-merged['rank'].astype('float64'))
+    agg = merged.groupby(by, observed=True).agg(inv=('inv', 'sum'), used=('reg', 'size'))
+    zeros = m - agg['used']
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / (agg['inv'] + zeros)
+    linear = m * np.log(m / zeros.where(zeros > 0))
+    return raw.where((raw > 2.5 * m) | (zeros == 0), linear)
+
+
+def error_bound(estimates, p=HLL_PRECISION, z=Z_95):
+    """추정값의 신뢰 구간 반폭 (기본 95%)"""
+    return estimates * relative_error(p) * z
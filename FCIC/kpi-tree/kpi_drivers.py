@@ -0,0 +1,100 @@
+"""
+KPI Tree 변동 요인 분해 (driver attribution)
+
+직전 기간 대비 l0_total_payment 변화량을 KPI Tree 말단 지표별 기여도로 나눈다.
+
+    Δ l0 = Δ 상품 매출 + Δ 배송비 매출 + Δ 잔차(할부 이자 등 l0 - l1 합)
+    상품 매출 = 고객 수 × 고객당 주문 수 × 주문당 상품 매출
+      → 곱 노드는 LMDI(로그 평균 Divisia) 분해:
+         factor 기여도 = L(y1, y0) × ln(x1 / x0),  L(a, b) = (a - b) / (ln a - ln b)
+         (factor 기여도 합 = Δ 상품 매출, 순서 무관)
+
+- 모든 기간 × 차원 slice를 shift / log 연산으로 한 번에 계산 (slice별 반복 없음)
+- 직전 기간 = 같은 slice에서 바로 앞에 존재하는 기간
+- 0 값은 ZERO_FLOOR로 대체해 로그를 계산하고, 분해되지 않은 차이는 '{노드}_residual'로 남긴다
+
+사용 예)
+    kpi = KPITreeEngine(df, dims=['customer_state']).compute('W')
+    drivers = attribute_changes(kpi)
+"""
+
+import numpy as np
+import pandas as pd
+
+ROOT = 'l0_total_payment'
+ZERO_FLOOR = 1e-9
+
+# 노드 → (연산, 하위 노드). 하위 노드가 다시 DRIVER_TREE에 있으면 재귀 분해
+DRIVER_TREE = {
+    'l0_total_payment': ('add', ['l1_product_revenue', 'l1_freight_revenue']),
+    'l1_product_revenue': ('mul', ['l3_total_unique_customers', 'l3_avg_orders_per_customer',
+                                   'l2_avg_product_revenue_per_order']),
+}
+
+
+def log_mean(a, b):
+    """로그 평균 L(a, b) (a == b이면 a)"""
+    a, b = np.maximum(a, ZERO_FLOOR), np.maximum(b, ZERO_FLOOR)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lm = (a - b) / (np.log(a) - np.log(b))
+    return np.where(np.isclose(a, b), a, lm)
+
+
+def previous_period(kpi):
+    """같은 차원 slice의 직전 기간 값 (index 첫 level = 기간, 나머지 = 차원)"""
+    kpi = kpi.sort_index()
+    dims = list(kpi.index.names[1:])
+    return kpi, (kpi.groupby(level=dims, observed=True).shift(1) if dims else kpi.shift(1))
+
+
+def _decompose(prev, cur, node, tree, effects):
+    """node 변화량을 말단 기여도 / 잔차로 나눠 effects에 기록합니다. 반환: node 변화량"""
+    op, children = tree[node]
+    delta = cur[node] - prev[node]
+    if op == 'add':
+        explained = 0
+        for c in children:
+            if c in tree:
+                explained = explained + _decompose(prev, cur, c, tree, effects)
+            else:
+                explained = explained + _leaf(effects, c, cur[c] - prev[c])
+    elif op == 'mul':
+        weight = log_mean(cur[node].to_numpy(), prev[node].to_numpy())
+        explained = 0
+        for c in children:
+            ratio = np.maximum(cur[c], ZERO_FLOOR) / np.maximum(prev[c], ZERO_FLOOR)
+            explained = explained + _leaf(effects, c, weight * np.log(ratio))
+    else:
+        raise ValueError(f"지원하지 않는 분해 연산입니다: {op}")
+    effects[f'{node}_residual'] = delta - explained
+    return delta
+
+
+def _leaf(effects, name, value):
+    effects[f'{name}_effect'] = effects.get(f'{name}_effect', 0) + value
+    return value
+
+
+def attribute_changes(kpi, root=ROOT, tree=DRIVER_TREE):
+    """
+    기간 × 차원 slice별 root 변화량과 말단 지표 기여도를 계산합니다.
+
+    kpi: KPITreeEngine.compute() 결과
+    반환: index = kpi index (각 slice의 첫 기간 제외),
+          columns = [root_prev, root, root_delta, '{말단}_effect'..., '{노드}_residual'..., main_driver]
+    """
+    cur, prev = previous_period(kpi)
+    has_prev = prev[root].notna()
+    cur, prev = cur[has_prev], prev[has_prev]
+
+    effects = {}
+    delta = _decompose(prev, cur, root, tree, effects)
+    # 말단 기여도 + 노드별 잔차 = root 변화량 (root 잔차 = l0 - l1 합의 변화)
+    effect_cols = {k: v for k, v in effects.items() if k.endswith('_effect')}
+    residual_cols = {k: v for k, v in effects.items() if k.endswith('_residual')}
+
+    result = pd.DataFrame({f'{root}_prev': prev[root], root: cur[root], f'{root}_delta': delta,
+                           **effect_cols, **residual_cols}, index=cur.index)
+    drivers = result[list(effect_cols)]
+    result['main_driver'] = drivers.abs().idxmax(axis=1).str.removesuffix('_effect').where(drivers.notna().any(axis=1))
+    return result
@@ -0,0 +1,173 @@
+"""
+KPI Tree 엔진 (선언형 트리 정의 + 벡터화 집계)
+
+kpi_tree_detailed_design.md의 KPI Tree를 노드 목록으로 선언하고, 모든 노드를 한 번에 계산한다.
+
+    L0 총 결제액
+    └ L1 상품 매출 + 배송비 매출
+       └ L2 주문 수 × 주문당 상품 매출 (AOV)
+          └ L3 고객 수 × 고객당 주문 수 (구매 빈도)
+
+- 원천 데이터는 생성 시 1회만 스캔: (일, 차원)별 합계 + (일, 차원, id) distinct 쌍
+- 기간 단위(D/W/M/Q) / 차원(customer_state 등) roll-up은 위 압축 상태에서 계산
+  → 모든 기간 단위를 다시 계산해도 원천 데이터 재스캔 없음
+- 기간 구분은 벡터화 (주: 월요일 시작, 기존 to_period('W').start_time과 동일)
+- distinct='hll': 주문 / 고객 수를 HyperLogLog sketch(hll.py)로 근사
+  → 일 단위 sketch를 병합해 roll-up, 노드마다 '{노드}_error'(95% 오차 범위) 컬럼 추가
+
+사용 예)
+    engine = KPITreeEngine(df, dims=['customer_state'])
+    weekly = engine.compute('W', dims=[])                 # 전체 주차별
+    monthly_by_state = engine.compute('M')                # 월 × 주(state)별
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from hll import HLL_PRECISION, build_sketch, estimate, error_bound
+
+TIME_COL = 'order_purchase_timestamp'
+
+# 기간 단위 → 결과 index 이름
+GRAINS = {
+    'D': 'date',
+    'W': 'week_start_date',
+    'M': 'month_start_date',
+    'Q': 'quarter_start_date',
+}
+
+# op: 'sum' / 'nunique' → 원천 컬럼 집계 (inputs = [컬럼])
+#     'add' / 'mul' / 'div' → 다른 노드 연산 (inputs = [노드, 노드])
+KPINode = namedtuple('KPINode', ['name', 'op', 'inputs'])
+
+KPI_TREE = [
+    KPINode('l0_total_payment', 'sum', ['payment_value_sum']),
+    KPINode('l1_product_revenue', 'sum', ['main_product_price']),
+    KPINode('l1_freight_revenue', 'sum', ['main_product_freight_value']),
+    KPINode('l2_total_orders', 'nunique', ['order_id']),
+    KPINode('l2_avg_product_revenue_per_order', 'div', ['l1_product_revenue', 'l2_total_orders']),
+    KPINode('l3_total_unique_customers', 'nunique', ['customer_unique_id']),
+    KPINode('l3_avg_orders_per_customer', 'div', ['l2_total_orders', 'l3_total_unique_customers']),
+]
+
+# 산술 관계 검증: 상위 노드 = 하위 노드 연산 (부동소수점 오차 감안)
+IDENTITIES = [
+    KPINode('l1_product_revenue', 'mul', ['l2_total_orders', 'l2_avg_product_revenue_per_order']),
+    KPINode('l2_total_orders', 'mul', ['l3_total_unique_customers', 'l3_avg_orders_per_customer']),
+]
+
+AGG_OPS = {'sum', 'nunique'}
+NODE_OPS = {
+    'add': np.add,
+    'mul': np.multiply,
+    'div': np.divide,
+}
+
+
+def time_bucket(ts, grain='W'):
+    """시각 → 기간 시작일 (벡터화). grain: 'D' / 'W'(월요일 시작) / 'M' / 'Q'"""
+    if grain not in GRAINS:
+        raise ValueError(f"지원하지 않는 기간 단위입니다: {grain} (사용 가능: {list(GRAINS)})")
+    day = ts.dt.normalize()
+    if grain == 'D':
+        return day
+    if grain == 'W':
+        return day - pd.to_timedelta(day.dt.dayofweek, unit='D')
+    return day.dt.to_period(grain).dt.start_time
+
+
+def evaluate_node(kpi, node):
+    """노드 연산(add/mul/div)을 KPI 컬럼에 적용합니다."""
+    left, right = (kpi[name] for name in node.inputs)
+    return NODE_OPS[node.op](left, right)
+
+
+def check_identities(kpi, identities=IDENTITIES):
+    """상위 노드 = 하위 노드 연산이 성립하는지 검증합니다. 실패한 노드 이름 목록을 반환."""
+    return [node.name for node in identities
+            if not np.allclose(kpi[node.name], evaluate_node(kpi, node), equal_nan=True)]
+
+
+class KPITreeEngine:
+    """원천 데이터를 1회 스캔해 두고, 기간 단위 / 차원 조합별 KPI Tree를 계산합니다."""
+
+    def __init__(self, df, tree=KPI_TREE, dims=(), time_col=TIME_COL, distinct='exact',
+                 hll_precision=HLL_PRECISION):
+        if distinct not in ('exact', 'hll'):
+            raise ValueError(f"distinct는 'exact' 또는 'hll'이어야 합니다: {distinct}")
+        self.tree = list(tree)
+        self.dims = list(dims)
+        self.distinct_method = distinct
+        self.hll_precision = hll_precision
+        unknown = [n.op for n in self.tree if n.op not in AGG_OPS and n.op not in NODE_OPS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 노드 연산입니다: {unknown}")
+
+        # 일 단위 code (고유 일자 목록 + 행별 위치)
+        day_codes, days = pd.factorize(pd.to_datetime(df[time_col]).dt.normalize(), sort=True)
+        self.days = pd.Series(days)
+        keys = pd.DataFrame({'day': day_codes, **{d: df[d].to_numpy() for d in self.dims}})
+        keys = keys[day_codes >= 0]  # 시각 결측 행 제외
+        by = ['day', *self.dims]
+
+        # sum 노드: (일, 차원)별 합계
+        sum_nodes = [n for n in self.tree if n.op == 'sum']
+        values = pd.DataFrame({n.name: df[n.inputs[0]].to_numpy() for n in sum_nodes}).loc[keys.index]
+        self.sums = pd.concat([keys, values], axis=1).groupby(by, observed=True, sort=False).sum()
+
+        # nunique 노드: (일, 차원, id) distinct 쌍 (id는 정수 code) 또는 (일, 차원) HLL sketch
+        self.distinct = {}
+        for node in self.tree:
+            if node.op != 'nunique':
+                continue
+            if distinct == 'hll':
+                ids = df[node.inputs[0]].to_numpy()[keys.index]
+                self.distinct[node.name] = build_sketch(keys, ids, hll_precision)
+            else:
+                ids = pd.factorize(df[node.inputs[0]])[0][keys.index]
+                pairs = keys.assign(id=ids)
+                self.distinct[node.name] = pairs[pairs['id'] >= 0].drop_duplicates()
+
+    def _bucket_codes(self, day_codes, grain):
+        bucket = time_bucket(self.days, grain).to_numpy()
+        return bucket[np.asarray(day_codes)]
+
+    def compute(self, grain='W', dims=None):
+        """
+        기간 단위 × 차원별 KPI Tree 전체 노드를 계산합니다.
+
+        dims: 생성 시 지정한 차원의 부분집합 (None이면 전체)
+        반환: index = (기간 시작일, *dims), columns = 트리 노드 순서 (+ hll 모드: '{노드}_error')
+        """
+        dims = self.dims if dims is None else list(dims)
+        missing = set(dims) - set(self.dims)
+        if missing:
+            raise ValueError(f"엔진 생성 시 지정하지 않은 차원입니다: {sorted(missing)}")
+        bucket_name = GRAINS[grain]
+        by = [bucket_name, *dims]
+
+        sums = self.sums.reset_index()
+        sums[bucket_name] = self._bucket_codes(sums['day'], grain)
+        kpi = sums.groupby(by, observed=True).sum()[[n.name for n in self.tree if n.op == 'sum']]
+
+        errors = {}
+        for name, pairs in self.distinct.items():
+            pairs = pairs.assign(**{bucket_name: self._bucket_codes(pairs['day'], grain)})
+            if self.distinct_method == 'hll':
+                kpi[name] = estimate(pairs, by, self.hll_precision)
+                errors[f'{name}_error'] = error_bound(kpi[name], self.hll_precision)
+            else:
+                kpi[name] = pairs.groupby(by, observed=True)['id'].nunique()
+        kpi = kpi.fillna(0)
+
+        for node in self.tree:
+            if node.op in NODE_OPS:
+                kpi[node.name] = evaluate_node(kpi, node)
+        kpi = kpi[[n.name for n in self.tree]]
+        return kpi.assign(**errors).fillna(0) if errors else kpi
+
+    def compute_all(self, grains=tuple(GRAINS), dims=None):
+        """여러 기간 단위를 한 번에 계산합니다. (원천 재스캔 없음)"""
+        return {grain: self.compute(grain, dims) for grain in grains}
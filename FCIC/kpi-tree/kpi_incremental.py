@@ -0,0 +1,279 @@
+"""
+주차별 KPI 증분 갱신 (새 주문 행만 반영)
+
+kpi_analysis.py는 매번 전체 CSV를 다시 읽어 모든 주차를 재계산한다.
+이 모듈은 새로 들어온 주문 행만 읽어 해당 주차의 합산 가능한 상태만 갱신한다.
+
+- 입력: append-only CSV 파일(읽은 byte 위치 기록) 또는 일별 drop 파일 디렉터리(처리한 파일 기록)
+- 주차 상태(state_dir/weeks/<주 시작일>.json): sum 노드 합계 + nunique 노드 distinct 상태
+    exact: 주차 내 고유 id 목록 / hll: HyperLogLog 희소 register (hll.py)
+- 출력 CSV(weekly_kpi_trend_analysis.csv): 가장 이른 변경 주차의 행 위치부터 잘라 그 뒤 행만 다시 씀
+  → 새 주문이 최근 주차에 들어오면 마지막 몇 행만 갱신
+  → 기록한 파일 크기 / 수정 시각이 다르거나(kpi_analysis.py가 같은 파일을 덮어쓴 경우 등)
+    행 위치가 해당 주차 행의 시작이 아니면 전체를 다시 씀
+- 상태 파일(주차 JSON, manifest)은 임시 파일에 쓴 뒤 os.replace로 교체
+  batch 범위를 manifest에 'pending'으로 먼저 기록하고, 주차 상태에 마지막으로 반영한 batch id를 기록
+  → 중단 후 재실행 시 같은 범위를 다시 읽고 이미 반영한 주차는 건너뜀 (같은 batch를 두 번 더하지 않음)
+- 처리 시간은 새 batch 크기 + 변경된 주차 수에 비례 (누적 이력 길이와 무관)
+
+주의: 입력은 append-only(같은 주문 행이 다시 들어오지 않음)를 가정. 전체 재계산은 kpi_analysis.py.
+
+실행 (레포 루트에서):
+    python FCIC/kpi-tree/kpi_incremental.py [입력 파일 또는 디렉터리]
+"""
+
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from kpi_engine import KPI_TREE, NODE_OPS, TIME_COL, GRAINS, evaluate_node, time_bucket
+from hll import HLL_PRECISION, build_sketch, merge_sketch, estimate, error_bound
+
+SOURCE = 'FCIC/kpi-tree/data/olist_merged_dataset_deduped.csv'
+STATE_DIR = 'FCIC/kpi-tree/state'
+OUTPUT_PATH = 'FCIC/kpi-tree/weekly_kpi_trend_analysis.csv'
+DISTINCT_METHOD = 'exact'  # 'exact' / 'hll'
+INDEX_NAME = GRAINS['W']
+
+
+# ======================================================
+# 1. 새 행 읽기
+# ======================================================
+def read_new_rows(source, manifest, until=None):
+    """
+    manifest 기록 이후 추가된 행만 읽습니다. 반환: (batch DataFrame 또는 None, 갱신된 입력 기록)
+
+    until: 중단된 이전 실행의 입력 기록 → 그때와 같은 범위(byte 위치 / 파일 목록)까지만 읽음
+    """
+    source = Path(source)
+    if source.is_dir():
+        done = set(manifest.get('files', []))
+        new_files = sorted(p for p in source.glob('*.csv') if p.name not in done
+                           and (until is None or p.name in until['files']))
+        if not new_files:
+            return None, {'files': sorted(done)}
+        batch = pd.concat([pd.read_csv(p) for p in new_files], ignore_index=True)
+        return batch, {'files': sorted(done | {p.name for p in new_files})}
+
+    offset = manifest.get('offset', 0)
+    with open(source, 'rb') as f:
+        if offset == 0:
+            header = f.readline()
+            offset = f.tell()
+        else:
+            header = manifest['header'].encode('utf-8')
+            f.seek(offset)
+        data = f.read() if until is None else f.read(until['offset'] - offset)
+    complete = data[:data.rfind(b'\n') + 1]  # 쓰는 중인 마지막 줄은 다음 실행에서 읽음
+    record = {'offset': offset + len(complete), 'header': header.decode('utf-8')}
+    if not complete.strip():
+        return None, record
+    return pd.read_csv(io.BytesIO(header + complete)), record
+
+
+# ======================================================
+# 2. 주차 상태
+# ======================================================
+def _atomic_write(path, text):
+    """임시 파일에 쓴 뒤 교체 (중단돼도 이전 / 새 내용 중 하나만 남음)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _week_path(state_dir, week):
+    return Path(state_dir) / 'weeks' / f'{week}.json'
+
+
+def _load_week(state_dir, week):
+    path = _week_path(state_dir, week)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_week(state_dir, week, state):
+    _atomic_write(_week_path(state_dir, week), json.dumps(state))
+
+
+def batch_week_states(batch, method, tree=KPI_TREE, p=HLL_PRECISION):
+    """batch를 주차별 합산 가능한 상태로 요약합니다. 반환: {주 시작일 문자열: 상태}"""
+    week = time_bucket(pd.to_datetime(batch[TIME_COL]), 'W').dt.strftime('%Y-%m-%d')
+    valid = week.notna()
+    batch, week = batch[valid], week[valid]
+
+    sum_nodes = [n for n in tree if n.op == 'sum']
+    sums = pd.DataFrame({n.name: batch[n.inputs[0]] for n in sum_nodes}).groupby(week).sum()
+    states = {w: {'sums': row.to_dict(), 'distinct': {}} for w, row in sums.iterrows()}
+
+    for node in tree:
+        if node.op != 'nunique':
+            continue
+        ids = batch[node.inputs[0]]
+        if method == 'hll':
+            sketch = build_sketch(pd.DataFrame({'week': week.to_numpy()}), ids.to_numpy(), p)
+            for w, part in sketch.groupby('week'):
+                states[w]['distinct'][node.name] = {'reg': part['reg'].tolist(), 'rank': part['rank'].tolist()}
+        else:
+            for w, part in ids.dropna().astype(str).groupby(week[ids.notna()]).unique().items():
+                states[w]['distinct'][node.name] = part.tolist()
+    return states
+
+
+def merge_week_state(old, new, method):
+    """같은 주차의 기존 상태와 batch 상태를 합칩니다."""
+    if old is None:
+        return new
+    merged = {'sums': {k: old['sums'].get(k, 0) + v for k, v in new['sums'].items()}, 'distinct': {}}
+    for name in set(old['distinct']) | set(new['distinct']):
+        a, b = old['distinct'].get(name), new['distinct'].get(name)
+        if a is None or b is None:
+            merged['distinct'][name] = a if b is None else b
+        elif method == 'hll':
+            sketch = merge_sketch(pd.concat([pd.DataFrame(a), pd.DataFrame(b)], ignore_index=True).assign(week=0), ['week'])
+            merged['distinct'][name] = {'reg': sketch['reg'].tolist(), 'rank': sketch['rank'].tolist()}
+        else:
+            merged['distinct'][name] = sorted(set(a) | set(b))
+    return merged
+
+
+def week_kpi(weeks, states, method, tree=KPI_TREE, p=HLL_PRECISION):
+    """주차 상태 → KPI 행 (kpi_analysis.py 출력과 같은 컬럼 / 0 처리)"""
+    kpi = pd.DataFrame([s['sums'] for s in states], index=pd.Index(pd.to_datetime(weeks), name=INDEX_NAME))
+    errors = {}
+    for node in tree:
+        if node.op != 'nunique':
+            continue
+        if method == 'hll':
+            values = []
+            for s in states:
+                sketch = pd.DataFrame(s['distinct'].get(node.name, {'reg': [], 'rank': []})).assign(week=0)
+                values.append(float(estimate(sketch, ['week'], p).sum()))
+            kpi[node.name] = values
+            errors[f'{node.name}_error'] = error_bound(kpi[node.name], p)
+        else:
+            kpi[node.name] = [len(s['distinct'].get(node.name, [])) for s in states]
+    for node in tree:
+        if node.op in NODE_OPS:
+            kpi[node.name] = evaluate_node(kpi, node)
+    kpi = kpi[[n.name for n in tree]].assign(**errors)
+    return kpi.replace([np.inf, -np.inf], np.nan).fillna(0)
+
+
+# ======================================================
+# 3. 증분 갱신
+# ======================================================
+def _write_rows(output_path, kpi, offsets, position):
+    """position(byte)부터 파일을 잘라 kpi 행을 다시 씁니다. position None이면 header 포함 전체 작성."""
+    if position is None:
+        mode, position = 'w', 0
+        offsets.clear()
+    else:
+        mode = 'r+'
+    with open(output_path, mode, encoding='utf-8', newline='') as f:
+        f.seek(position)
+        f.truncate()
+        if mode == 'w':
+            f.write(kpi.iloc[:0].to_csv())
+        for week, row in zip(kpi.index.strftime('%Y-%m-%d'), kpi.to_csv(header=False).splitlines(keepends=True)):
+            offsets[week] = f.tell()
+            f.write(row)
+
+
+def _output_stat(output_path):
+    stat = os.stat(output_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _tail_position(output_path, offsets, first_week, recorded):
+    """
+    first_week 이후 행이 시작하는 byte 위치 (뒤에 기존 행이 없으면 파일 끝).
+
+    기록한 offset을 믿을 수 없으면 None (전체 다시 쓰기):
+    파일 없음 / 크기·수정 시각이 마지막 기록과 다름 / 위치가 줄 시작이 아니거나 그 행이 해당 주차가 아님
+    """
+    if not offsets or not recorded or not Path(output_path).exists():
+        return None
+    if _output_stat(output_path) != recorded:
+        return None
+    later = sorted((offsets[w], w) for w in offsets if w >= first_week)
+    if not later:
+        return recorded['size']
+    position, week = later[0]
+    with open(output_path, 'rb') as f:
+        f.seek(max(position - 1, 0))
+        head = f.read(len(week) + 2)
+    if position == 0 or head[:1] != b'\n' or not head[1:].startswith(week.encode() + b','):
+        return None
+    return position
+
+
+def update_weekly_kpi(source=SOURCE, state_dir=STATE_DIR, output_path=OUTPUT_PATH, method=DISTINCT_METHOD):
+    """
+    새 주문 행을 반영해 주차 상태와 출력 CSV를 갱신합니다.
+
+    반환: 변경된 주차 목록 (없으면 빈 리스트)
+    """
+    state_dir = Path(state_dir)
+    manifest_path = state_dir / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    if manifest.get('method', method) != method:
+        raise ValueError(f"state는 '{manifest['method']}' 방식으로 만들어졌습니다. 새 state_dir을 사용하세요.")
+
+    # 이전 실행이 주차 상태를 쓰는 도중 중단됐으면(pending) 같은 batch 범위를 다시 읽고,
+    # 이미 그 batch를 반영한 주차('applied')는 건너뜀 → 같은 행을 두 번 더하지 않음
+    pending = manifest.get('pending')
+    batch, source_record = read_new_rows(source, manifest.get('source', {}), pending)
+    batch_id = json.dumps(source_record, sort_keys=True)
+    changed = []
+    if batch is not None and len(batch):
+        _atomic_write(manifest_path, json.dumps({**manifest, 'method': method, 'pending': source_record},
+                                                indent=2, ensure_ascii=False))
+        for week, state in batch_week_states(batch, method).items():
+            old = _load_week(state_dir, week)
+            if old is None or old.get('applied') != batch_id:
+                _save_week(state_dir, week, {**merge_week_state(old, state, method), 'applied': batch_id})
+            changed.append(week)
+        changed.sort()
+
+    offsets = manifest.get('row_offsets', {})
+    output = manifest.get('output')
+    # 출력 파일이 없거나 마지막 기록 이후 다른 프로그램이 덮어썼으면 새 batch가 없어도 전체 다시 쓰기
+    stale = not Path(output_path).exists() or _output_stat(output_path) != output
+    if changed or stale:
+        position = _tail_position(output_path, offsets, changed[0], output) if changed else None
+        all_weeks = sorted(p.stem for p in (state_dir / 'weeks').glob('*.json'))
+        tail = [w for w in all_weeks if position is None or w >= changed[0]]
+        if tail:
+            kpi = week_kpi(tail, [_load_week(state_dir, w) for w in tail], method)
+            _write_rows(output_path, kpi, offsets, position)
+            output = _output_stat(output_path)
+
+    _atomic_write(manifest_path, json.dumps({
+        'method': method,
+        'source': source_record,
+        'row_offsets': offsets,
+        'output': output,
+        'last_changed_weeks': changed,
+        'updated_at': pd.Timestamp.now().isoformat()
+    }, indent=2, ensure_ascii=False))
+    return changed
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else SOURCE
+    if not os.path.exists(source):
+        print(f"Error: '{source}' not found. Please check the file path.")
+        sys.exit(1)
+    changed = update_weekly_kpi(source)
+    if changed:
+        print(f"Updated {len(changed)} week(s): {changed[0]} ~ {changed[-1]} → '{OUTPUT_PATH}'")
+    else:
+        print("No new orders. KPI file is up to date.")
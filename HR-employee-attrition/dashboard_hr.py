@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from hr_filter import BitmapFilter
+from hr_cube import HRCube, ANALYSIS_CUBOIDS
+
 # --- 데이터 로딩 및 캐싱 ---
 @st.cache_data
 def load_data(file_path):
@@ -12,13 +15,26 @@ def load_data(file_path):
         st.error(f"데이터 파일을 찾을 수 없습니다: {file_path}")
         return None
 
-df = load_data('HR-employee-attrition/HR-Employee-Attrition.csv')
+@st.cache_resource
+def load_row_filter(_df, file_path):
+    """사이드바 필터 차원의 bitmap / 정렬 인덱스를 한 번만 만듭니다."""
+    return BitmapFilter(_df)
+
+@st.cache_resource
+def load_cube(_df, file_path):
+    """(필터 차원 × 분석 차원) 이직 count/sum 큐브를 한 번만 집계합니다."""
+    return HRCube(_df, target='Attrition_numeric', cuboids=ANALYSIS_CUBOIDS + [('MaritalStatus',)])
+
+DATA_PATH = 'HR-employee-attrition/HR-Employee-Attrition.csv'
+df = load_data(DATA_PATH)
 
 if df is None:
     st.stop()
 
 # 'Attrition'을 숫자로 변환 (Yes=1, No=0)
 df['Attrition_numeric'] = df['Attrition'].apply(lambda x: 1 if x == 'Yes' else 0)
+cube = load_cube(df, DATA_PATH)
+row_filter = load_row_filter(df, DATA_PATH)
 
 # --- 사이드바 ---
 st.sidebar.title("HR 이직률 감소를 위한 분석 대시보드")
@@ -55,14 +71,19 @@ selected_age_range = st.sidebar.slider(
 
 
 # --- 데이터 필터링 ---
-filtered_df = df[
-    (df['Department'].isin(selected_departments)) &
-    (df['JobRole'].isin(selected_job_roles)) &
-    (df['Age'] >= selected_age_range[0]) &
-    (df['Age'] <= selected_age_range[1])
-]
-if selected_gender != 'All':
-    filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
+# 필터 조건 (이직률 차트는 큐브 slice, 행 단위 차트는 bitmap 인덱스로 고른 filtered_df)
+filters = {
+    'Department': selected_departments,
+    'JobRole': selected_job_roles,
+    'Age': selected_age_range,
+    'Gender': None if selected_gender == 'All' else [selected_gender]
+}
+filtered_df = df.iloc[row_filter.rows(filters)]
+
+
+def rate_frame(by, filters=filters, **kwargs):
+    """큐브 slice 결과를 기존 차트 컬럼명(Attrition_numeric = 이직률 %)으로 반환합니다."""
+    return cube.rates(by, filters, **kwargs).rename(columns={'attrition_rate': 'Attrition_numeric'})
 
 
 # --- 메인 화면 ---
@@ -77,10 +98,11 @@ else:
         st.header("대시보드 요약 (Dashboard Summary)")
 
         # 주요 지표
-        total_employees = filtered_df.shape[0]
-        attrition_rate = filtered_df['Attrition_numeric'].mean() * 100
-        avg_satisfaction = filtered_df['JobSatisfaction'].mean()
-        avg_income = filtered_df['MonthlyIncome'].mean()
+        summary = cube.summary(filters)
+        total_employees = summary['total']
+        attrition_rate = summary['attrition_rate']
+        avg_satisfaction = summary['JobSatisfaction_mean']
+        avg_income = summary['MonthlyIncome_mean']
 
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("총 직원 수", f"{total_employees:,}")
@@ -90,14 +112,16 @@ else:
 
         # 전체 이직 현황
         st.subheader("전체 이직 현황")
-        attrition_counts = filtered_df['Attrition'].value_counts().reset_index()
+        attrition_counts = pd.DataFrame({
+            'Attrition': ['No', 'Yes'],
+            'count': [summary['total'] - summary['attrition_count'], summary['attrition_count']]
+        })
         fig_pie = px.pie(attrition_counts, values='count', names='Attrition', title='이직자/잔류자 비율', hole=0.3)
         st.plotly_chart(fig_pie)
 
         # 부서별 이직률
         st.subheader("부서별 이직률")
-        dept_attrition_rate = filtered_df.groupby('Department')['Attrition_numeric'].mean().reset_index()
-        dept_attrition_rate['Attrition_numeric'] *= 100
+        dept_attrition_rate = rate_frame(['Department'])
         fig_dept_rate = px.bar(
             dept_attrition_rate.sort_values(by='Attrition_numeric', ascending=False),
             x='Department',
@@ -115,24 +139,29 @@ else:
         st.subheader("인구통계별 이직률")
         bins = [18, 30, 40, 50, 60]
         labels = ['18-29', '30-39', '40-49', '50-59']
-        filtered_df['AgeGroup'] = pd.cut(filtered_df['Age'], bins=bins, labels=labels, right=False)
-        age_attrition_rate = filtered_df.groupby('AgeGroup', observed=True)['Attrition_numeric'].mean().reset_index()
-        age_attrition_rate['Attrition_numeric'] *= 100
+        age_attrition_rate = rate_frame(['AgeGroup'], bins={'AgeGroup': ('Age', bins, labels)})
         fig_age_rate = px.bar(age_attrition_rate, x='AgeGroup', y='Attrition_numeric', title='연령대별 이직률 (%)')
         st.plotly_chart(fig_age_rate)
         
         # 성별 및 결혼 상태별 이직률
+        marital = rate_frame(['Gender', 'MaritalStatus'])
+        marital_counts = pd.concat([
+            marital.assign(Attrition='Yes', count=marital['attrition_count']),
+            marital.assign(Attrition='No', count=marital['total'] - marital['attrition_count'])
+        ])
         fig_sunburst = px.sunburst(
-            filtered_df,
+            marital_counts[marital_counts['count'] > 0],
             path=['Gender', 'MaritalStatus', 'Attrition'],
+            values='count',
             title='성별 및 결혼 상태에 따른 이직 현황'
         )
         st.plotly_chart(fig_sunburst)
 
         # 직무 관련 특성별 이직률
         st.subheader("직무 관련 특성별 이직률")
-        job_level_satisfaction = filtered_df.groupby(['JobLevel', 'JobSatisfaction'])['Attrition_numeric'].mean().reset_index()
-        job_level_satisfaction['size'] = filtered_df.groupby(['JobLevel', 'JobSatisfaction']).size().values
+        job_level_satisfaction = rate_frame(['JobLevel', 'JobSatisfaction'])
+        job_level_satisfaction['Attrition_numeric'] /= 100
+        job_level_satisfaction['size'] = job_level_satisfaction['total']
         fig_treemap = px.treemap(
             job_level_satisfaction,
             path=[px.Constant("전체"), 'JobLevel', 'JobSatisfaction'],
@@ -147,9 +176,7 @@ else:
         # 근속 년수 그룹별 이직률
         bins_years = [0, 3, 6, 11, df['YearsAtCompany'].max() + 1]
         labels_years = ['0-2년', '3-5년', '6-10년', '11년 이상']
-        filtered_df['YearsGroup'] = pd.cut(filtered_df['YearsAtCompany'], bins=bins_years, labels=labels_years, right=False)
-        years_attrition_rate = filtered_df.groupby('YearsGroup', observed=True)['Attrition_numeric'].mean().reset_index()
-        years_attrition_rate['Attrition_numeric'] *= 100
+        years_attrition_rate = rate_frame(['YearsGroup'], bins={'YearsGroup': ('YearsAtCompany', bins_years, labels_years)})
         fig_years_rate = px.bar(years_attrition_rate, x='YearsGroup', y='Attrition_numeric', title='근속 년수 그룹별 이직률 (%)')
         st.plotly_chart(fig_years_rate)
 
@@ -161,8 +188,7 @@ else:
         st.subheader("주요 이직 유발 요인")
         key_factors = ['OverTime', 'BusinessTravel', 'WorkLifeBalance']
         for factor in key_factors:
-            factor_attrition_rate = filtered_df.groupby(factor)['Attrition_numeric'].mean().reset_index()
-            factor_attrition_rate['Attrition_numeric'] *= 100
+            factor_attrition_rate = rate_frame([factor])
             
             fig = px.bar(
                 factor_attrition_rate,
@@ -187,21 +213,20 @@ else:
 
         # --- 영업 직군 심층 분석 ---
         st.subheader("❓ 영업직은 왜 많이 퇴사할까?")
-        sales_df = filtered_df[filtered_df['JobRole'].isin(['Sales Executive', 'Sales Representative'])]
-        if not sales_df.empty:
+        sales_roles = [r for r in selected_job_roles if r in ['Sales Executive', 'Sales Representative']]
+        sales_filters = {**filters, 'JobRole': sales_roles}
+        if cube.summary(sales_filters)['total'] > 0:
             st.markdown("영업 직군(Sales Executive, Sales Representative)의 주요 이직 요인을 심층 분석합니다.")
             
             # 영업 직군의 초과근무별 이직률
-            sales_overtime_attrition = sales_df.groupby('OverTime')['Attrition_numeric'].mean().reset_index()
-            sales_overtime_attrition['Attrition_numeric'] *= 100
+            sales_overtime_attrition = rate_frame(['OverTime'], sales_filters)
             fig_sales_ot = px.bar(sales_overtime_attrition, x='OverTime', y='Attrition_numeric', title='영업 직군: 초과근무에 따른 이직률',
                                   text=sales_overtime_attrition['Attrition_numeric'].apply(lambda x: f'{x:.2f}%'))
             st.plotly_chart(fig_sales_ot)
             st.caption("영업 직군 내에서도 초과근무를 하는 경우 이직률이 급격히 증가하는 것을 확인할 수 있습니다.")
 
             # 영업 직군의 출장 빈도별 이직률
-            sales_travel_attrition = sales_df.groupby('BusinessTravel')['Attrition_numeric'].mean().reset_index()
-            sales_travel_attrition['Attrition_numeric'] *= 100
+            sales_travel_attrition = rate_frame(['BusinessTravel'], sales_filters)
             fig_sales_travel = px.bar(sales_travel_attrition, x='BusinessTravel', y='Attrition_numeric', title='영업 직군: 출장 빈도에 따른 이직률',
                                       text=sales_travel_attrition['Attrition_numeric'].apply(lambda x: f'{x:.2f}%'))
             st.plotly_chart(fig_sales_travel)
@@ -217,8 +242,7 @@ else:
             st.markdown("입사 3년차 이하 저연차 직원의 주요 이직 요인을 심층 분석합니다.")
 
             # 저연차 직원의 직무 만족도별 이직률
-            early_career_satisfaction = early_career_df.groupby('JobSatisfaction')['Attrition_numeric'].mean().reset_index()
-            early_career_satisfaction['Attrition_numeric'] *= 100
+            early_career_satisfaction = rate_frame(['JobSatisfaction'], {**filters, 'YearsAtCompany': (0, 3)})
             fig_early_satis = px.bar(early_career_satisfaction, x='JobSatisfaction', y='Attrition_numeric', title='저연차 직원: 직무 만족도에 따른 이직률',
                                      text=early_career_satisfaction['Attrition_numeric'].apply(lambda x: f'{x:.2f}%'))
             st.plotly_chart(fig_early_satis)
@@ -0,0 +1,119 @@
+"""
+HR 이직률 OLAP 큐브
+
+대시보드 위젯마다 filtered_df를 다시 만들고 groupby(...)['Attrition'].mean()을 돌리는 대신,
+(사이드바 필터 차원 × 분석 차원) 조합별 count / sum을 한 번만 집계해 둔다.
+차트 하나의 이직률 = 큐브 slice + sum / count → 원본 행 수와 무관하게 셀 수에만 비례.
+
+- 필터 차원: Department, JobRole, Gender, Age (Age는 정수 그대로 → 슬라이더 범위를 정확히 반영)
+- 분석 차원: cuboid(분석 차원 묶음)마다 따로 집계 → 셀 수 폭발 방지
+- AgeGroup / YearsAtCompany_Group 같은 구간 차원은 slice 시점에 원본 정수 차원을 pd.cut
+  (대시보드마다 구간 정의가 달라도 같은 큐브 사용 가능)
+
+사용 예)
+    cube = HRCube(df, target='Attrition_numeric', cuboids=[('OverTime',), ('JobLevel', 'JobSatisfaction')])
+    filters = {'Department': ['Sales'], 'Age': (25, 40), 'Gender': None}   # None = 필터 없음
+    cube.rates(['OverTime'], filters)
+    cube.rates(['AgeGroup'], filters, bins={'AgeGroup': ('Age', [18, 30, 40, 50, 60], labels)})
+"""
+
+import numpy as np
+import pandas as pd
+
+FILTER_DIMS = ['Department', 'JobRole', 'Gender', 'Age']
+
+# 대시보드들이 공통으로 보는 분석 차원 묶음
+ANALYSIS_CUBOIDS = [
+    ('JobLevel', 'JobSatisfaction'),
+    ('OverTime', 'JobSatisfaction'),
+    ('OverTime', 'YearsAtCompany'),
+    ('JobSatisfaction', 'YearsAtCompany'),
+    ('BusinessTravel', 'WorkLifeBalance'),
+]
+
+# 평균 지표용 합계 measure (요약 카드)
+SUM_MEASURES = ['JobSatisfaction', 'MonthlyIncome']
+
+
+def build_cuboid(df, dims, target, measures=()):
+    """dims 조합별 total / attrition_count (+ measure 합계) 집계표를 만듭니다."""
+    agg = {'total': (target, 'size'), 'attrition_count': (target, 'sum')}
+    for m in measures:
+        agg[f'{m}_sum'] = (m, 'sum')
+    return df.groupby(list(dims), observed=True, sort=False).agg(**agg).reset_index()
+
+
+def _mask(cells, filters):
+    """filters: {컬럼: 값 목록(isin) | (lo, hi) 포함 범위 | None(전체)}"""
+    mask = np.ones(len(cells), dtype=bool)
+    for col, cond in (filters or {}).items():
+        if cond is None:
+            continue
+        if isinstance(cond, tuple):
+            mask &= cells[col].between(cond[0], cond[1]).to_numpy()
+        else:
+            mask &= cells[col].isin(list(cond)).to_numpy()
+    return mask
+
+
+class HRCube:
+    """필터 차원 × 분석 차원 count/sum 큐브. 생성 후에는 원본 DataFrame을 다시 보지 않습니다."""
+
+    def __init__(self, df, target, cuboids=ANALYSIS_CUBOIDS, filter_dims=FILTER_DIMS, measures=SUM_MEASURES):
+        self.filter_dims = list(filter_dims)
+        self.measures = [m for m in measures if m in df.columns]
+        # 분석 차원 없는 기본 cuboid에만 measure 합계를 둠
+        self.cuboids = {(): build_cuboid(df, self.filter_dims, target, self.measures)}
+        for dims in cuboids:
+            dims = tuple(d for d in dims if d not in self.filter_dims)
+            if dims not in self.cuboids:
+                self.cuboids[dims] = build_cuboid(df, self.filter_dims + list(dims), target)
+
+    def _cells(self, needed):
+        """needed 컬럼을 모두 가진 cuboid 중 셀 수가 가장 적은 것을 고릅니다."""
+        extra = set(needed) - set(self.filter_dims)
+        candidates = [cells for dims, cells in self.cuboids.items() if extra <= set(dims)]
+        if not candidates:
+            raise KeyError(f"{sorted(extra)} 차원을 포함한 cuboid가 없습니다. HRCube(cuboids=...)에 추가해주세요.")
+        return min(candidates, key=len)
+
+    def slice(self, filters=None, needed=()):
+        """필터 조건에 맞는 셀만 반환합니다."""
+        needed = set(needed) | {col for col, cond in (filters or {}).items() if cond is not None}
+        cells = self._cells(needed)
+        return cells[_mask(cells, filters)]
+
+    def rates(self, by, filters=None, bins=None, observed=True):
+        """
+        by 차원별 total / attrition_count / attrition_rate(%)를 반환합니다.
+
+        bins: {출력 컬럼명: (원본 컬럼, 구간 경계, 라벨)} — pd.cut(right=False)으로 slice 후 구간화
+        observed=False면 범주형 차원의 빈 범주도 total 0 / rate NaN으로 포함
+        """
+        bins = bins or {}
+        source = [bins[col][0] if col in bins else col for col in by]
+        cells = self.slice(filters, needed=source)
+
+        keys = []
+        for col, src in zip(by, source):
+            if col in bins:
+                _, edges, labels = bins[col]
+                keys.append(pd.cut(cells[src], bins=edges, labels=labels, right=False).rename(col))
+            else:
+                keys.append(cells[col])
+        out = cells.groupby(keys, observed=observed)[['total', 'attrition_count']].sum().reset_index()
+        out['attrition_rate'] = out['attrition_count'] / out['total'].where(out['total'] > 0) * 100
+        return out
+
+    def summary(self, filters=None):
+        """요약 카드용: 직원 수, 이직률(%), measure 평균."""
+        cells = self.slice(filters)
+        total = int(cells['total'].sum())
+        result = {
+            'total': total,
+            'attrition_count': int(cells['attrition_count'].sum()),
+            'attrition_rate': cells['attrition_count'].sum() / total * 100 if total else 0.0,
+        }
+        for m in self.measures:
+            result[f'{m}_mean'] = cells[f'{m}_sum'].sum() / total if total else 0.0
+        return result
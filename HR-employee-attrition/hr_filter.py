@@ -0,0 +1,116 @@
+"""
+HR 대시보드 사이드바 필터용 bitmap 인덱스
+
+매 상호작용마다 isin() / 범위 비교로 boolean mask 4개를 새로 만드는 대신,
+- Department / JobRole / Gender: 값별 bitmap (np.packbits, 행 8개당 1 byte)
+- Age: 정렬 인덱스 (argsort + searchsorted) → 범위 조회가 이진 탐색
+를 한 번만 만들어 두고 선택은 bitmap OR(같은 차원) / AND(차원 간)로 계산한다.
+
+- 차원별 bitmap 결과와 최종 row id 모두 필터 조건을 키로 캐시 (LRU)
+  → 같은 조건 재조회는 dict 조회, 한 차원만 바뀌면 나머지 차원 bitmap 재사용
+- 필터 조건 형식은 hr_cube와 같음: {컬럼: 값 목록 | (lo, hi) | None}
+
+사용 예)
+    row_filter = BitmapFilter(df)
+    filtered_df = df.iloc[row_filter.rows(filters)]
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+VALUE_DIMS = ['Department', 'JobRole', 'Gender']
+RANGE_DIMS = ['Age']
+
+
+def _freeze(cond):
+    """필터 조건을 캐시 키로 쓸 수 있게 변환합니다."""
+    if cond is None or isinstance(cond, tuple):
+        return cond
+    return frozenset(cond)
+
+
+class _LRU(OrderedDict):
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+        return value
+
+
+class BitmapFilter:
+    """값 차원은 bitmap, 범위 차원은 정렬 인덱스로 필터 row id를 계산합니다."""
+
+    def __init__(self, df, value_dims=VALUE_DIMS, range_dims=RANGE_DIMS, cache_size=128):
+        self.n = len(df)
+        self.value_dims = list(value_dims)
+        self.range_dims = list(range_dims)
+
+        # 값별 packed bitmap (factorize 1회 → 값마다 code 비교)
+        self.bitmaps = {}
+        for col in self.value_dims:
+            codes, uniques = df[col].factorize()
+            self.bitmaps[col] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+
+        # 정렬 인덱스: 값 순서대로 row id
+        self.sorted_index = {}
+        for col in self.range_dims:
+            values = df[col].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self.sorted_index[col] = (values[order], order)
+
+        self._all = np.packbits(np.ones(self.n, dtype=bool))
+        self._dim_cache = _LRU(cache_size)
+        self._row_cache = _LRU(cache_size)
+
+    # --- 차원별 bitmap ---
+    def _value_bits(self, col, values):
+        bitmaps = self.bitmaps[col]
+        selected = [bitmaps[v] for v in values if v in bitmaps]
+        if not selected:
+            return np.zeros_like(self._all)
+        return np.bitwise_or.reduce(selected)
+
+    def _range_bits(self, col, lo, hi):
+        sorted_values, order = self.sorted_index[col]
+        start = np.searchsorted(sorted_values, lo, side='left')
+        stop = np.searchsorted(sorted_values, hi, side='right')
+        if start == 0 and stop == self.n:
+            return self._all
+        mask = np.zeros(self.n, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def _dim_bits(self, col, cond):
+        key = (col, _freeze(cond))
+        if key in self._dim_cache:
+            self._dim_cache.move_to_end(key)
+            return self._dim_cache[key]
+        if isinstance(cond, tuple):
+            bits = self._range_bits(col, *cond)
+        else:
+            bits = self._value_bits(col, cond)
+        return self._dim_cache.put(key, bits)
+
+    # --- 조회 ---
+    def bits(self, filters):
+        """필터 조건(AND)에 맞는 행의 packed bitmap"""
+        result = self._all
+        for col, cond in filters.items():
+            if cond is not None:
+                result = result & self._dim_bits(col, cond)
+        return result
+
+    def rows(self, filters):
+        """필터 조건에 맞는 row 위치(오름차순)를 반환합니다. df.iloc[...]에 그대로 사용."""
+        key = tuple(sorted((col, _freeze(cond)) for col, cond in filters.items() if cond is not None))
+        if key in self._row_cache:
+            self._row_cache.move_to_end(key)
+            return self._row_cache[key]
+        ids = np.flatnonzero(np.unpackbits(self.bits(filters), count=self.n))
+        return self._row_cache.put(key, ids)
@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.express as px
 import numpy as np
 
+from hr_filter import BitmapFilter
+from hr_cube import HRCube, ANALYSIS_CUBOIDS, SUM_MEASURES
+
 # pandas SettingWithCopyWarning 경고 무시 설정 (Streamlit 환경에서 loc 사용 시 발생하는 경고)
 pd.options.mode.chained_assignment = None
 
@@ -27,29 +30,42 @@ def load_data(file_path):
     df['Age_Group'] = pd.cut(df['Age'], bins=bins_age, labels=labels_age, right=False)
     
     # 근속 년수 그룹화
-    bins_years = [-1, 2, 5, 10, df['YearsAtCompany'].max() + 1]
-    labels_years = ['0-2 Years', '3-5 Years', '6-10 Years', '11+ Years']
-    df['YearsAtCompany_Group'] = pd.cut(df['YearsAtCompany'], bins=bins_years, labels=labels_years, right=False)
+    df['YearsAtCompany_Group'] = pd.cut(df['YearsAtCompany'], bins=years_bins(df), labels=LABELS_YEARS, right=False)
     
     return df
 
-def calculate_attrition_rate(df):
-    """필터링된 데이터프레임의 이직률(%) 계산 (DataFrame 입력용)"""
-    if df.empty or len(df) == 0:
-        return 0.0
-    attrition_rate = (df['Attrition_Numeric'].sum() / len(df)) * 100
-    return attrition_rate
-
-def create_rate_bar_chart(df, column, title):
-    """특정 컬럼별 이직률 바 차트 생성"""
-    if df.empty:
+LABELS_YEARS = ['0-2 Years', '3-5 Years', '6-10 Years', '11+ Years']
+
+def years_bins(df):
+    """근속 년수 그룹 구간 경계"""
+    return [-1, 2, 5, 10, df['YearsAtCompany'].max() + 1]
+
+# Sales 탭 단일 요인 차트용 cuboid (ANALYSIS_CUBOIDS에 없는 차원)
+SALES_CUBOIDS = [('EducationField',), ('RelationshipSatisfaction',), ('PerformanceRating',), ('MaritalStatus',)]
+
+@st.cache_resource
+def load_row_filter(_df, file_path):
+    """사이드바 필터 차원의 bitmap / 정렬 인덱스를 한 번만 만듭니다."""
+    return BitmapFilter(_df)
+
+@st.cache_resource
+def load_cube(_df, file_path):
+    """(필터 차원 × 분석 차원) 이직 count/sum 큐브를 한 번만 집계합니다."""
+    return HRCube(_df, target='Attrition_Numeric', cuboids=ANALYSIS_CUBOIDS + SALES_CUBOIDS,
+                  measures=SUM_MEASURES + ['YearsAtCompany'])
+
+def rate_summary(column, filters):
+    """큐브 slice로 특정 컬럼(들)별 total / attrition_count / Attrition Rate (%) 계산"""
+    bins = {'YearsAtCompany_Group': ('YearsAtCompany', years_bins(df), LABELS_YEARS)}
+    columns = column if isinstance(column, list) else [column]
+    attrition_summary = cube.rates(columns, filters, bins=bins, observed=False)
+    return attrition_summary.rename(columns={'attrition_rate': 'Attrition Rate (%)'})
+
+def create_rate_bar_chart(filters, column, title):
+    """특정 컬럼별 이직률 바 차트 생성 (큐브 slice 기반)"""
+    attrition_summary = rate_summary(column, filters)
+    if attrition_summary['total'].sum() == 0:
         return None
-        
-    attrition_summary = df.groupby(column, observed=False)['Attrition_Numeric'].agg(
-        total='count',
-        attrition_count='sum'
-    ).reset_index()
-    attrition_summary['Attrition Rate (%)'] = (attrition_summary['attrition_count'] / attrition_summary['total']) * 100
 
     fig = px.bar(
         attrition_summary.sort_values(by='Attrition Rate (%)', ascending=False),
@@ -65,12 +81,16 @@ def create_rate_bar_chart(df, column, title):
     return fig
 
 # 데이터 로드 (파일 경로는 사용자가 마지막에 제시한 경로를 따름)
-df = load_data('HR-employee-attrition/HR-Employee-Attrition.csv')
+DATA_PATH = 'HR-employee-attrition/HR-Employee-Attrition.csv'
+df = load_data(DATA_PATH)
 
 # 데이터가 비어있으면 Streamlit 실행 중단
 if df.empty:
     st.stop()
 
+cube = load_cube(df, DATA_PATH)
+row_filter = load_row_filter(df, DATA_PATH)
+
 
 # --- 2. 사이드바 (Sidebar) 필터 ---
 st.set_page_config(layout="wide")
@@ -84,7 +104,7 @@ selected_departments = st.sidebar.multiselect(
     default=all_departments
 )
 
-all_job_roles = df[df['Department'].isin(selected_departments)]['JobRole'].unique().tolist()
+all_job_roles = df['JobRole'].iloc[row_filter.rows({'Department': selected_departments})].unique().tolist()
 selected_job_roles = st.sidebar.multiselect(
     "직무 (JobRole)",
     options=all_job_roles,
@@ -106,14 +126,15 @@ selected_age_range = st.sidebar.slider(
 )
 
 # 데이터 필터링 적용 (전역 필터)
-filtered_df = df[
-    (df['Department'].isin(selected_departments)) &
-    (df['JobRole'].isin(selected_job_roles)) &
-    (df['Age'] >= selected_age_range[0]) &
-    (df['Age'] <= selected_age_range[1])
-]
-if selected_gender != 'All':
-    filtered_df = filtered_df[filtered_df['Gender'] == selected_gender]
+# 이직률 차트/지표는 큐브 slice, 행 단위 차트는 bitmap 인덱스로 고른 filtered_df 사용
+filters = {
+    'Department': selected_departments,
+    'JobRole': selected_job_roles,
+    'Age': selected_age_range,
+    'Gender': None if selected_gender == 'All' else [selected_gender]
+}
+filtered_df = df.iloc[row_filter.rows(filters)]
+summary = cube.summary(filters)
 
 
 # --- 3. 메인 화면 - 탭 구조 ---
@@ -127,10 +148,10 @@ with tab1:
     
     col1, col2, col3, col4 = st.columns(4)
     
-    total_employees = len(filtered_df)
-    total_attrition_rate = calculate_attrition_rate(filtered_df)
-    avg_job_satisfaction = filtered_df['JobSatisfaction'].mean() if not filtered_df.empty else 0
-    avg_monthly_income = filtered_df['MonthlyIncome'].mean() if not filtered_df.empty else 0
+    total_employees = summary['total']
+    total_attrition_rate = summary['attrition_rate']
+    avg_job_satisfaction = summary['JobSatisfaction_mean']
+    avg_monthly_income = summary['MonthlyIncome_mean']
     
     col1.metric("총 직원 수", f"{total_employees:,}")
     col2.metric("전체 이직률 (%)", f"{total_attrition_rate:.2f}%")
@@ -145,9 +166,14 @@ with tab1:
     
     with col_l:
         st.subheader("이직자/잔류자 비율")
-        if not filtered_df.empty:
+        if total_employees > 0:
+            attrition_counts = pd.DataFrame({
+                'Attrition': ['Yes', 'No'],
+                'count': [summary['attrition_count'], total_employees - summary['attrition_count']]
+            })
             fig_pie = px.pie(
-                filtered_df, 
+                attrition_counts,
+                values='count',
                 names='Attrition', 
                 title='<b>전체 이직자(Yes)/잔류자(No) 비율</b>',
                 color_discrete_sequence=px.colors.sequential.RdBu
@@ -158,7 +184,7 @@ with tab1:
 
     with col_r:
         st.subheader("부서별 이직률")
-        fig_dept_rate = create_rate_bar_chart(filtered_df, 'Department', '부서별 이직률')
+        fig_dept_rate = create_rate_bar_chart(filters, 'Department', '부서별 이직률')
         if fig_dept_rate:
             st.plotly_chart(fig_dept_rate, use_container_width=True)
         else:
@@ -200,10 +226,7 @@ with tab2:
         st.subheader("직무 등급 및 만족도별 이직률 (Treemap)")
         if not filtered_df.empty:
             # Treemap: JobLevel -> JobSatisfaction (색상: 이직률)
-            df_treemap = filtered_df.groupby(['JobLevel', 'JobSatisfaction'], observed=False)['Attrition_Numeric'].agg(
-                total='count',
-                attrition_rate=lambda s: (s.sum() / len(s)) * 100 if len(s) > 0 else 0 
-            ).reset_index()
+            df_treemap = cube.rates(['JobLevel', 'JobSatisfaction'], filters).fillna({'attrition_rate': 0})
             
             fig_treemap = px.treemap(
                 df_treemap,
@@ -229,9 +252,8 @@ with tab3:
         # 3가지 요소 복합: OverTime(X), JobSatisfaction(Y), Attrition Rate(Color)
         
         # 1. 그룹별 이직률 계산
-        df_heatmap = filtered_df.groupby(['OverTime', 'JobSatisfaction'], observed=False)['Attrition_Numeric'].agg(
-            Attrition_Rate=lambda s: (s.sum() / len(s)) * 100 if len(s) > 0 else 0
-        ).reset_index()
+        df_heatmap = rate_summary(['OverTime', 'JobSatisfaction'], filters)
+        df_heatmap['Attrition_Rate'] = df_heatmap['Attrition Rate (%)'].fillna(0)
         
         # 2. 히트맵 생성
         fig_ot_js_heatmap = px.density_heatmap(
@@ -274,9 +296,11 @@ with tab4:
     st.title("🎯 Sales팀 이직률 심층 분석: 15가지 핵심 요인")
     
     # Sales팀 데이터만 필터링 (필터링된 데이터 기준: filtered_df 사용)
-    df_sales = filtered_df[filtered_df['Department'] == 'Sales']
+    sales_filters = {**filters, 'Department': [d for d in selected_departments if d == 'Sales']}
+    df_sales = df.iloc[row_filter.rows(sales_filters)]
+    sales_summary = cube.summary(sales_filters)
     
-    if df_sales.empty:
+    if sales_summary['total'] == 0:
         # Sales 부서가 필터링되었거나, 필터링된 데이터가 없는 경우
         if 'Sales' not in selected_departments:
              st.error("사이드바에서 'Sales' 부서를 선택해야만 이 탭의 데이터가 표시됩니다.")
@@ -288,10 +312,10 @@ with tab4:
         
         col1, col2, col3, col4 = st.columns(4)
         
-        sales_total = len(df_sales)
-        sales_attrition_rate = calculate_attrition_rate(df_sales)
-        sales_avg_income = df_sales['MonthlyIncome'].mean()
-        sales_avg_years = df_sales['YearsAtCompany'].mean()
+        sales_total = sales_summary['total']
+        sales_attrition_rate = sales_summary['attrition_rate']
+        sales_avg_income = sales_summary['MonthlyIncome_mean']
+        sales_avg_years = sales_summary['YearsAtCompany_mean']
         
         col1.metric("Sales팀 총 직원 수", f"{sales_total:,}")
         col2.metric("Sales팀 이직률 (%)", f"{sales_attrition_rate:.2f}%")
@@ -319,9 +343,8 @@ with tab4:
 
         # 2. 근속년수(YAC) vs 초과근무(OT) vs 이직률 (히트맵 + 3개 요소)
         st.subheader("2. 근속년수(YAC)와 초과근무(OT)에 따른 이직률 히트맵")
-        df_yac_ot = df_sales.groupby(['YearsAtCompany_Group', 'OverTime'], observed=False)['Attrition_Numeric'].agg(
-            Attrition_Rate=lambda s: (s.sum() / len(s)) * 100 if len(s) > 0 else 0
-        ).reset_index()
+        df_yac_ot = rate_summary(['YearsAtCompany_Group', 'OverTime'], sales_filters)
+        df_yac_ot['Attrition_Rate'] = df_yac_ot['Attrition Rate (%)'].fillna(0)
         
         fig_yac_ot_heatmap = px.density_heatmap(
             df_yac_ot,
@@ -338,9 +361,8 @@ with tab4:
 
         # 3. BusinessTravel vs WorkLifeBalance (WLB) vs 이직률 (히트맵 + 3개 요소)
         st.subheader("3. 출장 빈도(BT)와 WorkLifeBalance(WLB)에 따른 이직률 히트맵")
-        df_bt_wlb = df_sales.groupby(['BusinessTravel', 'WorkLifeBalance'], observed=False)['Attrition_Numeric'].agg(
-            Attrition_Rate=lambda s: (s.sum() / len(s)) * 100 if len(s) > 0 else 0
-        ).reset_index()
+        df_bt_wlb = rate_summary(['BusinessTravel', 'WorkLifeBalance'], sales_filters)
+        df_bt_wlb['Attrition_Rate'] = df_bt_wlb['Attrition Rate (%)'].fillna(0)
 
         fig_bt_wlb_heatmap = px.density_heatmap(
             df_bt_wlb,
@@ -406,7 +428,7 @@ with tab4:
             
             with current_col:
                 st.markdown(f"**{i+6}. {factor}별 이직률**")
-                fig = create_rate_bar_chart(df_sales, factor, f'{factor} 그룹별 이직률')
+                fig = create_rate_bar_chart(sales_filters, factor, f'{factor} 그룹별 이직률')
                 st.plotly_chart(fig, use_container_width=True)
 
         
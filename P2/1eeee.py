@@ -8,14 +8,18 @@ Team-ready Preprocess Pipeline (OLIST)
 - report_preprocess.md auto generation
 """
 
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import platform
 import json
 from pathlib import Path
 from datetime import datetime
 
+from olist_schema import read_olist_csv
+from olist_loader import load_olist_files, OLIST_FILES
+from mart_store import write_mart
+from mart_incremental import build_mart_core, build_mart_core_incremental
+from geo_stream import stream_geo_rep, GEO_CHUNK_ROWS
+
 # ======================================================
 # 0. BASIC CONFIG (팀원이 건드릴 부분)
 # ======================================================
@@ -26,6 +30,19 @@ FIG_DIR = BASE_DIR / "outputs" / "preprocess_figures"
 REPORT_PATH = BASE_DIR / "report_preprocess.md"
 META_PATH = PROC_DIR / "mart_metadata.json"
 
+# mart 저장 포맷: "csv"(기존 호환) / "parquet"(dtype 보존 + projection/pushdown)
+MART_FORMATS = ["csv", "parquet"]
+
+# True: order_month 파티션 단위 증분 빌드 (manifest의 RAW slice hash 비교)
+INCREMENTAL = True
+MANIFEST_PATH = PROC_DIR / "mart_manifest.json"
+
+# RAW CSV 병렬 로드 worker 수 (None: 자동, 1: 순차)
+LOAD_WORKERS = None
+
+# True: geolocation을 chunk 스트리밍으로 집계 (메모리 상한 고정, median은 ~1e-4도 근사)
+GEO_STREAMING = True
+
 PROC_DIR.mkdir(parents=True, exist_ok=True)
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -48,112 +65,87 @@ set_korean_font()
 # 2. Load RAW
 # ======================================================
 def read(name):
-    return pd.read_csv(RAW_DIR / name)
-
-orders = read("olist_orders_dataset.csv")
-customers = read("olist_customers_dataset.csv")
-items = read("olist_order_items_dataset.csv")
-payments = read("olist_order_payments_dataset.csv")
-reviews = read("olist_order_reviews_dataset.csv")
-products = read("olist_products_dataset.csv")
-sellers = read("olist_sellers_dataset.csv")
-geo = read("olist_geolocation_dataset.csv")
-cat_tr = read("product_category_name_translation.csv")
+    # id → category, 위경도 → float32, datetime → 명시적 포맷 (olist_schema.py)
+    return read_olist_csv(RAW_DIR / name)
+
+def save_mart(df, name, sort_by=None):
+    if "csv" in MART_FORMATS:
+        df.to_csv(PROC_DIR / f"{name}.csv", index=False, encoding="utf-8-sig")
+    if "parquet" in MART_FORMATS:
+        write_mart(df, PROC_DIR / f"{name}.parquet", sort_by=sort_by)
+
+# 8개 RAW를 worker pool에서 동시에 로드 (geolocation은 4단계에서 별도 처리)
+raw = load_olist_files(RAW_DIR, OLIST_FILES, workers=LOAD_WORKERS)
+orders = raw["orders"]
+customers = raw["customers"]
+items = raw["items"]
+payments = raw["payments"]
+reviews = raw["reviews"]
+products = raw["products"]
+sellers = raw["sellers"]
+cat_tr = raw["translation"]
 
 # ======================================================
 # 3. Datetime 정규화
 # ======================================================
-dt_cols = [
-    "order_purchase_timestamp",
-    "order_approved_at",
-    "order_delivered_carrier_date",
-    "order_delivered_customer_date",
-    "order_estimated_delivery_date"
-]
-
-for c in dt_cols:
-    orders[c] = pd.to_datetime(orders[c], errors="coerce")
+# read_olist_csv()가 "%Y-%m-%d %H:%M:%S" 포맷으로 파싱 (errors="coerce")
 
 # ======================================================
 # 4. GEO 대표 좌표 + 품질 체크
 # ======================================================
-geo_rep = geo.groupby("geolocation_zip_code_prefix", as_index=False).agg(
-    lat=("geolocation_lat", "median"),
-    lng=("geolocation_lng", "median"),
-    lat_std=("geolocation_lat", "std"),
-    lng_std=("geolocation_lng", "std")
-).rename(columns={"geolocation_zip_code_prefix": "zip_prefix"})
+if GEO_STREAMING:
+    # Welford(std) + 좌표 히스토그램 sketch(median) 병합 → prefix당 셀 수 상한(MAX_CELLS)으로 메모리 제한
+    geo_rep = stream_geo_rep(RAW_DIR / "olist_geolocation_dataset.csv", chunksize=GEO_CHUNK_ROWS)
+else:
+    geo = read("olist_geolocation_dataset.csv")
+    geo_rep = geo.groupby("geolocation_zip_code_prefix", as_index=False).agg(
+        lat=("geolocation_lat", "median"),
+        lng=("geolocation_lng", "median"),
+        lat_std=("geolocation_lat", "std"),
+        lng_std=("geolocation_lng", "std")
+    ).rename(columns={"geolocation_zip_code_prefix": "zip_prefix"})
 
-geo_rep.to_csv(PROC_DIR / "geo_zip_state_city.csv", index=False, encoding="utf-8-sig")
+save_mart(geo_rep, "geo_zip_state_city", sort_by=["zip_prefix"])
 
 # ======================================================
 # 5. 주문 상태 플래그
 # ======================================================
-orders["is_delivered"] = (orders["order_status"] == "delivered").astype(int)
+orders["is_delivered"] = (orders["order_status"] == "delivered").astype("int8")
 orders["is_canceled"] = orders["order_status"].isin(
     ["canceled", "unavailable"]
-).astype(int)
+).astype("int8")
 
 # ======================================================
-# 6. ITEM / PAYMENT / REVIEW 집계
+# 6~7. ITEM / PAYMENT / REVIEW 집계 → CORE MART (주문 기준)
 # ======================================================
-item_agg = items.groupby("order_id", as_index=False).agg(
-    revenue_price=("price", "sum"),
-    revenue_freight=("freight_value", "sum"),
-    n_items=("order_item_id", "count")
-)
-item_agg["revenue_total"] = item_agg["revenue_price"] + item_agg["revenue_freight"]
-
-payment_agg = payments.groupby("order_id", as_index=False).agg(
-    payment_value=("payment_value", "sum"),
-    n_payments=("payment_sequential", "max")
-)
-
-review_agg = reviews.groupby("order_id", as_index=False).agg(
-    review_score=("review_score", "mean"),
-    has_review=("review_id", lambda x: int(x.notna().any()))
-)
-
-# ======================================================
-# 7. CORE MART (주문 기준)
-# ======================================================
-mart_core = (
-    orders.merge(customers, on="customer_id", how="left")
-    .merge(item_agg, on="order_id", how="left")
-    .merge(payment_agg, on="order_id", how="left")
-    .merge(review_agg, on="order_id", how="left")
-)
-
-# 시간 파생
-mart_core["order_date"] = mart_core["order_purchase_timestamp"].dt.date
-mart_core["order_week"] = mart_core["order_purchase_timestamp"].dt.to_period("W").astype(str)
-mart_core["order_month"] = mart_core["order_purchase_timestamp"].dt.to_period("M").astype(str)
-
-# 배송 파생
-mart_core["delivery_lead_days"] = (
-    mart_core["order_delivered_customer_date"]
-    - mart_core["order_purchase_timestamp"]
-).dt.days
-
-mart_core["delivery_delay_days"] = (
-    mart_core["order_delivered_customer_date"]
-    - mart_core["order_estimated_delivery_date"]
-).dt.days
+if INCREMENTAL:
+    # order_month 파티션 중 RAW slice hash가 바뀐 월만 재집계
+    mart_core, changed_months = build_mart_core_incremental(
+        orders, customers, items, payments, reviews,
+        part_dir=PROC_DIR / "mart_order_core_partitioned",
+        manifest_path=MANIFEST_PATH
+    )
+    print(f"재집계 파티션: {len(changed_months)}개월 {changed_months}")
+else:
+    mart_core = build_mart_core(orders, customers, items, payments, reviews)
 
 # ======================================================
 # 8. MART 분리 (역할 명확화)
 # ======================================================
-mart_core.to_csv(PROC_DIR / "mart_order_core.csv", index=False, encoding="utf-8-sig")
+# Parquet은 배송완료 여부 → 주문시각 순으로 정렬해 저장 (is_delivered 필터 pushdown)
+mart_sort = ["is_delivered", "order_purchase_timestamp"]
+
+save_mart(mart_core, "mart_order_core", sort_by=mart_sort)
 
 mart_logistics = mart_core[
     ["order_id", "delivery_lead_days", "delivery_delay_days", "is_delivered"]
 ]
-mart_logistics.to_csv(PROC_DIR / "mart_order_logistics.csv", index=False, encoding="utf-8-sig")
+save_mart(mart_logistics, "mart_order_logistics", sort_by=["is_delivered"])
 
 mart_experience = mart_core[
     ["order_id", "payment_value", "n_payments", "review_score", "has_review"]
 ]
-mart_experience.to_csv(PROC_DIR / "mart_order_experience.csv", index=False, encoding="utf-8-sig")
+save_mart(mart_experience, "mart_order_experience")
 
 # ======================================================
 # 9. 전처리 검증 시각화
@@ -185,7 +177,8 @@ metadata = {
     "unit": "order",
     "revenue_definition": "price + freight_value",
     "time_base": "order_purchase_timestamp",
-    "geo_representation": "zip_prefix median lat/lng",
+    "geo_representation": "zip_prefix median lat/lng" + (" (streaming sketch)" if GEO_STREAMING else ""),
+    "formats": MART_FORMATS,
     "generated_at": datetime.now().isoformat(),
     "generated_by": "preprocess.py"
 }
@@ -218,6 +211,16 @@ REPORT_PATH.write_text(f"""
 - mart_order_experience.csv
 - geo_zip_state_city.csv
 - mart_metadata.json
+- mart_order_core_partitioned/order_month=YYYY-MM/ + mart_manifest.json (증분 빌드 파티션)
+- (parquet 모드) 위 mart의 .parquet 버전: datetime / category / int8 flag dtype 보존
+
+Parquet mart는 필요한 컬럼과 조건만 읽을 수 있다.
+
+```python
+from mart_store import read_mart
+lead = read_mart("data/processed/mart_order_logistics.parquet",
+                 columns=["delivery_lead_days"], filters=[("is_delivered", "==", 1)])
+```
 
 ---
 
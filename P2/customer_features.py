@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+고객 Feature Store (customer_unique_id 기준, 증분 유지)
+
+merged_df(아이템 grain)를 매번 customer_unique_id로 groupby 하는 대신
+고객별 RFM + 리뷰 feature를 Parquet으로 저장해 두고 바뀐 주문의 고객만 갱신한다.
+
+- order_contrib.parquet: 주문 1행 = 고객 feature에 더해지는 기여분 (spend, review_sum/n, 주문 시각)
+- customer_features.parquet: 고객 1행 = 기여분 합 (합산 가능한 값만 저장)
+- recency는 기준일에 따라 바뀌므로 저장하지 않고 로드 시 계산 (add_recency)
+- 증분인 것은 고객 재집계(groupby)뿐이다. 바뀐 고객을 찾는 diff는 이전/현재 기여분 전체를
+  order_id로 outer merge하고, 두 Parquet 파일도 매번 전체를 다시 쓴다.
+- customer_unique_id가 없는 주문은 고객에 귀속할 수 없으므로 제외
+
+feature 정의는 기존 analyze_customer_clustering()의 아이템 grain 집계와 동일:
+- total_spend      = 아이템에 배분된 payment_value 합 = 주문 결제액 합
+- order_count      = 아이템이 있는 주문 수
+- avg_review_score = 아이템 행 가중 평균 리뷰 점수 (review_score × n_items)
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from mart_store import write_mart, read_mart
+
+# 기여분 / 집계 정의가 바뀌면 올려서 전체 재계산
+FEATURE_VERSION = "2"
+KEY = "customer_unique_id"
+CONTRIB_COLS = ["spend", "review_sum", "review_n", "order_purchase_timestamp"]
+
+
+# ======================================================
+# 1. 주문 기여분
+# ======================================================
+def order_contributions(order_fact):
+    """order_fact(주문 grain)에서 주문별 고객 feature 기여분을 만듭니다."""
+    orders = order_fact[(order_fact["n_items"].fillna(0) > 0) & order_fact[KEY].notna()]
+    has_review = orders["review_score"].notna()
+    contrib = pd.DataFrame({
+        "order_id": orders["order_id"].astype(str).to_numpy(),
+        KEY: orders[KEY].astype(str).to_numpy(),
+        "spend": orders["payment_value"].fillna(0).to_numpy(),
+        "review_sum": (orders["review_score"] * orders["n_items"]).where(has_review, 0).to_numpy(),
+        "review_n": orders["n_items"].where(has_review, 0).astype("int64").to_numpy(),
+        "order_purchase_timestamp": orders["order_purchase_timestamp"].to_numpy()
+    })
+    return contrib
+
+
+def aggregate_customers(contrib):
+    """기여분을 고객별로 합산합니다."""
+    features = contrib.groupby(KEY, as_index=False, sort=False).agg(
+        total_spend=("spend", "sum"),
+        order_count=("order_id", "nunique"),
+        review_sum=("review_sum", "sum"),
+        review_n=("review_n", "sum"),
+        first_order_date=("order_purchase_timestamp", "min"),
+        last_order_date=("order_purchase_timestamp", "max")
+    )
+    features["avg_review_score"] = features["review_sum"] / features["review_n"].where(features["review_n"] > 0)
+    return features
+
+
+# ======================================================
+# 2. 저장소 I/O
+# ======================================================
+def _paths(store_dir):
+    store_dir = Path(store_dir)
+    return store_dir / "order_contrib.parquet", store_dir / "customer_features.parquet", store_dir / "manifest.json"
+
+
+def _load_manifest(path):
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _changed_customers(old, new):
+    """기여분이 추가/변경/삭제된 주문의 고객 id (이전/현재 고객 모두)"""
+    cols = ["order_id", KEY] + CONTRIB_COLS
+    both = old[cols].merge(new[cols], on="order_id", how="outer", suffixes=("_old", "_new"), indicator=True)
+    changed = both["_merge"] != "both"
+    for c in [KEY] + CONTRIB_COLS:
+        a, b = both[f"{c}_old"], both[f"{c}_new"]
+        changed |= ~((a == b) | (a.isna() & b.isna()))
+    rows = both[changed]
+    return pd.Index(pd.concat([rows[f"{KEY}_old"], rows[f"{KEY}_new"]]).dropna().unique())
+
+
+# ======================================================
+# 3. 증분 갱신 / 로드
+# ======================================================
+def update_customer_features(order_fact, store_dir):
+    """
+    order_fact 기준으로 feature store를 갱신합니다. 기여분이 바뀐 주문의 고객만 재집계.
+
+    반환: (features, affected_customers)  — affected_customers가 비어 있으면 재집계 없음
+    """
+    contrib_path, features_file, manifest_path = _paths(store_dir)
+    contrib = order_contributions(order_fact)
+
+    manifest = _load_manifest(manifest_path)
+    if manifest.get("version") == FEATURE_VERSION and contrib_path.exists() and features_file.exists():
+        affected = _changed_customers(read_mart(contrib_path), contrib)
+        features = read_mart(features_file)
+        if len(affected):
+            updated = aggregate_customers(contrib[contrib[KEY].isin(affected)])
+            features = pd.concat([features[~features[KEY].isin(affected)], updated], ignore_index=True)
+    else:
+        features = aggregate_customers(contrib)
+        affected = pd.Index(features[KEY])
+
+    if len(affected):
+        write_mart(contrib, contrib_path, sort_by=[KEY])
+        write_mart(features, features_file, sort_by=[KEY])
+        Path(manifest_path).write_text(json.dumps({
+            "version": FEATURE_VERSION,
+            "n_orders": len(contrib),
+            "n_customers": len(features),
+            "n_affected": len(affected),
+            "updated_at": pd.Timestamp.now().isoformat()
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+    return features, affected
+
+
+def features_path(store_dir):
+    """고객 feature Parquet 경로 (chunk 스트리밍 읽기용)"""
+    return _paths(store_dir)[1]
+
+
+def load_customer_features(store_dir, columns=None):
+    """저장된 고객 feature 테이블을 읽습니다. (columns: projection)"""
+    return read_mart(features_path(store_dir), columns=columns)
+
+
+def add_recency(features, analysis_date=None):
+    """
+    recency(일)를 추가합니다.
+
+    analysis_date 기본값: 마지막 주문 시각 + 1일 (기존 analyze_customer_clustering()과 동일)
+    """
+    if analysis_date is None:
+        analysis_date = features["last_order_date"].max() + pd.Timedelta(days=1)
+    features = features.copy()
+    features["recency"] = (analysis_date - features["last_order_date"]).dt.days
+    return features
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+OLIST 파생 컬럼 레지스트리 (지연 계산 + frame별 memo)
+
+delivery_days / month_year / day_of_week / hour를 분석 함수마다 다시 계산하고
+입력 frame에 컬럼으로 덧붙이던 것을, 파생 컬럼 정의를 한 곳에 모아 두고
+frame에 붙은 accessor(df.derived)로 꺼내 쓰도록 바꾼다.
+
+- 처음 요청할 때 1회 계산, 같은 frame 객체에서는 이후 재사용 (입력 frame은 수정하지 않음)
+- 작은 dtype으로 저장: 일수 Int16, 시각 Int8, 월 = Period 범주형, 요일 = 순서 있는 범주형
+- 반환 Series는 frame과 같은 index → 필터링한 부분 frame에는 같은 mask / loc로 맞춰 사용
+
+사용 예)
+    import derived_columns  # accessor 등록
+    delivered = orders['order_status'] == 'delivered'
+    days = orders.derived['delivery_days'][delivered]
+
+주의: memo는 frame 객체 단위이므로, 원본 시각 컬럼을 바꾼 뒤에는 새 frame을 만들어 사용한다.
+"""
+
+import pandas as pd
+
+PURCHASE = 'order_purchase_timestamp'
+DELIVERED = 'order_delivered_customer_date'
+DAYS_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+_REGISTRY = {}
+
+
+def register(name):
+    """파생 컬럼 계산 함수 등록: fn(df) -> df와 같은 index의 Series"""
+    def decorator(fn):
+        _REGISTRY[name] = fn
+        return fn
+    return decorator
+
+
+# ======================================================
+# 1. 파생 컬럼 정의
+# ======================================================
+@register('delivery_days')
+def _delivery_days(df):
+    """구매 → 고객 배송 완료 일수 (미배송: NA)"""
+    return (df[DELIVERED] - df[PURCHASE]).dt.days.astype('Int16')
+
+
+@register('month_year')
+def _month_year(df):
+    """구매 월 (Period 범주형, 범주는 시간 순)"""
+    return df[PURCHASE].dt.to_period('M').astype('category')
+
+
+@register('day_of_week')
+def _day_of_week(df):
+    """구매 요일 (월요일 시작 순서 있는 범주형)"""
+    codes = df[PURCHASE].dt.dayofweek.fillna(-1).astype('int8')
+    return pd.Series(pd.Categorical.from_codes(codes, categories=DAYS_ORDER, ordered=True),
+                     index=df.index, name='day_of_week')
+
+
+@register('hour')
+def _hour(df):
+    """구매 시각(0~23시)"""
+    return df[PURCHASE].dt.hour.astype('Int8')
+
+
+# ======================================================
+# 2. frame accessor
+# ======================================================
+@pd.api.extensions.register_dataframe_accessor('derived')
+class DerivedColumns:
+    """df.derived[name]: 등록된 파생 컬럼을 계산해 frame별로 memo 합니다."""
+
+    def __init__(self, df):
+        self._df = df
+        self._cache = {}
+
+    def __getitem__(self, name):
+        if name not in self._cache:
+            if name not in _REGISTRY:
+                raise KeyError(f"등록되지 않은 파생 컬럼입니다: {name} (사용 가능: {sorted(_REGISTRY)})")
+            self._cache[name] = _REGISTRY[name](self._df).rename(name)
+        return self._cache[name]
+
+    def __contains__(self, name):
+        return name in _REGISTRY
+
+    def cached(self):
+        """이미 계산된 파생 컬럼 이름"""
+        return list(self._cache)
@@ -11,6 +11,12 @@ except ImportError:
     WordCloud = None
 import matplotlib.cm as cm
 
+from join_planner import plan_olist_tables
+from olist_loader import load_olist_files, OLIST_FILES
+from render_scheduler import Task, run_tasks
+from group_stats import GroupedValues
+from derived_columns import DAYS_ORDER  # df.derived accessor 등록
+
 
 # --- Configuration ---
 plt.rc('font', family='Malgun Gothic') # Windows default
@@ -20,6 +26,8 @@ plt.rcParams['axes.unicode_minus'] = False
 
 DATA_DIR = 'P2/data'
 IMAGE_DIR = 'P2/images_v2'
+LOAD_WORKERS = None  # RAW CSV 병렬 로드 worker 수 (None: 자동, 1: 순차)
+RENDER_WORKERS = None  # 그림 렌더링 process 수 (None: CPU 수, 1: 순차)
 
 if not os.path.exists(IMAGE_DIR):
     os.makedirs(IMAGE_DIR)
@@ -27,16 +35,8 @@ if not os.path.exists(IMAGE_DIR):
 # --- Data Loading ---
 def load_data():
     print("Loading datasets...")
-    return {
-        'customers': pd.read_csv(os.path.join(DATA_DIR, 'olist_customers_dataset.csv')),
-        'orders': pd.read_csv(os.path.join(DATA_DIR, 'olist_orders_dataset.csv')),
-        'items': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_items_dataset.csv')),
-        'payments': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_payments_dataset.csv')),
-        'reviews': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_reviews_dataset.csv')),
-        'products': pd.read_csv(os.path.join(DATA_DIR, 'olist_products_dataset.csv')),
-        'sellers': pd.read_csv(os.path.join(DATA_DIR, 'olist_sellers_dataset.csv')),
-        'translation': pd.read_csv(os.path.join(DATA_DIR, 'product_category_name_translation.csv'))
-    }
+    # 8개 CSV를 병렬 로드 (olist_schema.py dtype 적용 + merge 키 category 공유)
+    return load_olist_files(DATA_DIR, OLIST_FILES, workers=LOAD_WORKERS)
 
 # --- Preprocessing ---
 def preprocess_data(dfs):
@@ -57,27 +57,31 @@ def preprocess_data(dfs):
     products = products.merge(translation, on='product_category_name', how='left')
     products['product_category_name_english'] = products['product_category_name_english'].fillna(products['product_category_name'])
     
-    # 3. Master DataFrame Creation (Order + Item + Product + Customer + Seller)
-    order_items = orders.merge(items, on='order_id', how='inner')
-    order_items_products = order_items.merge(products, on='product_id', how='left')
-    order_items_products_sellers = order_items_products.merge(sellers, on='seller_id', how='left')
-    full_df = order_items_products_sellers.merge(dfs['customers'], on='customer_id', how='left')
+    # 3. Master DataFrame Creation (Order + Item + Product + Customer + Seller + Review/Payment 요약)
+    # reviews/payments는 주문 grain으로 집계 후 merge → 아이템 행이 결제 분할/리뷰 수만큼 복제되지 않음
+    _, full_df = plan_olist_tables(
+        orders, items, products, sellers, dfs['customers'], dfs['reviews'], dfs['payments']
+    )
     
     return full_df, orders
 
 # --- Analysis Functions ---
+# analyze_*: 큰 DataFrame → 작은 plot 데이터 (메인 프로세스)
+# plot_*: plot 데이터 → PNG 저장 (render_scheduler가 process pool에서 실행)
 
 def analyze_revenue_trend(full_df):
     print("Analyzing Revenue Trends...")
-    full_df['month_year'] = full_df['order_purchase_timestamp'].dt.to_period('M')
+    month_year = full_df.derived['month_year']
     
-    monthly_stats = full_df.groupby('month_year').agg({
+    monthly_stats = full_df.groupby(month_year, observed=True).agg({
         'price': 'sum',
         'order_id': 'nunique'
     }).rename(columns={'price': 'Revenue', 'order_id': 'Order_Count'})
     
     monthly_stats.index = monthly_stats.index.astype(str)
-    
+    return monthly_stats
+
+def plot_revenue_trend(monthly_stats, path):
     fig, ax1 = plt.subplots(figsize=(14, 7))
     
     ax1.bar(monthly_stats.index, monthly_stats['Revenue'], color='#1f77b4', alpha=0.6, label='Monthly Revenue')
@@ -93,37 +97,42 @@ def analyze_revenue_trend(full_df):
     
     plt.title('Monthly Revenue & Order Volume Trend (Dual Axis)', fontsize=16)
     fig.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '1_revenue_order_trend.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_delivery_performance(orders, dfs):
     print("Analyzing Delivery Performance...")
-    orders_delivered = orders[orders['order_status'] == 'delivered'].copy()
-    orders_delivered['delivery_days'] = (orders_delivered['order_delivered_customer_date'] - orders_delivered['order_purchase_timestamp']).dt.days
+    delivered = orders['order_status'] == 'delivered'
+    orders_delivered = orders.loc[delivered, ['order_id', 'customer_id']].assign(
+        delivery_days=orders.derived['delivery_days'][delivered]
+    )
     
     reviews = dfs['reviews'][['order_id', 'review_score']]
     orders_reviews = orders_delivered.merge(reviews, on='order_id', how='inner')
+    by_score = GroupedValues(orders_reviews, 'review_score', 'delivery_days').box_stats(range(1, 6))
     
+    orders_cust = orders_delivered.merge(dfs['customers'], on='customer_id', how='left')
+    by_state = orders_cust.groupby('customer_state', observed=True)['delivery_days'].mean().sort_values(ascending=False).head(15)
+    return {'by_score': by_score, 'by_state': by_state}
+
+def plot_delivery_vs_review(delivery, path):
     plt.figure(figsize=(10, 6))
-    data_to_plot = [orders_reviews[orders_reviews['review_score'] == s]['delivery_days'].dropna() for s in range(1, 6)]
-    plt.boxplot(data_to_plot, labels=[1, 2, 3, 4, 5], showfliers=False)
+    plt.gca().bxp(delivery['by_score'], showfliers=False)
     plt.title('Impact of Delivery Time on Review Score', fontsize=14)
     plt.xlabel('Review Score')
     plt.ylabel('Delivery Time (Days)')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.savefig(os.path.join(IMAGE_DIR, '2_delivery_vs_review.png'))
+    plt.savefig(path)
     plt.close()
-    
-    orders_cust = orders_delivered.merge(dfs['customers'], on='customer_id', how='left')
-    state_delivery = orders_cust.groupby('customer_state')['delivery_days'].mean().sort_values(ascending=False).head(15)
-    
+
+def plot_delivery_by_state(delivery, path):
     plt.figure(figsize=(12, 6))
-    state_delivery.plot(kind='bar', color='#2ca02c')
+    delivery['by_state'].plot(kind='bar', color='#2ca02c')
     plt.title('Average Delivery Time by State (Slowest 15)', fontsize=14)
     plt.xlabel('State')
     plt.ylabel('Avg Delivery Days')
     plt.xticks(rotation=0)
-    plt.savefig(os.path.join(IMAGE_DIR, '3_delivery_by_state.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_pareto_categories(full_df):
@@ -135,7 +144,10 @@ def analyze_pareto_categories(full_df):
     
     top_20 = cat_revenue.head(20)
     top_20_cum = cumulative_pct.loc[top_20.index]
-    
+    return top_20, top_20_cum
+
+def plot_pareto_categories(pareto, path):
+    top_20, top_20_cum = pareto
     fig, ax1 = plt.subplots(figsize=(14, 7))
     
     ax1.bar(top_20.index, top_20.values, color='#ff7f0e')
@@ -151,7 +163,7 @@ def analyze_pareto_categories(full_df):
     
     plt.title('Pareto Analysis of Top 20 Categories (Revenue)', fontsize=16)
     fig.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '4_category_pareto.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_installments(dfs):
@@ -161,7 +173,9 @@ def analyze_installments(dfs):
     
     installment_stats = cc_payments.groupby('payment_installments')['payment_value'].agg(['mean', 'count'])
     installment_stats = installment_stats[installment_stats.index <= 12]
-    
+    return installment_stats
+
+def plot_installments(installment_stats, path):
     fig, ax1 = plt.subplots(figsize=(12, 6))
     
     ax1.bar(installment_stats.index, installment_stats['count'], color='#9467bd', alpha=0.7, label='Transaction Count')
@@ -175,13 +189,15 @@ def analyze_installments(dfs):
     
     plt.title('Credit Card Installments: Usage Volume vs Average Value', fontsize=14)
     fig.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '5_installments_analysis.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_freight_efficiency(full_df):
     print("Analyzing Freight Efficiency...")
     sample_df = full_df.sample(n=min(5000, len(full_df)), random_state=42)
-    
+    return sample_df[['price', 'freight_value']]
+
+def plot_freight_efficiency(sample_df, path):
     plt.figure(figsize=(10, 8))
     plt.scatter(sample_df['price'], sample_df['freight_value'], alpha=0.3, color='#e377c2')
     
@@ -191,30 +207,29 @@ def analyze_freight_efficiency(full_df):
     plt.xscale('log')
     plt.yscale('log')
     plt.grid(True, which="both", ls="-", alpha=0.2)
-    plt.savefig(os.path.join(IMAGE_DIR, '6_price_vs_freight_log.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_time_heatmap(orders):
     print("Analyzing Order Time Heatmap...")
-    orders['day_of_week'] = orders['order_purchase_timestamp'].dt.day_name()
-    orders['hour'] = orders['order_purchase_timestamp'].dt.hour
-    
-    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    orders['day_of_week'] = pd.Categorical(orders['day_of_week'], categories=days_order, ordered=True)
-    
-    heatmap_data = orders.groupby(['day_of_week', 'hour']).size().unstack(fill_value=0)
+    day_of_week = orders.derived['day_of_week']
+    hour = orders.derived['hour']
     
+    heatmap_data = orders.groupby([day_of_week, hour], observed=False).size().unstack(fill_value=0)
+    return heatmap_data
+
+def plot_time_heatmap(heatmap_data, path):
     plt.figure(figsize=(12, 6))
     plt.imshow(heatmap_data, cmap='YlOrRd', aspect='auto')
     
     plt.colorbar(label='Number of Orders')
     plt.xticks(range(24), range(24))
-    plt.yticks(range(7), days_order)
+    plt.yticks(range(7), DAYS_ORDER)
     plt.xlabel('Hour of Day')
     plt.ylabel('Day of Week')
     plt.title('Order Volume Heatmap (Day vs Hour)', fontsize=14)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '7_order_time_heatmap.png'))
+    plt.savefig(path)
     plt.close()
 
 # --- New Analysis Functions ---
@@ -224,8 +239,10 @@ def analyze_clustered_bar_review_payment_category(merged_df):
     top_categories = merged_df['product_category_name_english'].value_counts().nlargest(5).index
     df_top_cat = merged_df[merged_df['product_category_name_english'].isin(top_categories)]
 
-    pivot_df = df_top_cat.groupby(['product_category_name_english', 'payment_type'])['review_score'].mean().unstack()
-    
+    pivot_df = df_top_cat.groupby(['product_category_name_english', 'payment_type'], observed=True)['review_score'].mean().unstack()
+    return pivot_df
+
+def plot_clustered_bar_review_payment_category(pivot_df, path):
     pivot_df.plot(kind='bar', figsize=(15, 8), width=0.8)
     plt.title('Top 5 Categories: Average Review Score by Payment Type', fontsize=16)
     plt.xlabel('Product Category', fontsize=12)
@@ -234,7 +251,7 @@ def analyze_clustered_bar_review_payment_category(merged_df):
     plt.legend(title='Payment Type')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '8_clustered_bar_review_payment_category.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_stacked_bar_order_status_state(merged_df):
@@ -242,9 +259,11 @@ def analyze_stacked_bar_order_status_state(merged_df):
     top_states = merged_df['customer_state'].value_counts().nlargest(10).index
     df_top_states = merged_df[merged_df['customer_state'].isin(top_states)]
     
-    status_by_state = df_top_states.groupby(['customer_state', 'order_status']).size().unstack(fill_value=0)
+    status_by_state = df_top_states.groupby(['customer_state', 'order_status'], observed=True).size().unstack(fill_value=0)
     status_by_state = status_by_state.loc[top_states] # Preserve order
-    
+    return status_by_state
+
+def plot_stacked_bar_order_status_state(status_by_state, path):
     status_by_state.plot(kind='bar', stacked=True, figsize=(14, 8), colormap='viridis')
     plt.title('Order Status Distribution in Top 10 States', fontsize=16)
     plt.xlabel('Customer State', fontsize=12)
@@ -252,14 +271,16 @@ def analyze_stacked_bar_order_status_state(merged_df):
     plt.xticks(rotation=0)
     plt.legend(title='Order Status', bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '9_stacked_bar_order_status_state.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_donut_payment_by_price(merged_df):
     print("Analyzing Payment Type Distribution for High/Low Price Tiers...")
-    merged_df['price_tier'] = pd.cut(merged_df['price'], bins=[0, 100, np.inf], labels=['<= 100 BRL', '> 100 BRL'])
-    payment_dist = merged_df.groupby(['price_tier', 'payment_type']).size().unstack(fill_value=0)
+    price_tier = pd.cut(merged_df['price'], bins=[0, 100, np.inf], labels=['<= 100 BRL', '> 100 BRL']).rename('price_tier')
+    payment_dist = merged_df.groupby([price_tier, 'payment_type'], observed=False).size().unstack(fill_value=0)
+    return payment_dist
 
+def plot_donut_payment_by_price(payment_dist, path):
     fig, axes = plt.subplots(1, 2, figsize=(14, 7))
     
     for i, tier in enumerate(payment_dist.index):
@@ -270,14 +291,16 @@ def analyze_donut_payment_by_price(merged_df):
 
     plt.suptitle('Donut Chart of Payment Types by Price Tier', fontsize=16)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '10_donut_payment_by_price.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_bubble_price_freight_review(merged_df):
     print("Analyzing Price, Freight Value, and Review Score Relationship...")
     # Sample to avoid overplotting
     sample_df = merged_df.dropna(subset=['price', 'freight_value', 'review_score']).sample(n=2000, random_state=42)
+    return sample_df[['price', 'freight_value', 'payment_value', 'review_score']]
 
+def plot_bubble_price_freight_review(sample_df, path):
     plt.figure(figsize=(14, 8))
     scatter = plt.scatter(
         sample_df['price'],
@@ -298,19 +321,21 @@ def analyze_bubble_price_freight_review(merged_df):
     
     plt.grid(True, which="both", ls="--", alpha=0.4)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '11_bubble_chart_price_freight_review.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_correlation_heatmap(merged_df):
     print("Analyzing Correlation Heatmap of Numerical Features...")
     numerical_cols = ['price', 'freight_value', 'product_weight_g', 'review_score', 'payment_installments', 'delivery_days']
     
-    # Calculate delivery days for correlation
-    merged_df['delivery_days'] = (merged_df['order_delivered_customer_date'] - merged_df['order_purchase_timestamp']).dt.days
-    
-    corr_df = merged_df[numerical_cols].dropna()
+    # delivery days: 공유 파생 컬럼 (merged_df는 수정하지 않음)
+    corr_df = merged_df[numerical_cols[:-1]].assign(
+        delivery_days=merged_df.derived['delivery_days']
+    ).dropna()
     correlation_matrix = corr_df.corr()
+    return correlation_matrix
 
+def plot_correlation_heatmap(correlation_matrix, path):
     plt.figure(figsize=(10, 8))
     plt.imshow(correlation_matrix, cmap='coolwarm', interpolation='none', aspect='auto')
     plt.colorbar(label='Correlation Coefficient')
@@ -324,7 +349,7 @@ def analyze_correlation_heatmap(merged_df):
 
     plt.title('Correlation Heatmap of Key Numerical Features', fontsize=16)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '12_correlation_heatmap.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_box_payment_value_seller_state(merged_df):
@@ -337,36 +362,35 @@ def analyze_box_payment_value_seller_state(merged_df):
         (merged_df['payment_type'].isin(top_payment_types))
     ]
     
-    # For boxplot, we create a list of data for each group
-    data_to_plot = []
-    labels = []
-    for state in top_seller_states:
-        for p_type in top_payment_types:
-            subset = df_filtered[(df_filtered['seller_state'] == state) & (df_filtered['payment_type'] == p_type)]['payment_value'].dropna()
-            if not subset.empty:
-                data_to_plot.append(subset)
-                labels.append(f"{state}\n({p_type})")
+    # For boxplot, we precompute box stats for each non-empty group (one grouping pass)
+    grouped = GroupedValues(df_filtered, ['seller_state', 'payment_type'], 'payment_value')
+    sizes = grouped.sizes()
+    keys = [(state, p_type) for state in top_seller_states for p_type in top_payment_types if sizes.get((state, p_type))]
+    return grouped.box_stats(keys, labels=[f"{state}\n({p_type})" for state, p_type in keys])
 
+def plot_box_payment_value_seller_state(box_stats, path):
     plt.figure(figsize=(16, 8))
-    plt.boxplot(data_to_plot, labels=labels, showfliers=False) # showfliers=False to focus on distribution
+    plt.gca().bxp(box_stats, showfliers=False) # showfliers=False to focus on distribution
     plt.title('Payment Value Distribution: Top 5 Seller States by Payment Type', fontsize=16)
     plt.xlabel('Seller State and Payment Type', fontsize=12)
     plt.ylabel('Payment Value (BRL)', fontsize=12)
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '13_boxplot_payment_value_state_type.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_hbar_seller_city_orders(merged_df):
     print("Analyzing Top 10 Seller Cities by Orders and Review Score...")
-    city_stats = merged_df.groupby('seller_city').agg(
+    city_stats = merged_df.groupby('seller_city', observed=True).agg(
         order_count=('order_id', 'nunique'),
         avg_review_score=('review_score', 'mean')
     ).nlargest(10, 'order_count')
 
     city_stats = city_stats.sort_values('order_count', ascending=True)
+    return city_stats
 
+def plot_hbar_seller_city_orders(city_stats, path):
     fig, ax = plt.subplots(figsize=(12, 8))
     bars = ax.barh(city_stats.index, city_stats['order_count'], color='skyblue')
     ax.set_xlabel('Number of Unique Orders', fontsize=12)
@@ -382,18 +406,21 @@ def analyze_hbar_seller_city_orders(merged_df):
 
     plt.xlim(right=ax.get_xlim()[1] * 1.15) # Make more space for annotations
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '14_hbar_seller_city_orders.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_stacked_area_revenue_category(merged_df):
     print("Analyzing Cumulative Revenue by Top 5 Product Categories...")
     top_categories = merged_df.groupby('product_category_name_english')['price'].sum().nlargest(5).index
-    df_top_cat = merged_df[merged_df['product_category_name_english'].isin(top_categories)].copy()
-    
-    df_top_cat['month_year'] = df_top_cat['order_purchase_timestamp'].dt.to_period('M').astype(str)
-    
-    revenue_by_cat_time = df_top_cat.groupby(['month_year', 'product_category_name_english'])['price'].sum().unstack(fill_value=0)
+    is_top = merged_df['product_category_name_english'].isin(top_categories)
+    df_top_cat = merged_df.loc[is_top, ['product_category_name_english', 'price']]
+    month_year = merged_df.derived['month_year'][is_top]
     
+    revenue_by_cat_time = df_top_cat.groupby([month_year, 'product_category_name_english'], observed=True)['price'].sum().unstack(fill_value=0)
+    revenue_by_cat_time.index = revenue_by_cat_time.index.astype(str)
+    return revenue_by_cat_time
+
+def plot_stacked_area_revenue_category(revenue_by_cat_time, path):
     plt.figure(figsize=(15, 8))
     plt.stackplot(revenue_by_cat_time.index, revenue_by_cat_time.T, labels=revenue_by_cat_time.columns, alpha=0.8)
     plt.title('Monthly Revenue by Top 5 Product Categories', fontsize=16)
@@ -402,19 +429,24 @@ def analyze_stacked_area_revenue_category(merged_df):
     plt.xticks(rotation=45)
     plt.legend(title='Product Category', loc='upper left')
     plt.tight_layout()
-    plt.savefig(os.path.join(IMAGE_DIR, '15_stacked_area_revenue_category.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_word_cloud_category(merged_df):
     print("Generating Word Cloud for Product Categories...")
     if WordCloud is None:
         print("Skipping Word Cloud generation as the library is not installed.")
-        return
+        return None
         
     cat_stats = merged_df.groupby('product_category_name_english').agg(
         frequency=('order_id', 'nunique'),
         avg_score=('review_score', 'mean')
     ).dropna()
+    return cat_stats
+
+def plot_word_cloud_category(cat_stats, path):
+    if cat_stats is None:
+        return
 
     # Create a color function
     min_score, max_score = cat_stats['avg_score'].min(), cat_stats['avg_score'].max()
@@ -435,7 +467,7 @@ def analyze_word_cloud_category(merged_df):
     plt.imshow(wc, interpolation='bilinear')
     plt.axis('off')
     plt.title('Product Categories (Size: Order Count, Color: Avg Review Score)', fontsize=16)
-    plt.savefig(os.path.join(IMAGE_DIR, '16_word_cloud_categories.png'))
+    plt.savefig(path)
     plt.close()
 
 def analyze_violin_price_category_review(merged_df):
@@ -444,17 +476,23 @@ def analyze_violin_price_category_review(merged_df):
     df_filtered = merged_df[merged_df['product_category_name_english'].isin(top_categories)].copy()
     df_filtered['review_tier'] = pd.cut(df_filtered['review_score'], bins=[0, 3, 5], labels=['Low (1-3)', 'High (4-5)'])
 
+    violins = []
+    for category in top_categories:
+        subset = df_filtered[df_filtered['product_category_name_english'] == category]
+        
+        low_review_prices = subset[subset['review_tier'] == 'Low (1-3)']['price'].dropna().to_numpy()
+        high_review_prices = subset[subset['review_tier'] == 'High (4-5)']['price'].dropna().to_numpy()
+        violins.append((category, low_review_prices, high_review_prices))
+    return violins
+
+def plot_violin_price_category_review(violins, path):
     fig, axes = plt.subplots(2, 2, figsize=(16, 12), sharey=True)
     axes = axes.flatten()
 
-    for i, category in enumerate(top_categories):
+    for i, (category, low_review_prices, high_review_prices) in enumerate(violins):
         ax = axes[i]
-        subset = df_filtered[df_filtered['product_category_name_english'] == category]
         
-        low_review_prices = subset[subset['review_tier'] == 'Low (1-3)']['price'].dropna()
-        high_review_prices = subset[subset['review_tier'] == 'High (4-5)']['price'].dropna()
-        
-        if not low_review_prices.empty and not high_review_prices.empty:
+        if len(low_review_prices) and len(high_review_prices):
             parts = ax.violinplot([low_review_prices, high_review_prices], showmedians=True, widths=0.9)
             # Customizing colors
             for pc, color in zip(parts['bodies'], ['lightblue', 'lightgreen']):
@@ -469,43 +507,63 @@ def analyze_violin_price_category_review(merged_df):
 
     plt.suptitle('Violin Plot: Price Distribution by Review Tier for Top 4 Categories (Log Scale)', fontsize=16)
     fig.tight_layout(rect=[0, 0.03, 1, 0.95])
-    plt.savefig(os.path.join(IMAGE_DIR, '17_violin_price_category_review.png'))
+    plt.savefig(path)
     plt.close()
 
 
+def build_merged_df(full_df):
+    # full_df에 주문 grain 리뷰/결제 요약이 이미 포함되어 있음 (payment_value는 아이템 price 비중 배분값)
+    return full_df
+
+
+# --- Render Task List ---
+# Task(결과 이름, analyze 함수, 입력 이름, [(plot 함수, 출력 파일명)])
+TASKS = [
+    # --- Original Analysis ---
+    Task('revenue_trend', analyze_revenue_trend, ['full_df'], [(plot_revenue_trend, '1_revenue_order_trend.png')]),
+    Task('delivery', analyze_delivery_performance, ['orders', 'dfs'], [
+        (plot_delivery_vs_review, '2_delivery_vs_review.png'),
+        (plot_delivery_by_state, '3_delivery_by_state.png')
+    ]),
+    Task('pareto', analyze_pareto_categories, ['full_df'], [(plot_pareto_categories, '4_category_pareto.png')]),
+    Task('installments', analyze_installments, ['dfs'], [(plot_installments, '5_installments_analysis.png')]),
+    Task('freight', analyze_freight_efficiency, ['full_df'], [(plot_freight_efficiency, '6_price_vs_freight_log.png')]),
+    Task('time_heatmap', analyze_time_heatmap, ['orders'], [(plot_time_heatmap, '7_order_time_heatmap.png')]),
+
+    # --- New Analysis ---
+    Task('merged_df', build_merged_df, ['full_df']),
+    Task('review_payment_category', analyze_clustered_bar_review_payment_category, ['merged_df'],
+         [(plot_clustered_bar_review_payment_category, '8_clustered_bar_review_payment_category.png')]),
+    Task('order_status_state', analyze_stacked_bar_order_status_state, ['merged_df'],
+         [(plot_stacked_bar_order_status_state, '9_stacked_bar_order_status_state.png')]),
+    Task('payment_by_price', analyze_donut_payment_by_price, ['merged_df'],
+         [(plot_donut_payment_by_price, '10_donut_payment_by_price.png')]),
+    Task('price_freight_review', analyze_bubble_price_freight_review, ['merged_df'],
+         [(plot_bubble_price_freight_review, '11_bubble_chart_price_freight_review.png')]),
+    Task('correlation', analyze_correlation_heatmap, ['merged_df'],
+         [(plot_correlation_heatmap, '12_correlation_heatmap.png')]),
+    Task('payment_value_state', analyze_box_payment_value_seller_state, ['merged_df'],
+         [(plot_box_payment_value_seller_state, '13_boxplot_payment_value_state_type.png')]),
+    Task('seller_city', analyze_hbar_seller_city_orders, ['merged_df'],
+         [(plot_hbar_seller_city_orders, '14_hbar_seller_city_orders.png')]),
+    Task('revenue_category', analyze_stacked_area_revenue_category, ['merged_df'],
+         [(plot_stacked_area_revenue_category, '15_stacked_area_revenue_category.png')]),
+    Task('word_cloud', analyze_word_cloud_category, ['merged_df'],
+         [(plot_word_cloud_category, '16_word_cloud_categories.png')]),
+    Task('violin', analyze_violin_price_category_review, ['merged_df'],
+         [(plot_violin_price_category_review, '17_violin_price_category_review.png')]),
+]
+
+
 def main():
     dfs = load_data()
     full_df, orders = preprocess_data(dfs)
     
-    # --- Original Analysis ---
-    analyze_revenue_trend(full_df)
-    analyze_delivery_performance(orders, dfs)
-    analyze_pareto_categories(full_df)
-    analyze_installments(dfs)
-    analyze_freight_efficiency(full_df)
-    analyze_time_heatmap(orders)
-    
-    # --- New Analysis ---
-    # Create a comprehensive dataframe for new plots
-    reviews = dfs['reviews'][['order_id', 'review_score']]
-    payments = dfs['payments'][['order_id', 'payment_type', 'payment_installments', 'payment_value']]
-    
-    merged_df = full_df.merge(reviews, on='order_id', how='left')
-    merged_df = merged_df.merge(payments, on='order_id', how='left')
-    
-    # Call new analysis functions
-    analyze_clustered_bar_review_payment_category(merged_df)
-    analyze_stacked_bar_order_status_state(merged_df)
-    analyze_donut_payment_by_price(merged_df)
-    analyze_bubble_price_freight_review(merged_df)
-    analyze_correlation_heatmap(merged_df)
-    analyze_box_payment_value_seller_state(merged_df)
-    analyze_hbar_seller_city_orders(merged_df)
-    analyze_stacked_area_revenue_category(merged_df)
-    analyze_word_cloud_category(merged_df)
-    analyze_violin_price_category_review(merged_df)
+    # analyze는 순서대로, plot은 process pool에서 병렬 렌더링
+    context = {'dfs': dfs, 'full_df': full_df, 'orders': orders}
+    run_tasks(TASKS, context, IMAGE_DIR, workers=RENDER_WORKERS)
     
     print("Advanced EDA Complete. 17 images saved to P2/images_v2")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -13,6 +13,18 @@ except ImportError:
     WordCloud = None
 import matplotlib.cm as cm
 
+from olist_cache import FrameCache, code_fingerprint
+from join_planner import plan_olist_tables
+import join_planner
+import olist_loader
+import olist_schema
+import derived_columns  # df.derived accessor 등록
+from olist_loader import load_olist_files, OLIST_FILES
+from customer_features import update_customer_features, add_recency, features_path
+from segmentation import segment_customers_streaming
+from robust_trim import trim_outliers
+from group_stats import GroupedValues
+
 
 # --- Configuration ---
 plt.rc('font', family='Malgun Gothic') 
@@ -25,35 +37,60 @@ if not os.path.exists(IMAGE_DIR):
     os.makedirs(IMAGE_DIR)
 
 # --- Data Loading ---
+RAW_FILES = OLIST_FILES
+LOAD_WORKERS = None  # RAW CSV 병렬 로드 worker 수 (None: 자동, 1: 순차)
+CACHE_DIR = os.path.join(DATA_DIR, 'processed', 'cache')
+ARTIFACTS = ['full_df', 'orders', 'merged_df']
+FEATURE_DIR = os.path.join(DATA_DIR, 'processed', 'customer_features')
+
+# 고객 세분화 모드: 'memory' (KMeans + PCA, 전체 행렬) / 'streaming' (mini-batch KMeans + IncrementalPCA)
+SEGMENTATION_MODE = 'memory'
+SWEEP_K = (2, 3, 4, 5, 6)  # streaming 모드 k-sweep 후보
+SWEEP_WORKERS = None  # k-sweep process 수 (None: CPU 수)
+TRIM_METHOD = 'exact'  # 이상치 trim 분위수: 'exact' / 'sketch' (대용량용 근사)
+
+
+def open_cache():
+    """RAW 파일 hash + preprocess_data()/dtype 스키마/join·로더 코드 버전으로 키가 정해지는 캐시를 엽니다."""
+    raw_paths = [os.path.join(DATA_DIR, f) for f in RAW_FILES.values()]
+    fingerprint = code_fingerprint(preprocess_data, olist_schema, derived_columns, join_planner, olist_loader)
+    return FrameCache(CACHE_DIR, raw_paths, fingerprint)
+
+
+def load_frame(name):
+    """
+    artifact 하나만 로드합니다. ('orders', 'full_df', 'merged_df' 또는 RAW 이름)
+    캐시에 없으면 전체 전처리를 한 번 수행해 캐시를 채웁니다.
+    """
+    cache = open_cache()
+    key = name if name in ARTIFACTS else f'raw_{name}'
+    df = cache.get(key)
+    if df is None:
+        load_data()
+        df = cache.get(key)
+    return df
+
+
 def load_data():
     print("데이터셋을 로드합니다...")
-    # 캐시된 데이터가 있는지 확인
-    cache_path = os.path.join(DATA_DIR, 'processed', 'preprocessed_data.pkl')
-    if os.path.exists(cache_path):
+    # 캐시된 데이터가 있는지 확인 (RAW/전처리 코드가 바뀌면 키가 달라져 자동 무효화)
+    cache = open_cache()
+    raw_keys = [f'raw_{name}' for name in RAW_FILES]
+    if cache.has(*ARTIFACTS, *raw_keys):
         print("캐시된 전처리 데이터를 로드합니다.")
-        data = pd.read_pickle(cache_path)
-        return data['dfs'], data['full_df'], data['orders'], data['merged_df']
+        dfs = {name: cache.get(f'raw_{name}') for name in RAW_FILES}
+        return dfs, cache.get('full_df'), cache.get('orders'), cache.get('merged_df')
 
     print("원본 데이터셋을 로드합니다...")
-    dfs = {
-        'customers': pd.read_csv(os.path.join(DATA_DIR, 'olist_customers_dataset.csv')),
-        'orders': pd.read_csv(os.path.join(DATA_DIR, 'olist_orders_dataset.csv')),
-        'items': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_items_dataset.csv')),
-        'payments': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_payments_dataset.csv')),
-        'reviews': pd.read_csv(os.path.join(DATA_DIR, 'olist_order_reviews_dataset.csv')),
-        'products': pd.read_csv(os.path.join(DATA_DIR, 'olist_products_dataset.csv')),
-        'sellers': pd.read_csv(os.path.join(DATA_DIR, 'olist_sellers_dataset.csv')),
-        'translation': pd.read_csv(os.path.join(DATA_DIR, 'product_category_name_translation.csv'))
-    }
+    # 8개 CSV를 병렬 로드 (olist_schema.py dtype 적용 + merge 키 category 공유)
+    dfs = load_olist_files(DATA_DIR, RAW_FILES, workers=LOAD_WORKERS)
     full_df, orders, merged_df = preprocess_data(dfs)
     
-    # 전처리된 데이터 캐시 저장
-    processed_dir = os.path.join(DATA_DIR, 'processed')
-    if not os.path.exists(processed_dir):
-        os.makedirs(processed_dir)
-    pd.to_pickle({
-        'dfs': dfs, 'full_df': full_df, 'orders': orders, 'merged_df': merged_df
-    }, cache_path)
+    # 전처리된 데이터 캐시 저장 (artifact별 개별 파일)
+    for name, df in dfs.items():
+        cache.put(f'raw_{name}', df)
+    for name, df in zip(ARTIFACTS, [full_df, orders, merged_df]):
+        cache.put(name, df)
     
     return dfs, full_df, orders, merged_df
 
@@ -81,20 +118,17 @@ def preprocess_data(dfs):
     products['product_category_name_english'] = products['product_category_name_english'].fillna('unknown')
     
     # 3. Master DataFrame Creation
-    df = orders.merge(items, on='order_id')
-    df = df.merge(products, on='product_id')
-    df = df.merge(sellers, on='seller_id')
-    df = df.merge(customers, on='customer_id')
-    df = df.merge(reviews, on='order_id')
-    df = df.merge(payments, on='order_id')
+    # 1:N(items/reviews/payments)을 주문 grain으로 먼저 집계한 뒤 cardinality 검사 merge (fan-out 방지)
+    order_fact, df = plan_olist_tables(orders, items, products, sellers, customers, reviews, payments)
 
     # 배송일 계산
-    df['delivery_days'] = (df['order_delivered_customer_date'] - df['order_purchase_timestamp']).dt.days
+    df['delivery_days'] = df.derived['delivery_days']
     
     # full_df, orders, merged_df 생성 (기존 스크립트 호환성 유지)
-    # Note: 이 스크립트에서는 단일 'df'를 주로 사용합니다.
-    full_df = df.copy() 
-    merged_df = df.copy()
+    # Note: 이 스크립트에서는 아이템 grain 'df'를 주로 사용하며, orders는 주문 grain fact입니다.
+    full_df = df
+    merged_df = df
+    orders = order_fact
 
     return full_df, orders, merged_df
 
@@ -110,22 +144,24 @@ def analyze_delivery_by_state_and_score(merged_df):
     print("신규 분석: 배송 취약 지역의 배송 기간 및 평점 관계를 분석합니다...")
     
     # 배송일이 30일 이상인 데이터를 이상치로 간주하고 필터링 (시각화 개선)
-    df_filtered = merged_df[(merged_df['delivery_days'] >= 0) & (merged_df['delivery_days'] <= 60)]
+    df_filtered = merged_df[merged_df['delivery_days'].between(0, 60).fillna(False)]
     
     # 평균 배송일이 가장 긴 하위 5개 주 선정
-    slowest_states = df_filtered.groupby('customer_state')['delivery_days'].mean().nlargest(5).index
+    slowest_states = df_filtered.groupby('customer_state', observed=True)['delivery_days'].mean().nlargest(5).index
     
     df_slowest = df_filtered[df_filtered['customer_state'].isin(slowest_states)]
 
+    # 주 × 평점 그룹을 한 번에 분할 (그룹마다 frame 재스캔 없음)
+    grouped = GroupedValues(df_slowest, ['customer_state', 'review_score'], 'delivery_days')
+
     fig, axes = plt.subplots(1, 5, figsize=(20, 5), sharey=True)
-    
+
     for i, state in enumerate(slowest_states):
         ax = axes[i]
-        state_data = df_slowest[df_slowest['customer_state'] == state]
-        
-        # Boxplot으로 시각화
-        data_to_plot = [state_data[state_data['review_score'] == s]['delivery_days'].dropna() for s in range(1, 6)]
-        bp = ax.boxplot(data_to_plot, labels=[1, 2, 3, 4, 5], patch_artist=True, showfliers=False, widths=0.6)
+
+        # Boxplot으로 시각화 (통계는 미리 계산, matplotlib은 그리기만)
+        stats = grouped.box_stats([(state, s) for s in range(1, 6)], labels=[1, 2, 3, 4, 5])
+        bp = ax.bxp(stats, patch_artist=True, showfliers=False, widths=0.6)
 
         # 색상 커스터마이징
         colors = ['#FF6666', '#FFCC66', '#FFFF66', '#CCFF66', '#66FF66']
@@ -143,35 +179,28 @@ def analyze_delivery_by_state_and_score(merged_df):
     plt.close()
 
 
-def analyze_customer_clustering(merged_df):
+def analyze_customer_clustering(customer_features):
     """
     고객 군집 분석 (RFM과 유사한 접근)
     - Recency: 최근 주문일 (분석 시점 기준)
     - Frequency: 주문 횟수
     - Monetary: 총 지출액
     - + Avg Review Score 추가
+
+    customer_features: customer_features.py feature store 테이블 (고객 1행)
     """
     print("신규 분석: 고객 군집 분석을 수행합니다...")
 
-    # 고객별 데이터 집계
-    customer_df = merged_df.groupby('customer_unique_id').agg(
-        total_spend=('payment_value', 'sum'),
-        order_count=('order_id', 'nunique'),
-        avg_review_score=('review_score', 'mean'),
-        last_order_date=('order_purchase_timestamp', 'max')
-    ).dropna()
-
-    # Recency 계산
-    analysis_date = merged_df['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
-    customer_df['recency'] = (analysis_date - customer_df['last_order_date']).dt.days
+    # 고객별 feature (store에서 로드) + Recency 계산
+    customer_df = add_recency(customer_features).set_index('customer_unique_id').sort_index()
+    customer_df = customer_df.dropna(subset=['total_spend', 'order_count', 'avg_review_score', 'last_order_date'])
 
     # 군집 분석에 사용할 특성 선택
     features = customer_df[['total_spend', 'order_count', 'avg_review_score', 'recency']]
     
-    # 이상치 제거 (상위 1% 제거)
-    for col in features.columns:
-        q_99 = features[col].quantile(0.99)
-        features = features[features[col] < q_99]
+    # 이상치 제거 (컬럼별 상위 1% 동시 제거: 분위수 1회 계산 + 결합 mask 1개)
+    trim, _ = trim_outliers(features, q=0.99, method=TRIM_METHOD)
+    features = features[trim]
 
     # 데이터 스케일링
     scaler = StandardScaler()
@@ -189,16 +218,7 @@ def analyze_customer_clustering(merged_df):
     customer_df_clustered['pca2'] = pca_features[:, 1]
     
     # 시각화
-    plt.figure(figsize=(12, 8))
-    scatter = plt.scatter(customer_df_clustered['pca1'], customer_df_clustered['pca2'], 
-                          c=customer_df_clustered['cluster'], cmap='viridis', alpha=0.6)
-    plt.title('고객 군집 분석 (PCA)', fontsize=16)
-    plt.xlabel('PCA Component 1')
-    plt.ylabel('PCA Component 2')
-    plt.legend(handles=scatter.legend_elements()[0], labels=['Cluster 0', 'Cluster 1', 'Cluster 2', 'Cluster 3'], title="Clusters")
-    plt.grid(True, linestyle='--', alpha=0.5)
-    plt.savefig(os.path.join(IMAGE_DIR, '19_customer_clusters.png'))
-    plt.close()
+    plot_customer_clusters(customer_df_clustered)
 
     # 군집별 특성 분석
     cluster_summary = customer_df_clustered.groupby('cluster').agg({
@@ -211,6 +231,37 @@ def analyze_customer_clustering(merged_df):
     print(cluster_summary)
     return cluster_summary
 
+
+def analyze_customer_clustering_streaming(feature_file):
+    """
+    고객 군집 분석 — out-of-core 모드
+    feature Parquet을 chunk로 스트리밍 (mini-batch KMeans + IncrementalPCA + 병렬 k-sweep)
+    군집 요약은 전체 고객, 시각화는 표본 기준
+    """
+    print("신규 분석: 고객 군집 분석을 수행합니다... (streaming)")
+    cluster_summary, sample_df, _ = segment_customers_streaming(feature_file, n_clusters=4, ks=SWEEP_K,
+                                                               workers=SWEEP_WORKERS)
+    plot_customer_clusters(sample_df)
+
+    print("\n--- 고객 군집별 특성 ---")
+    print(cluster_summary)
+    return cluster_summary
+
+
+def plot_customer_clusters(clustered):
+    """PCA 2차원 투영 산점도 (clustered: pca1, pca2, cluster 컬럼)"""
+    plt.figure(figsize=(12, 8))
+    scatter = plt.scatter(clustered['pca1'], clustered['pca2'], 
+                          c=clustered['cluster'], cmap='viridis', alpha=0.6)
+    plt.title('고객 군집 분석 (PCA)', fontsize=16)
+    plt.xlabel('PCA Component 1')
+    plt.ylabel('PCA Component 2')
+    labels = [f'Cluster {c}' for c in sorted(clustered['cluster'].unique())]
+    plt.legend(handles=scatter.legend_elements()[0], labels=labels, title="Clusters")
+    plt.grid(True, linestyle='--', alpha=0.5)
+    plt.savefig(os.path.join(IMAGE_DIR, '19_customer_clusters.png'))
+    plt.close()
+
 # --- Main Execution ---
 def main():
     # 데이터 로드 및 전처리
@@ -221,7 +272,14 @@ def main():
     
     # --- 신규 분석 실행 ---
     analyze_delivery_by_state_and_score(merged_df)
-    cluster_summary = analyze_customer_clustering(merged_df)
+    
+    # 고객 feature store 갱신 (바뀐 주문의 고객만 재집계)
+    customer_features, affected = update_customer_features(orders, FEATURE_DIR)
+    print(f"고객 feature store: {len(customer_features):,}명 중 {len(affected):,}명 갱신")
+    if SEGMENTATION_MODE == 'streaming':
+        cluster_summary = analyze_customer_clustering_streaming(features_path(FEATURE_DIR))
+    else:
+        cluster_summary = analyze_customer_clustering(customer_features)
 
     print("\n신규 분석이 완료되었습니다. 2개의 새로운 이미지가 P2/images_v2에 저장되었습니다.")
     print("군집 분석 결과는 보고서 생성에 활용됩니다.")
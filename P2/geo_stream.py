@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Geolocation 스트리밍 집계 (zip prefix 대표 좌표)
+
+olist_geolocation_dataset.csv 전체를 메모리에 올리지 않고 chunk 단위로 읽어
+zip prefix별 median / std 를 계산한다.
+
+- 결측 좌표는 축(lat / lng)별로 제외 (pandas median / std와 같은 규칙, 축마다 n을 따로 셈)
+- std: Welford / Chan 병렬 병합 (count, mean, M2) → chunk 간 정확히 병합 가능
+- median: 좌표 셀 히스토그램 sketch → 병합은 count 합산, 오차는 셀 폭의 절반 이내
+    - 시작 해상도 CELL_DEG (1e-4도 ≈ 11m)
+    - prefix 하나의 셀 수가 MAX_CELLS를 넘으면 그 prefix만 셀 폭을 2배씩 넓혀 병합 (level += 1)
+      → 좌표가 넓게 퍼진 prefix만 오차가 CELL_DEG × 2^level / 2로 커짐
+- chunk 히스토그램은 바로 합치지 않고 모아 두었다가, 모인 셀 수가 누적 히스토그램 크기 이상이 되면 한 번에 합산
+  → 합산 비용이 분할 상환(amortized)되어 chunk 수에 대해 선형 (매 chunk 전체 재집계 없음)
+- 메모리: 누적 히스토그램 prefix 수 × MAX_CELLS 이하 + 같은 크기 이하의 대기 chunk
+"""
+
+import numpy as np
+import pandas as pd
+
+from olist_schema import read_olist_csv
+
+CELL_DEG = 1e-4
+MAX_CELLS = 512  # prefix × 축별 히스토그램 셀 수 상한 (넘으면 셀 폭 2배)
+GEO_CHUNK_ROWS = 200_000
+PREFIX = "geolocation_zip_code_prefix"
+AXES = {"lat": "geolocation_lat", "lng": "geolocation_lng"}
+HIST_INDEX = ["zip_prefix", "cell"]
+
+
+def _coarsen(hist, levels, max_cells):
+    """셀 수가 max_cells를 넘는 prefix의 셀 폭을 2배씩 넓힙니다. 반환: (hist, levels)"""
+    while True:
+        sizes = hist.groupby(level=0).size()
+        over = sizes.index[sizes > max_cells]
+        if not len(over):
+            return hist, levels
+        levels = levels.add(pd.Series(1, index=over), fill_value=0).astype("int64")
+        prefix = hist.index.get_level_values(0)
+        cells = hist.index.get_level_values(1).to_numpy()
+        cells = np.where(prefix.isin(over), cells >> 1, cells)
+        hist = hist.groupby([prefix, cells]).sum().rename_axis(HIST_INDEX)
+
+
+def _combine(parts, max_cells):
+    """(hist, levels) 목록을 prefix별 가장 거친 level로 맞춰 합산합니다."""
+    levels = pd.concat([lv for _, lv in parts], axis=1).max(axis=1).fillna(0).astype("int64")
+    shifted = []
+    for hist, lv in parts:
+        prefix = hist.index.get_level_values(0)
+        diff = (prefix.map(levels) - prefix.map(lv)).to_numpy(dtype="int64")
+        cells = hist.index.get_level_values(1).to_numpy() >> diff
+        shifted.append(pd.Series(hist.to_numpy(), index=pd.MultiIndex.from_arrays([prefix, cells], names=HIST_INDEX)))
+    hist = pd.concat(shifted).groupby(level=[0, 1]).sum()
+    return _coarsen(hist, levels, max_cells)
+
+
+class GeoSketch:
+    """zip prefix별 (count, mean, M2) + 좌표 히스토그램. update()/merge() 모두 가능."""
+
+    def __init__(self, cell=CELL_DEG, max_cells=MAX_CELLS):
+        self.cell = cell
+        self.max_cells = max_cells
+        self.moments = None
+        self.hist = {axis: None for axis in AXES}
+        self.levels = {axis: None for axis in AXES}  # prefix별 셀 폭 = cell × 2^level
+        self.pending = {axis: [] for axis in AXES}   # 아직 합산하지 않은 (hist, levels)
+
+    # --- 1. chunk 반영 ---
+    def update(self, chunk):
+        other = GeoSketch(self.cell, self.max_cells)
+        other.moments = pd.DataFrame(index=pd.Index(chunk[PREFIX].unique(), name=PREFIX))
+        for axis, col in AXES.items():
+            valid = chunk[col].notna()
+            values = chunk.loc[valid, col].astype("float64")
+            g = values.groupby(chunk.loc[valid, PREFIX])
+            n = g.size().reindex(other.moments.index, fill_value=0)
+            other.moments[f"{axis}_n"] = n
+            other.moments[f"{axis}_mean"] = g.mean().reindex(other.moments.index, fill_value=0.0)
+            other.moments[f"{axis}_m2"] = (g.var(ddof=0) * n).reindex(other.moments.index).fillna(0.0)
+            cells = np.floor(values.to_numpy() / self.cell).astype("int64")
+            hist = pd.Series(1, index=pd.MultiIndex.from_arrays(
+                [chunk.loc[valid, PREFIX].to_numpy(), cells], names=HIST_INDEX
+            )).groupby(level=[0, 1]).sum()
+            levels = pd.Series(0, index=hist.index.get_level_values(0).unique(), dtype="int64")
+            other.hist[axis], other.levels[axis] = _coarsen(hist, levels, self.max_cells)
+        return self.merge(other)
+
+    # --- 2. sketch 병합 ---
+    def merge(self, other):
+        if other.moments is None:
+            return self
+        if self.moments is None:
+            self.moments, self.hist, self.levels, self.pending = other.moments, other.hist, other.levels, other.pending
+            return self
+
+        a, b = self.moments.align(other.moments, join="outer", fill_value=0)
+        merged = pd.DataFrame(index=a.index)
+        for axis in AXES:
+            n_a, n_b = a[f"{axis}_n"], b[f"{axis}_n"]
+            n = n_a + n_b
+            delta = b[f"{axis}_mean"] - a[f"{axis}_mean"]
+            weight = (n_b / n).where(n > 0, 0.0)
+            merged[f"{axis}_n"] = n
+            merged[f"{axis}_mean"] = a[f"{axis}_mean"] + delta * weight
+            merged[f"{axis}_m2"] = a[f"{axis}_m2"] + b[f"{axis}_m2"] + delta ** 2 * n_a * weight
+            self.pending[axis] += [(other.hist[axis], other.levels[axis]), *other.pending[axis]]
+            if sum(len(h) for h, _ in self.pending[axis]) >= len(self.hist[axis]):
+                self._compact(axis)
+        self.moments = merged
+        return self
+
+    def _compact(self, axis):
+        if self.pending[axis]:
+            self.hist[axis], self.levels[axis] = _combine(
+                [(self.hist[axis], self.levels[axis]), *self.pending[axis]], self.max_cells
+            )
+            self.pending[axis] = []
+
+    # --- 3. 결과 ---
+    def _median(self, axis):
+        self._compact(axis)
+        h = self.hist[axis].sort_index().rename("count").reset_index()
+        h["cum"] = h.groupby("zip_prefix")["count"].cumsum()
+        n = h["zip_prefix"].map(self.moments[f"{axis}_n"])
+        # pandas median과 같은 규칙: 짝수 개면 가운데 두 값의 평균
+        lo = h[h["cum"] > (n - 1) // 2].groupby("zip_prefix")["cell"].first()
+        hi = h[h["cum"] > n // 2].groupby("zip_prefix")["cell"].first()
+        width = self.cell * 2.0 ** self.levels[axis]
+        return ((lo + hi) / 2 + 0.5) * width.reindex(lo.index)
+
+    def result(self):
+        """1eeee.py geo_rep과 같은 컬럼(zip_prefix, lat, lng, lat_std, lng_std)을 반환합니다."""
+        m = self.moments
+        out = pd.DataFrame(index=m.index)
+        for axis in AXES:
+            out[axis] = self._median(axis)
+        for axis in AXES:
+            # pandas std(ddof=1)와 동일: 1건 이하면 NaN
+            n = m[f"{axis}_n"]
+            out[f"{axis}_std"] = np.sqrt(m[f"{axis}_m2"] / (n - 1).where(n > 1))
+        out.index.name = "zip_prefix"
+        return out.reset_index()
+
+
+def stream_geo_rep(path, chunksize=GEO_CHUNK_ROWS, cell=CELL_DEG, max_cells=MAX_CELLS):
+    """geolocation CSV를 chunk로 읽어 zip prefix 대표 좌표를 계산합니다."""
+    sketch = GeoSketch(cell, max_cells)
+    for chunk in read_olist_csv(path, usecols=[PREFIX, *AXES.values()], chunksize=chunksize):
+        sketch.update(chunk)
+    return sketch.result()
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from olist_schema import read_olist_csv
+
 data_dir = 'P2/data'
 files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
 
@@ -9,7 +11,7 @@ report = ""
 for file in files:
     file_path = os.path.join(data_dir, file)
     try:
-        df = pd.read_csv(file_path)
+        df = read_olist_csv(file_path)
         report += f"--- {file} ---\n"
         report += f"Shape: {df.shape}\n"
         report += f"Columns: {list(df.columns)}\n"
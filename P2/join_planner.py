@@ -0,0 +1,89 @@
+"""
+OLIST Join Planner (fan-out 방지)
+
+orders→items→products→sellers→customers→reviews→payments 를 행 단위로 연쇄 merge하면
+아이템 × 리뷰 × 결제 분할 수만큼 행이 곱해져(cartesian) 메모리가 커지고
+payment_value 합계가 중복 집계된다.
+
+- 1:N 쪽(items / reviews / payments)은 먼저 order_id grain으로 집계 (1eeee.py의 item_agg / payment_agg와 동일 방식)
+  리뷰가 여러 개인 주문은 가장 최근 리뷰의 점수를 사용 (평균을 내면 1~5 정수 점수가 깨짐)
+- 모든 merge는 pandas validate= 로 키 cardinality를 검사
+- 반환: order_fact (주문 grain) + item_df (주문-아이템 grain)
+"""
+
+
+def checked_merge(left, right, on, how, validate, name=None):
+    """키 cardinality를 검사하며 merge합니다. (위반 시 pandas.errors.MergeError)"""
+    merged = left.merge(right, on=on, how=how, validate=validate)
+    if name:
+        print(f"  [join] {name:<22} {validate:<12} {len(left):>9,} → {len(merged):>9,} rows")
+    return merged
+
+
+def aggregate_reviews(reviews):
+    # 대표 리뷰 = 가장 최근에 작성된 리뷰 (review_score는 1~5 정수 유지)
+    ordered = reviews.sort_values(['order_id', 'review_creation_date', 'review_answer_timestamp'],
+                                  ascending=[True, False, False])
+    return ordered.groupby('order_id', as_index=False, sort=False, observed=True).agg(
+        review_score=('review_score', 'first'),
+        n_reviews=('review_id', 'count')
+    )
+
+
+def aggregate_payments(payments):
+    # 대표 결제수단 = 결제 금액이 가장 큰 결제의 payment_type
+    ordered = payments.sort_values(['order_id', 'payment_value'], ascending=[True, False])
+    return ordered.groupby('order_id', as_index=False, sort=False, observed=True).agg(
+        payment_value=('payment_value', 'sum'),
+        payment_type=('payment_type', 'first'),
+        payment_installments=('payment_installments', 'max'),
+        n_payments=('payment_sequential', 'count')
+    )
+
+
+def aggregate_items(items):
+    return items.groupby('order_id', as_index=False, observed=True).agg(
+        revenue_price=('price', 'sum'),
+        revenue_freight=('freight_value', 'sum'),
+        n_items=('order_item_id', 'count')
+    )
+
+
+def plan_olist_tables(orders, items, products, sellers, customers, reviews, payments, verbose=True):
+    """
+    fan-out 없는 OLIST 분석 테이블을 만듭니다.
+
+    orders: 날짜 변환이 끝난 주문 테이블
+    products: 카테고리 번역(product_category_name_english)이 끝난 상품 테이블
+
+    반환:
+    - order_fact: 주문 1행 = 주문 + 고객 + 아이템/결제/리뷰 집계
+    - item_df: 주문-아이템 1행 = 아이템 + 상품 + 판매자 + 주문/고객 + 리뷰/결제 요약.
+      payment_value는 주문 결제액을 아이템 price 비중으로 배분한 값이라
+      item_df['payment_value'].sum() == 주문 결제액 합계 (중복 집계 없음)
+    """
+    def merge(left, right, on, how, validate, name):
+        return checked_merge(left, right, on, how, validate, name if verbose else None)
+
+    item_agg = aggregate_items(items)
+    payment_agg = aggregate_payments(payments)
+    review_agg = aggregate_reviews(reviews)
+
+    # 1. 주문 grain fact
+    order_fact = merge(orders, customers, 'customer_id', 'left', 'many_to_one', 'orders+customers')
+    order_fact = merge(order_fact, item_agg, 'order_id', 'left', 'one_to_one', '+item_agg')
+    order_fact = merge(order_fact, payment_agg, 'order_id', 'left', 'one_to_one', '+payment_agg')
+    order_fact = merge(order_fact, review_agg, 'order_id', 'left', 'one_to_one', '+review_agg')
+
+    # 2. 아이템 grain
+    item_df = merge(items, products, 'product_id', 'left', 'many_to_one', 'items+products')
+    item_df = merge(item_df, sellers, 'seller_id', 'left', 'many_to_one', '+sellers')
+    order_cols = order_fact.drop(columns=['revenue_price', 'revenue_freight'])
+    item_df = merge(order_cols, item_df, 'order_id', 'inner', 'one_to_many', 'order_fact+items')
+
+    # 주문 결제액을 아이템 price 비중으로 배분 (price 합이 0이면 균등 배분)
+    order_price = item_df.groupby('order_id', observed=True)['price'].transform('sum')
+    share = (item_df['price'] / order_price).where(order_price > 0, 1 / item_df['n_items'])
+    item_df['payment_value'] = item_df['payment_value'] * share
+
+    return order_fact, item_df
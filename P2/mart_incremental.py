@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+OLIST Core Mart 증분 빌드 (order_month 파티션)
+
+- RAW 입력을 order_month 단위 slice로 나눠 content hash 기록 (manifest)
+- hash가 바뀐 월만 item/payment/review 재집계 → 해당 파티션만 재작성
+- 전체 mart_core는 파티션 디렉토리를 다시 읽어 구성
+"""
+
+import json
+import shutil
+import pandas as pd
+from pathlib import Path
+
+from mart_store import write_mart, read_mart
+
+# build_mart_core() 로직이 바뀌면 올려서 전체 파티션을 재빌드
+MART_VERSION = "1"
+
+
+# ======================================================
+# 1. CORE MART 빌드 (주문 기준)
+# ======================================================
+def build_mart_core(orders, customers, items, payments, reviews):
+    """주문 단위 core mart를 만듭니다. (orders에는 datetime 변환 + 상태 플래그가 적용돼 있어야 함)"""
+    item_agg = items.groupby("order_id", as_index=False, observed=True).agg(
+        revenue_price=("price", "sum"),
+        revenue_freight=("freight_value", "sum"),
+        n_items=("order_item_id", "count")
+    )
+    item_agg["revenue_total"] = item_agg["revenue_price"] + item_agg["revenue_freight"]
+
+    payment_agg = payments.groupby("order_id", as_index=False, observed=True).agg(
+        payment_value=("payment_value", "sum"),
+        n_payments=("payment_sequential", "max")
+    )
+
+    review_agg = reviews.groupby("order_id", as_index=False, observed=True).agg(
+        review_score=("review_score", "mean"),
+        has_review=("review_id", lambda x: int(x.notna().any()))
+    )
+
+    mart_core = (
+        orders.merge(customers, on="customer_id", how="left")
+        .merge(item_agg, on="order_id", how="left")
+        .merge(payment_agg, on="order_id", how="left")
+        .merge(review_agg, on="order_id", how="left")
+    )
+
+    # 시간 파생
+    mart_core["order_date"] = mart_core["order_purchase_timestamp"].dt.date
+    mart_core["order_week"] = mart_core["order_purchase_timestamp"].dt.to_period("W").astype(str)
+    mart_core["order_month"] = order_month_of(mart_core)
+
+    # 배송 파생
+    mart_core["delivery_lead_days"] = (
+        mart_core["order_delivered_customer_date"]
+        - mart_core["order_purchase_timestamp"]
+    ).dt.days
+
+    mart_core["delivery_delay_days"] = (
+        mart_core["order_delivered_customer_date"]
+        - mart_core["order_estimated_delivery_date"]
+    ).dt.days
+
+    return mart_core
+
+
+def order_month_of(orders):
+    return orders["order_purchase_timestamp"].dt.to_period("M").astype(str)
+
+
+# ======================================================
+# 2. RAW slice content hash
+# ======================================================
+def _hash_by_month(df, month):
+    """행 hash를 월별로 합산(순서 무관) → {월: "hash-행수"}"""
+    rows = pd.DataFrame({
+        "order_month": month.to_numpy(),
+        "h": pd.util.hash_pandas_object(df, index=False).to_numpy()
+    }).dropna(subset=["order_month"])
+    agg = rows.groupby("order_month")["h"].agg(["sum", "count"])
+    return {m: f"{int(r['sum']) & 0xFFFFFFFFFFFFFFFF:016x}-{int(r['count'])}" for m, r in agg.iterrows()}
+
+
+def slice_hashes(orders, customers, items, payments, reviews):
+    """월별 × 입력 테이블별 content hash를 계산합니다."""
+    month = order_month_of(orders)
+    order_month = pd.Series(month.to_numpy(), index=orders["order_id"].to_numpy())
+    customer_month = pd.Series(month.to_numpy(), index=orders["customer_id"].to_numpy())
+    customer_month = customer_month[~customer_month.index.duplicated(keep="last")]
+
+    per_table = {
+        "orders": _hash_by_month(orders, month),
+        "customers": _hash_by_month(customers, customers["customer_id"].map(customer_month)),
+        "items": _hash_by_month(items, items["order_id"].map(order_month)),
+        "payments": _hash_by_month(payments, payments["order_id"].map(order_month)),
+        "reviews": _hash_by_month(reviews, reviews["order_id"].map(order_month)),
+    }
+
+    hashes = {}
+    for table, by_month in per_table.items():
+        for m, h in by_month.items():
+            hashes.setdefault(m, {})[table] = h
+    return hashes
+
+
+# ======================================================
+# 3. Manifest + 파티션 I/O
+# ======================================================
+def load_manifest(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(path, manifest):
+    Path(path).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def partition_path(part_dir, month):
+    return Path(part_dir) / f"order_month={month}" / "part.parquet"
+
+
+# ======================================================
+# 4. 증분 빌드
+# ======================================================
+def build_mart_core_incremental(orders, customers, items, payments, reviews, part_dir, manifest_path):
+    """
+    변경된 order_month 파티션만 재집계/재작성하고 전체 mart_core를 반환합니다.
+
+    반환: (mart_core, changed_months)
+    """
+    part_dir = Path(part_dir)
+    hashes = slice_hashes(orders, customers, items, payments, reviews)
+
+    manifest = load_manifest(manifest_path)
+    previous = manifest.get("partitions", {}) if manifest.get("version") == MART_VERSION else {}
+
+    changed = sorted(
+        m for m, h in hashes.items()
+        if previous.get(m) != h or not partition_path(part_dir, m).exists()
+    )
+    removed = sorted(set(previous) - set(hashes))
+
+    if changed:
+        sub_orders = orders[order_month_of(orders).isin(changed)]
+        order_ids = sub_orders["order_id"]
+        mart = build_mart_core(
+            sub_orders,
+            customers[customers["customer_id"].isin(sub_orders["customer_id"])],
+            items[items["order_id"].isin(order_ids)],
+            payments[payments["order_id"].isin(order_ids)],
+            reviews[reviews["order_id"].isin(order_ids)]
+        )
+        columns = list(mart.columns)
+        for m, part in mart.groupby("order_month", sort=False):
+            # order_month는 디렉토리 이름(hive partition)으로 복원됨
+            write_mart(part.drop(columns="order_month"), partition_path(part_dir, m))
+    else:
+        columns = manifest.get("columns")
+
+    for m in removed:
+        shutil.rmtree(partition_path(part_dir, m).parent, ignore_errors=True)
+
+    save_manifest(manifest_path, {
+        "version": MART_VERSION,
+        "columns": columns,
+        "partitions": hashes,
+        "updated_at": pd.Timestamp.now().isoformat()
+    })
+
+    mart_core = read_mart(part_dir)
+    mart_core["order_month"] = mart_core["order_month"].astype(str)
+    if columns:
+        mart_core = mart_core[columns]
+    return mart_core, changed
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+OLIST Mart Columnar Store (Parquet)
+
+- mart 저장 시 dtype 보존 (datetime / category / int8 flag)
+- 컬럼 projection + row-group predicate pushdown 읽기
+- 1eeee.py 산출물과 노트북/분석 스크립트가 공통으로 사용
+"""
+
+import pandas as pd
+from pathlib import Path
+
+try:
+    import pyarrow  # noqa: F401  (pandas parquet 엔진)
+except ImportError:
+    print("pyarrow 라이브러리가 설치되어 있지 않습니다. 'pip install pyarrow'로 설치해주세요.")
+    pyarrow = None
+
+# ======================================================
+# 0. 스키마 정의 (mart 공통)
+# ======================================================
+DATETIME_COLS = [
+    "order_purchase_timestamp",
+    "order_approved_at",
+    "order_delivered_carrier_date",
+    "order_delivered_customer_date",
+    "order_estimated_delivery_date"
+]
+CATEGORY_COLS = ["order_status", "customer_state", "customer_city", "order_week", "order_month"]
+FLAG_COLS = ["is_delivered", "is_canceled", "has_review"]
+
+# row group 이 작을수록 predicate pushdown 으로 건너뛰는 범위가 세밀해진다
+ROW_GROUP_SIZE = 16_384
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("Parquet mart 저장/로드에는 pyarrow가 필요합니다. 'pip install pyarrow'")
+
+
+def coerce_mart_dtypes(df):
+    """mart 컬럼을 공통 스키마 dtype으로 맞춘 복사본을 반환합니다."""
+    df = df.copy()
+    for c in DATETIME_COLS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    # RAW 로드 시 테이블 간 공유한 category 집합 중 이 mart에 없는 값은 제거 (dictionary 크기 축소)
+    for c in df.select_dtypes("category").columns:
+        df[c] = df[c].cat.remove_unused_categories()
+    for c in FLAG_COLS:
+        if c in df.columns and not df[c].isna().any():
+            df[c] = df[c].astype("int8")
+    if "order_date" in df.columns:
+        df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
+    return df
+
+
+# ======================================================
+# 1. 저장
+# ======================================================
+def write_mart(df, path, sort_by=None, row_group_size=ROW_GROUP_SIZE):
+    """
+    mart를 Parquet으로 저장합니다.
+
+    sort_by: 자주 거르는 컬럼(예: is_delivered) 기준으로 정렬해 두면
+             row group 통계(min/max)가 좁아져 pushdown 효과가 커집니다.
+    """
+    _require_pyarrow()
+    df = coerce_mart_dtypes(df)
+    if sort_by:
+        df = df.sort_values(sort_by, kind="stable")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(
+        path,
+        engine="pyarrow",
+        index=False,
+        compression="zstd",
+        row_group_size=row_group_size
+    )
+    return path
+
+
+# ======================================================
+# 2. 로드 (projection + pushdown)
+# ======================================================
+def read_mart(path, columns=None, filters=None):
+    """
+    Parquet mart를 읽습니다.
+
+    columns: 필요한 컬럼만 읽기 (projection)
+    filters: pyarrow 필터, 예) [("is_delivered", "==", 1)]
+             row group 통계로 조건에 맞지 않는 구간은 디스크에서 읽지 않습니다.
+
+    예) 배송 완료 주문의 리드타임만 필요할 때
+        read_mart(PROC_DIR / "mart_order_logistics.parquet",
+                  columns=["delivery_lead_days"], filters=[("is_delivered", "==", 1)])
+    """
+    _require_pyarrow()
+    return pd.read_parquet(path, engine="pyarrow", columns=columns, filters=filters)
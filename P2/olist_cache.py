@@ -0,0 +1,149 @@
+"""
+OLIST 전처리 결과 캐시 (content-addressed)
+
+- 캐시 키 = RAW 파일 content hash + 전처리 코드 버전
+- artifact(DataFrame)마다 별도의 Arrow IPC(Feather v2, 무압축) 파일 → memory-map 로드
+- 필요한 artifact만 lazy 로드
+- LRU + 용량 기준 eviction
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    print("pyarrow 라이브러리가 설치되어 있지 않습니다. 'pip install pyarrow'로 설치해주세요.")
+    feather = None
+
+# 캐시 파일 포맷이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_FORMAT = "1"
+INDEX_FILE = 'index.json'
+
+
+def code_fingerprint(*funcs):
+    """함수(또는 모듈) 소스 코드로 전처리 코드 버전을 만듭니다. (코드가 바뀌면 캐시 키도 바뀜)"""
+    h = hashlib.blake2b(CACHE_FORMAT.encode(), digest_size=16)
+    for func in funcs:
+        h.update(inspect.getsource(func).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FrameCache:
+    """
+    RAW 파일 + 코드 버전으로 주소가 정해지는 DataFrame 캐시.
+
+    사용 예)
+        cache = FrameCache(cache_dir, raw_paths, code_fingerprint(preprocess_data))
+        df = cache.get('merged_df')        # 없으면 None
+        cache.put('merged_df', merged_df)
+    """
+
+    def __init__(self, cache_dir, raw_paths, code_version, max_bytes=4 * 1024 ** 3, max_entries=3):
+        if feather is None:
+            raise ImportError("FrameCache에는 pyarrow가 필요합니다. 'pip install pyarrow'")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+        self.key = self._make_key(raw_paths, code_version)
+        self.entry_dir = os.path.join(cache_dir, self.key)
+
+    # --- index ---
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault('files', {})
+        index.setdefault('entries', {})
+        return index
+
+    def _write_index(self):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp, self._index_path())
+
+    # --- key ---
+    def _raw_digest(self, path):
+        """파일 content hash. size/mtime이 같으면 이전에 계산한 hash를 재사용합니다."""
+        st = os.stat(path)
+        memo = self._index['files'].get(os.path.abspath(path))
+        if memo and memo['size'] == st.st_size and memo['mtime_ns'] == st.st_mtime_ns:
+            return memo['digest']
+        digest = _file_digest(path)
+        self._index['files'][os.path.abspath(path)] = {
+            'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digest': digest
+        }
+        return digest
+
+    def _make_key(self, raw_paths, code_version):
+        h = hashlib.blake2b(code_version.encode(), digest_size=16)
+        for path in sorted(raw_paths):
+            h.update(os.path.basename(path).encode('utf-8'))
+            h.update(self._raw_digest(path).encode())
+        self._write_index()
+        return h.hexdigest()
+
+    # --- artifact I/O ---
+    def _artifact_path(self, name):
+        return os.path.join(self.entry_dir, f'{name}.arrow')
+
+    def has(self, *names):
+        return all(os.path.exists(self._artifact_path(n)) for n in names)
+
+    def get(self, name):
+        """artifact 하나만 memory-map으로 로드합니다. 없으면 None."""
+        path = self._artifact_path(name)
+        if not os.path.exists(path):
+            return None
+        table = feather.read_table(path, memory_map=True)
+        self._touch()
+        return table.to_pandas()
+
+    def put(self, name, df):
+        os.makedirs(self.entry_dir, exist_ok=True)
+        path = self._artifact_path(name)
+        tmp = path + '.tmp'
+        feather.write_feather(df.reset_index(drop=True), tmp, compression='uncompressed')
+        os.replace(tmp, path)
+        self._touch()
+        self.evict()
+
+    # --- LRU ---
+    def _touch(self):
+        size = sum(
+            os.path.getsize(os.path.join(self.entry_dir, f))
+            for f in os.listdir(self.entry_dir)
+        ) if os.path.isdir(self.entry_dir) else 0
+        self._index['entries'][self.key] = {'last_used': time.time(), 'size': size}
+        self._write_index()
+
+    def evict(self):
+        """오래 안 쓴 캐시 항목부터 max_entries / max_bytes 이내로 정리합니다. (현재 키는 유지)"""
+        entries = self._index['entries']
+        lru = sorted((k for k in entries if k != self.key), key=lambda k: entries[k]['last_used'])
+        total = sum(e['size'] for e in entries.values())
+        while lru and (len(entries) > self.max_entries or total > self.max_bytes):
+            victim = lru.pop(0)
+            total -= entries.pop(victim)['size']
+            shutil.rmtree(os.path.join(self.cache_dir, victim), ignore_errors=True)
+        self._write_index()
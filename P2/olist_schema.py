@@ -0,0 +1,102 @@
+"""
+OLIST RAW 공통 dtype 스키마
+
+- 32자리 hex id(order_id, customer_id, ...) → category (여러 테이블 간 category 공유)
+- state / city / category 명 → category
+- 위경도 → float32, 작은 count(순번/할부/평점) → int8
+- datetime → 명시적 포맷으로 파싱
+
+P2의 모든 read_csv(1eeee.py, eda_analysis_v2/v3, inspect_data.py)는 read_olist_csv()를 사용합니다.
+"""
+
+import os
+
+import pandas as pd
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+OLIST_SCHEMA = {
+    'olist_orders_dataset.csv': {
+        'dtype': {'order_id': 'category', 'customer_id': 'category', 'order_status': 'category'},
+        'dates': ['order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+                  'order_delivered_customer_date', 'order_estimated_delivery_date']
+    },
+    'olist_customers_dataset.csv': {
+        'dtype': {'customer_id': 'category', 'customer_unique_id': 'category',
+                  'customer_zip_code_prefix': 'int32', 'customer_city': 'category',
+                  'customer_state': 'category'}
+    },
+    'olist_order_items_dataset.csv': {
+        'dtype': {'order_id': 'category', 'order_item_id': 'int8', 'product_id': 'category',
+                  'seller_id': 'category', 'price': 'float64', 'freight_value': 'float64'},
+        'dates': ['shipping_limit_date']
+    },
+    'olist_order_payments_dataset.csv': {
+        'dtype': {'order_id': 'category', 'payment_sequential': 'int8', 'payment_type': 'category',
+                  'payment_installments': 'int8', 'payment_value': 'float64'}
+    },
+    'olist_order_reviews_dataset.csv': {
+        'dtype': {'order_id': 'category', 'review_score': 'int8'},
+        'dates': ['review_creation_date', 'review_answer_timestamp']
+    },
+    'olist_products_dataset.csv': {
+        # 결측이 있는 수치 컬럼은 float32
+        'dtype': {'product_id': 'category', 'product_category_name': 'category',
+                  'product_name_lenght': 'float32', 'product_description_lenght': 'float32',
+                  'product_photos_qty': 'float32', 'product_weight_g': 'float32',
+                  'product_length_cm': 'float32', 'product_height_cm': 'float32',
+                  'product_width_cm': 'float32'}
+    },
+    'olist_sellers_dataset.csv': {
+        'dtype': {'seller_id': 'category', 'seller_zip_code_prefix': 'int32',
+                  'seller_city': 'category', 'seller_state': 'category'}
+    },
+    'olist_geolocation_dataset.csv': {
+        'dtype': {'geolocation_zip_code_prefix': 'int32', 'geolocation_lat': 'float32',
+                  'geolocation_lng': 'float32', 'geolocation_city': 'category',
+                  'geolocation_state': 'category'}
+    },
+    # 71행짜리 번역표는 fillna 등 문자열 처리를 위해 기본 dtype 유지
+    'product_category_name_translation.csv': {}
+}
+
+# 테이블 간 merge 키 → 같은 category 집합을 공유해야 merge/groupby가 code 단위로 동작
+SHARED_KEYS = ['order_id', 'customer_id', 'product_id', 'seller_id']
+
+
+def _parse_dates(df, spec):
+    for col in spec.get('dates', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format=DATETIME_FORMAT, errors='coerce')
+    return df
+
+
+def read_olist_csv(path, **kwargs):
+    """
+    파일 이름으로 스키마를 찾아 dtype/날짜 포맷을 적용해 읽습니다. (스키마가 없는 파일은 기본 read_csv)
+    chunksize를 주면 스키마가 적용된 chunk를 차례로 돌려주는 iterator를 반환합니다.
+    """
+    spec = OLIST_SCHEMA.get(os.path.basename(path), {})
+    reader = pd.read_csv(path, dtype=spec.get('dtype'), **kwargs)
+    if kwargs.get('chunksize'):
+        return (_parse_dates(chunk, spec) for chunk in reader)
+    return _parse_dates(reader, spec)
+
+
+def unify_categories(dfs, keys=SHARED_KEYS):
+    """
+    dfs(dict 또는 list)의 공유 키 컬럼이 동일한 category 집합을 갖도록 맞춥니다. (in-place)
+
+    category가 다르면 pandas merge가 object로 되돌아가므로, 로드 직후 한 번 호출합니다.
+    """
+    frames = list(dfs.values()) if isinstance(dfs, dict) else list(dfs)
+    for key in keys:
+        holders = [df for df in frames if key in df.columns and isinstance(df[key].dtype, pd.CategoricalDtype)]
+        if len(holders) < 2:
+            continue
+        categories = holders[0][key].cat.categories
+        for df in holders[1:]:
+            categories = categories.union(df[key].cat.categories)
+        for df in holders:
+            df[key] = df[key].cat.set_categories(categories)
+    return dfs
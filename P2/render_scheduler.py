@@ -0,0 +1,87 @@
+"""
+분석 / 렌더링 분리 스케줄러
+
+analyze 단계(큰 DataFrame → 작은 plot 데이터)는 메인 프로세스에서 의존성 순서대로 실행하고,
+plot 단계(matplotlib 그리기 + PNG 인코딩)는 process pool에서 병렬로 실행한다.
+
+- Task(name, analyze, inputs, plots): inputs 이름으로 context에서 입력을 꺼내고
+  결과를 context[name]에 저장 → 뒤 task의 입력으로 재사용 가능 (의존성)
+- plots: [(plot 함수, 출력 파일명)] — plot 함수는 (data, path) 인자의 top-level 함수여야 함 (pickle)
+- 출력 파일명은 task 목록에 고정 → worker 수와 무관하게 결과 동일
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class Task:
+    def __init__(self, name, analyze, inputs=(), plots=()):
+        self.name = name
+        self.analyze = analyze
+        self.inputs = tuple(inputs)
+        self.plots = list(plots)
+
+
+def order_tasks(tasks, available):
+    """inputs 의존성에 따라 task 실행 순서를 정합니다. (목록 순서를 최대한 유지)"""
+    ready = set(available)
+    pending = list(tasks)
+    ordered = []
+    while pending:
+        runnable = [t for t in pending if all(i in ready for i in t.inputs)]
+        if not runnable:
+            missing = {i for t in pending for i in t.inputs if i not in ready}
+            raise ValueError(f"실행할 수 없는 task가 있습니다. 누락/순환 입력: {sorted(missing)}")
+        for t in runnable:
+            ordered.append(t)
+            ready.add(t.name)
+            pending.remove(t)
+    return ordered
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _plot(plot, data, path):
+    start = time.perf_counter()
+    plot(data, path)
+    return time.perf_counter() - start
+
+
+def run_tasks(tasks, context, image_dir, workers=None, verbose=True):
+    """
+    task 목록을 실행합니다.
+
+    workers: plot process 수 (기본 CPU 수, 1이면 메인 프로세스에서 순차 렌더링)
+    반환: 저장된 이미지 경로 목록 (task 목록 순서)
+    """
+    workers = workers or os.cpu_count() or 1
+    context = dict(context)
+    start = time.perf_counter()
+    outputs, futures = [], []
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    try:
+        for task in order_tasks(tasks, context):
+            data = task.analyze(*[context[i] for i in task.inputs])
+            context[task.name] = data
+            for plot, filename in task.plots:
+                path = os.path.join(image_dir, filename)
+                outputs.append(path)
+                if pool is None:
+                    futures.append((filename, _plot(plot, data, path)))
+                else:
+                    futures.append((filename, pool.submit(_plot, plot, data, path)))
+        timings = [(f, t if pool is None else t.result()) for f, t in futures]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if verbose:
+        for filename, seconds in timings:
+            print(f"  [render] {filename:<48} {seconds:5.2f}s")
+        print(f"  [render] {len(timings)} figures, wall {time.perf_counter() - start:.2f}s (workers={workers})")
+    return outputs
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+분위수 기반 이상치 trim (벡터화 단일 pass)
+
+기존: for col: q = features[col].quantile(0.99); features = features[features[col] < q]
+  → 컬럼 수만큼 분위수 계산 + 필터 복사, 결과가 컬럼 순서에 의존
+변경: 모든 컬럼 분위수를 한 번에 계산 → 결합 mask 1개로 필터 (복사 1회, 순서 무관)
+
+대용량(스트리밍) 테이블은 QuantileSketch로 chunk마다 갱신/병합 가능한 근사 분위수를 쓴다.
+- 서로 다른 값이 MAX_EXACT개 이하인 컬럼(주문 수, 평점, recency 일수 등): 값별 count → 정확한 분위수
+- 초과하면 log 버킷(상대 오차 REL_ERROR)으로 전환 → 메모리는 값 범위의 log에 비례
+"""
+
+import numpy as np
+import pandas as pd
+
+TRIM_QUANTILE = 0.99
+MAX_EXACT = 4096
+REL_ERROR = 0.005
+
+
+# ======================================================
+# 1. 정확한 분위수 (메모리 내)
+# ======================================================
+def quantile_thresholds(features, q=TRIM_QUANTILE):
+    """모든 컬럼의 q 분위수를 한 번에 계산합니다. (pandas linear 보간과 동일)"""
+    return features.quantile(q)
+
+
+def trim_mask(features, thresholds):
+    """모든 컬럼이 기준값 미만인 행 (기존 `<` 비교와 같음)"""
+    cols = list(thresholds.index if isinstance(thresholds, pd.Series) else thresholds)
+    limits = np.array([thresholds[c] for c in cols], dtype='float64')
+    return (features[cols].to_numpy(dtype='float64') < limits).all(axis=1)
+
+
+def trim_outliers(features, q=TRIM_QUANTILE, method='exact'):
+    """
+    상위 (1-q) 이상치 행을 제외하는 mask와 컬럼별 기준값을 반환합니다.
+
+    method: 'exact' (DataFrame.quantile) / 'sketch' (QuantileSketch 근사)
+    """
+    if method == 'sketch':
+        thresholds = sketch_thresholds([features], features.columns, q)
+    else:
+        thresholds = quantile_thresholds(features, q)
+    return trim_mask(features, thresholds), thresholds
+
+
+# ======================================================
+# 2. 근사 분위수 sketch (스트리밍 / 병합 가능)
+# ======================================================
+class QuantileSketch:
+    """값별 count(정확) → 값 종류가 많아지면 log 버킷(상대 오차) 히스토그램. update()/merge() 가능."""
+
+    _OFFSET = 1 << 20  # 버킷 지수에 더해 부호(음수/양수)를 키 부호로 보존
+
+    def __init__(self, max_exact=MAX_EXACT, rel_error=REL_ERROR):
+        self.max_exact = max_exact
+        self.gamma = (1 + rel_error) / (1 - rel_error)
+        self.counts = pd.Series(dtype='int64')  # 정확 모드: 값 → count, 버킷 모드: 버킷 키 → count
+        self.exact = True
+        self.n = 0
+
+    # --- log 버킷: (gamma^(i-1), gamma^i] → 대표값 2·gamma^i / (gamma+1), 0은 키 0 ---
+    def _bucket(self, values):
+        nonzero = values != 0
+        exponent = np.zeros_like(values)
+        exponent[nonzero] = np.ceil(np.log(np.abs(values[nonzero])) / np.log(self.gamma))
+        return np.sign(values) * (exponent + self._OFFSET)
+
+    def _representative(self, keys):
+        exponent = np.abs(keys) - self._OFFSET
+        return np.sign(keys) * 2 * self.gamma ** exponent / (self.gamma + 1)
+
+    def _to_buckets(self):
+        keys = self._bucket(self.counts.index.to_numpy(dtype='float64'))
+        self.counts = self.counts.groupby(keys).sum()
+        self.exact = False
+
+    def _add(self, counts, n):
+        self.counts = self.counts.add(counts, fill_value=0).astype('int64')
+        self.n += n
+        if self.exact and len(self.counts) > self.max_exact:
+            self._to_buckets()
+        return self
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        keys = values if self.exact else self._bucket(values)
+        uniq, cnt = np.unique(keys, return_counts=True)
+        return self._add(pd.Series(cnt, index=uniq), len(values))
+
+    def merge(self, other):
+        """다른 sketch(예: 다른 chunk / worker)를 합칩니다. 같은 rel_error여야 합니다."""
+        counts = other.counts
+        if self.exact and not other.exact:
+            self._to_buckets()
+        elif other.exact and not self.exact:
+            counts = counts.groupby(self._bucket(counts.index.to_numpy(dtype='float64'))).sum()
+        return self._add(counts, other.n)
+
+    def quantile(self, q):
+        """pandas linear 보간 규칙의 분위수 (버킷 모드는 버킷 대표값 기준 근사)"""
+        if self.n == 0:
+            return np.nan
+        keys = self.counts.index.to_numpy(dtype='float64')
+        values = keys if self.exact else self._representative(keys)
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cum = np.cumsum(self.counts.to_numpy()[order])
+        pos = (self.n - 1) * q
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        v_lo, v_hi = values[np.searchsorted(cum, [lo, hi], side='right')]
+        return v_lo + (pos - lo) * (v_hi - v_lo)
+
+
+def sketch_thresholds(chunks, columns, q=TRIM_QUANTILE):
+    """chunk iterator를 한 번 훑어 컬럼별 근사 q 분위수를 계산합니다."""
+    sketches = {col: QuantileSketch() for col in columns}
+    for chunk in chunks:
+        for col in columns:
+            sketches[col].update(chunk[col].to_numpy())
+    return pd.Series({col: s.quantile(q) for col, s in sketches.items()})
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+고객 세분화 — out-of-core 모드 (mini-batch KMeans + IncrementalPCA)
+
+고객 feature Parquet(customer_features.py)을 row group chunk 단위로 스트리밍하며 학습한다.
+전체 feature 행렬을 메모리에 올리지 않는다.
+
+1. pass 1: 균등 표본(bottom-k 난수 키) + 분석 기준일 수집
+   → 전체 스트림을 QuantileSketch로 훑어 컬럼별 상위 1% trim 기준값 결정 (robust_trim.py)
+2. pass 2: 결합 mask로 trim 후 StandardScaler.partial_fit → IncrementalPCA.partial_fit
+3. k-sweep: k마다 표본 KMeans(n_init)로 초기 중심 → 전체 스트림 MiniBatchKMeans.partial_fit
+   k별 학습은 독립이라 process pool에서 병렬 실행, 표본 inertia / silhouette로 점수
+4. 마지막 pass: 선택한 k 모델로 predict → 군집별 합/개수 누적 → cluster_summary
+   (analyze_customer_clustering()과 같은 컬럼)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    print("pyarrow 라이브러리가 설치되어 있지 않습니다. 'pip install pyarrow'로 설치해주세요.")
+    pq = None
+
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import IncrementalPCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from robust_trim import TRIM_QUANTILE, sketch_thresholds, trim_mask
+
+FEATURES = ['total_spend', 'order_count', 'avg_review_score', 'recency']
+CHUNK_ROWS = 100_000
+MINIBATCH_ROWS = 8_192
+SAMPLE_ROWS = 50_000
+SILHOUETTE_ROWS = 10_000
+N_EPOCHS = 3
+
+
+# ======================================================
+# 1. 스트리밍 읽기
+# ======================================================
+def iter_features(path, analysis_date, chunk_rows=CHUNK_ROWS):
+    """feature Parquet을 chunk로 읽어 recency를 붙이고 결측 행을 제거해 돌려줍니다."""
+    if pq is None:
+        raise ImportError("스트리밍 세분화에는 pyarrow가 필요합니다. 'pip install pyarrow'")
+    columns = ['total_spend', 'order_count', 'avg_review_score', 'last_order_date']
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        chunk = batch.to_pandas().dropna()
+        chunk['recency'] = (analysis_date - chunk['last_order_date']).dt.days
+        yield chunk[FEATURES]
+
+
+def iter_trimmed(path, analysis_date, thresholds, scaler=None, chunk_rows=CHUNK_ROWS):
+    for chunk in iter_features(path, analysis_date, chunk_rows):
+        chunk = chunk[trim_mask(chunk, thresholds)]
+        if len(chunk):
+            yield chunk if scaler is None else scaler.transform(chunk.to_numpy())
+
+
+# ======================================================
+# 2. 표본 + trim 기준
+# ======================================================
+def sample_features(path, sample_rows=SAMPLE_ROWS, chunk_rows=CHUNK_ROWS, random_state=42):
+    """
+    균등 표본과 분석 기준일(전체 마지막 주문 + 1일)을 한 번의 스트리밍으로 구합니다.
+    표본: 행마다 난수 키를 붙여 키가 작은 sample_rows개를 유지 (bottom-k)
+    """
+    if pq is None:
+        raise ImportError("스트리밍 세분화에는 pyarrow가 필요합니다. 'pip install pyarrow'")
+    rng = np.random.default_rng(random_state)
+    columns = ['total_spend', 'order_count', 'avg_review_score', 'last_order_date']
+    sample, last_order = None, None
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        chunk = batch.to_pandas()
+        chunk_last = chunk['last_order_date'].max()
+        last_order = chunk_last if last_order is None or chunk_last > last_order else last_order
+        chunk = chunk.dropna()
+        chunk['_key'] = rng.random(len(chunk))
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        if len(sample) > sample_rows:
+            sample = sample.nsmallest(sample_rows, '_key')
+    if sample is None:
+        raise ValueError(f"고객 feature 파일이 비어 있습니다: {path}")
+    return sample.drop(columns='_key').reset_index(drop=True), last_order + pd.Timedelta(days=1)
+
+
+def trim_thresholds(path, analysis_date, q=TRIM_QUANTILE, chunk_rows=CHUNK_ROWS):
+    """전체 스트림을 한 번 훑어 컬럼별 q 분위수(근사)를 trim 기준값으로 정합니다."""
+    return sketch_thresholds(iter_features(path, analysis_date, chunk_rows), FEATURES, q)
+
+
+# ======================================================
+# 3. k별 mini-batch 학습 (process pool)
+# ======================================================
+def _fit_k(path, analysis_date, thresholds, scaler, sample_scaled, k, n_epochs, random_state):
+    init = KMeans(n_clusters=k, random_state=random_state, n_init=10).fit(sample_scaled).cluster_centers_
+    model = MiniBatchKMeans(n_clusters=k, init=init, n_init=1, random_state=random_state)
+    for _ in range(n_epochs):
+        for scaled in iter_trimmed(path, analysis_date, thresholds, scaler):
+            for start in range(0, len(scaled), MINIBATCH_ROWS):
+                model.partial_fit(scaled[start:start + MINIBATCH_ROWS])
+
+    labels = model.predict(sample_scaled)
+    inertia = float(((sample_scaled - model.cluster_centers_[labels]) ** 2).sum(axis=1).mean())
+    n = min(len(sample_scaled), SILHOUETTE_ROWS)
+    silhouette = silhouette_score(sample_scaled, labels, sample_size=n, random_state=random_state) if k > 1 else np.nan
+    return k, model, inertia, silhouette
+
+
+def sweep_k(path, analysis_date, thresholds, scaler, sample_scaled, ks, n_epochs=N_EPOCHS,
+            workers=None, random_state=42):
+    """
+    여러 k를 병렬로 학습/평가합니다. worker는 각자 Parquet을 스트리밍 (표본/스케일러만 전달).
+
+    반환: ({k: model}, scores DataFrame[k, inertia, silhouette])
+    """
+    workers = min(workers or os.cpu_count() or 1, len(ks))
+    args = [(path, analysis_date, thresholds, scaler, sample_scaled, k, n_epochs, random_state) for k in ks]
+    if workers <= 1:
+        results = [_fit_k(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_k, *zip(*args)))
+
+    models = {k: model for k, model, _, _ in results}
+    scores = pd.DataFrame([(k, inertia, sil) for k, _, inertia, sil in results],
+                          columns=['k', 'inertia', 'silhouette']).set_index('k')
+    return models, scores
+
+
+# ======================================================
+# 4. 전체 파이프라인
+# ======================================================
+def segment_customers_streaming(path, n_clusters=4, ks=(2, 3, 4, 5, 6), n_epochs=N_EPOCHS,
+                                workers=None, random_state=42):
+    """
+    고객 feature Parquet을 스트리밍하며 군집화합니다.
+
+    n_clusters: 최종 군집 수 (None이면 k-sweep silhouette 최대값)
+    반환: (cluster_summary, sample_df[FEATURES + cluster, pca1, pca2], scores)
+    """
+    path = str(path)
+    sample, analysis_date = sample_features(path, random_state=random_state)
+    sample['recency'] = (analysis_date - sample['last_order_date']).dt.days
+    sample = sample[FEATURES]
+
+    thresholds = trim_thresholds(path, analysis_date)
+    sample = sample[trim_mask(sample, thresholds)]
+
+    # 스케일러 → PCA (partial_fit)
+    scaler = StandardScaler()
+    for chunk in iter_trimmed(path, analysis_date, thresholds):
+        scaler.partial_fit(chunk.to_numpy())
+    pca = IncrementalPCA(n_components=2)
+    for scaled in iter_trimmed(path, analysis_date, thresholds, scaler):
+        if len(scaled) >= pca.n_components:
+            pca.partial_fit(scaled)
+
+    sample_scaled = scaler.transform(sample.to_numpy())
+    ks = sorted(set(ks) | ({n_clusters} if n_clusters else set()))
+    models, scores = sweep_k(path, analysis_date, thresholds, scaler, sample_scaled, ks,
+                             n_epochs=n_epochs, workers=workers, random_state=random_state)
+    print("\n--- k-sweep (표본 기준) ---")
+    print(scores)
+    if n_clusters is None:
+        n_clusters = int(scores['silhouette'].idxmax())
+    model = models[n_clusters]
+
+    # 군집별 합 / 개수 누적
+    sums = np.zeros((n_clusters, len(FEATURES)))
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    for chunk in iter_trimmed(path, analysis_date, thresholds):
+        labels = model.predict(scaler.transform(chunk.to_numpy()))
+        counts += np.bincount(labels, minlength=n_clusters)
+        np.add.at(sums, labels, chunk.to_numpy())
+    means = sums / np.maximum(counts, 1)[:, None]
+
+    cluster_summary = pd.DataFrame({
+        ('total_spend', 'mean'): means[:, 0],
+        ('total_spend', 'count'): counts,
+        ('order_count', 'mean'): means[:, 1],
+        ('avg_review_score', 'mean'): means[:, 2],
+        ('recency', 'mean'): means[:, 3]
+    }, index=pd.Index(range(n_clusters), name='cluster'))
+    cluster_summary = cluster_summary[counts > 0]
+
+    sample_df = sample.copy()
+    sample_df['cluster'] = model.predict(sample_scaled)
+    projected = pca.transform(sample_scaled)
+    sample_df['pca1'] = projected[:, 0]
+    sample_df['pca2'] = projected[:, 1]
+    return cluster_summary, sample_df, scores
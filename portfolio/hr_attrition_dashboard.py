@@ -14,6 +14,10 @@ st.set_page_config(layout="wide")
 st.title('HR 직원 이탈 분석 대시보드')
 
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'HR-employee-attrition'))
+from hr_cube import HRCube, ANALYSIS_CUBOIDS
 
 # 데이터 로드
 @st.cache_data
@@ -23,7 +27,14 @@ def load_data():
     data = pd.read_csv(file_path)
     return data
 
+@st.cache_resource
+def load_cube(_data):
+    """특성별 이탈 count/sum 큐브를 한 번만 집계합니다."""
+    target = _data.assign(Attrition_numeric=(_data['Attrition'] == 'Yes').astype(int))
+    return HRCube(target, target='Attrition_numeric', cuboids=ANALYSIS_CUBOIDS + [('EducationField',)])
+
 data = load_data()
+cube = load_cube(data)
 
 st.header('데이터 개요')
 st.dataframe(data.head())
@@ -37,8 +48,9 @@ menu = st.sidebar.selectbox('보고 싶은 분석을 선택하세요.',
 if menu == '이탈률 분석':
     st.header('전체 이탈률 분석')
 
-    attrition_counts = data['Attrition'].value_counts()
-    attrition_rate = (attrition_counts['Yes'] / (attrition_counts['Yes'] + attrition_counts['No'])) * 100
+    summary = cube.summary()
+    attrition_counts = pd.Series({'No': summary['total'] - summary['attrition_count'], 'Yes': summary['attrition_count']})
+    attrition_rate = summary['attrition_rate']
 
     col1, col2 = st.columns(2)
     with col1:
@@ -60,11 +72,11 @@ elif menu == '특성별 분석':
                                ['Department', 'JobRole', 'Gender', 'EducationField', 'JobLevel', 'OverTime'])
 
     # 특성별 이탈률 계산 및 시각화
-    attrition_by_feature = data.groupby(feature)['Attrition'].value_counts(normalize=True).unstack()
-    attrition_by_feature = attrition_by_feature.rename(columns={'Yes': '이탈률', 'No': '잔류율'})
-    
-    if '이탈률' not in attrition_by_feature.columns:
-        attrition_by_feature['이탈률'] = 0
+    feature_rates = cube.rates([feature]).set_index(feature)
+    attrition_by_feature = pd.DataFrame({
+        '잔류율': 1 - feature_rates['attrition_rate'] / 100,
+        '이탈률': feature_rates['attrition_rate'] / 100
+    })
 
     col1, col2 = st.columns([1, 2])
 